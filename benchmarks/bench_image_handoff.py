@@ -0,0 +1,114 @@
+# benchmarks/bench_image_handoff.py
+# ----------------------------------------------------------------------
+# 基准测试：截图 -> OCR 引擎的图片交接耗时。
+# 对比旧路径 (BGRA -> PIL -> PNG 编码 -> PNG 解码 -> np.array)
+# 与新路径 (BGRA 缓冲区视图 -> to_model_input) 在不同截图尺寸下的延迟。
+#
+# 用法：
+#   python benchmarks/bench_image_handoff.py
+#   python benchmarks/bench_image_handoff.py --repeat 10 --json handoff.json
+# ----------------------------------------------------------------------
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from ocr_engine import to_model_input, load_image_array  # noqa: E402
+from utils.screenshot_tool import bgra_buffer_to_array  # noqa: E402
+
+# 常见截图尺寸 (宽, 高)
+CAPTURE_SIZES = [
+    (640, 480),
+    (1280, 720),
+    (1920, 1080),
+    (2560, 1440),
+    (3840, 2160),
+]
+
+SAMPLE_IMAGE = os.path.join(ROOT_DIR, 'data_test', 'test_image.png')
+
+
+def make_bgra_frame(width, height):
+    """用 data_test 中的样例图平铺生成指定尺寸的 BGRA 缓冲区，模拟 mss 截图的 raw 数据。"""
+    with Image.open(SAMPLE_IMAGE) as sample:
+        tile = sample.convert('RGB')
+    canvas = Image.new('RGB', (width, height), 'white')
+    for top in range(0, height, tile.height):
+        for left in range(0, width, tile.width):
+            canvas.paste(tile, (left, top))
+    return bytearray(canvas.tobytes('raw', 'BGRX'))
+
+
+def handoff_png_roundtrip(raw, width, height):
+    """旧路径：截图转 PIL，GUI 线程编码 PNG，工作线程再解码为数组。"""
+    img_pil = Image.frombytes("RGB", (width, height), bytes(raw), "raw", "BGRX")
+    img_byte_arr = io.BytesIO()
+    img_pil.save(img_byte_arr, format='PNG')
+    return load_image_array(img_byte_arr.getvalue(), is_path=False)
+
+
+def handoff_zero_copy(raw, width, height):
+    """新路径：在缓冲区上建立视图，由工作线程一次性规整为模型输入。"""
+    frame = bgra_buffer_to_array(raw, width, height)
+    return to_model_input(frame)
+
+
+def measure(func, repeat, *args):
+    """多次执行并返回耗时样本 (毫秒)。"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(repeat=5):
+    rows = []
+    for width, height in CAPTURE_SIZES:
+        raw = make_bgra_frame(width, height)
+
+        # 两条路径的结果必须一致，基准才有意义
+        assert np.array_equal(handoff_png_roundtrip(raw, width, height), handoff_zero_copy(raw, width, height))
+
+        png_ms = statistics.median(measure(handoff_png_roundtrip, repeat, raw, width, height))
+        zero_copy_ms = statistics.median(measure(handoff_zero_copy, repeat, raw, width, height))
+        rows.append({
+            "size": f"{width}x{height}",
+            "png_roundtrip_ms": round(png_ms, 2),
+            "zero_copy_ms": round(zero_copy_ms, 2),
+            "saved_ms": round(png_ms - zero_copy_ms, 2),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="截图到 OCR 引擎的图片交接耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个尺寸的重复次数 (取中位数)，默认 5")
+    parser.add_argument("--json", dest="json_path", help="可选：将结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    rows = run(repeat=args.repeat)
+
+    print(f"{'尺寸':<12}{'PNG 往返 (ms)':>16}{'零拷贝 (ms)':>14}{'节省 (ms)':>12}")
+    for row in rows:
+        print(f"{row['size']:<12}{row['png_roundtrip_ms']:>16.2f}{row['zero_copy_ms']:>14.2f}{row['saved_ms']:>12.2f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# benchmarks/bench_ocr.py
+# ----------------------------------------------------------------------
+# 可复现的 OCR 基准测试：在 data_test/*.png 及其等比缩放版本上运行识别，记录
+# - 冷启动耗时 (全新进程：导入 + 模型加载 + 首次识别)；
+# - 单张识别延迟分位数 (p50 / p95 / p99)；
+# - 不同线程数 (max_workers) 下的吞吐量，以及批量接口 recognize_many 的吞吐量；
+# - 峰值内存 (RSS) 与各阶段耗时统计 (ocr_metrics)。
+# 结果以 JSON 输出；指定 --baseline 时与基线比较，超出容差即以非零状态码退出。
+#
+# 用法 (CPU / Linux，使用 models/ 下的模型)：
+#   python benchmarks/bench_ocr.py --json bench.json
+#   python benchmarks/bench_ocr.py --baseline bench.json --tolerance 0.2
+# ----------------------------------------------------------------------
+
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from ocr_engine import init_paddle_ocr, recognize_and_get_text, recognize_many, pil_to_model_array  # noqa: E402
+from ocr_metrics import get_metrics  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT_DIR, 'data_test')
+
+# 样例图片的缩放倍数 (模拟低分辨率截图与高分辨率扫描件)
+DEFAULT_SCALES = (0.5, 1.0, 2.0)
+DEFAULT_WORKERS = (1, 2, 4)
+
+# 冷启动探针：在全新解释器中测量导入 + 模型加载 + 首次识别
+COLD_START_PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+import ocr_engine
+ocr, executor = ocr_engine.init_paddle_ocr(lang=sys.argv[1])
+if ocr is None:
+    raise SystemExit("OCR 模型加载失败，请检查 models/ 目录")
+ready_s = time.perf_counter() - start
+ocr_engine.recognize_and_get_text(ocr, sys.argv[2])
+executor.shutdown(wait=False)
+print(json.dumps({"model_ready_s": ready_s, "first_result_s": time.perf_counter() - start}))
+"""
+
+# 比较基线时检查的指标：(JSON 路径, 数值越大越差则为 True)
+REGRESSION_CHECKS = (
+    (("cold_start", "first_result_s"), True),
+    (("latency", "p50_ms"), True),
+    (("latency", "p95_ms"), True),
+    (("batch", "images_per_s"), False),
+    (("peak_rss_mb",), True),
+)
+
+
+def load_workload(scales=DEFAULT_SCALES):
+    """读取 data_test 中的样例图片，并生成各缩放倍数的版本 (BGR 数组)，顺序固定。"""
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, '*.png')))
+    if not paths:
+        raise FileNotFoundError(f"未找到样例图片: {DATA_DIR}")
+
+    workload = []
+    for path in paths:
+        with Image.open(path) as img:
+            img = img.convert('RGB')
+            for scale in scales:
+                size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+                scaled = img if scale == 1.0 else img.resize(size, Image.BICUBIC)
+                workload.append({
+                    "name": f"{os.path.basename(path)}@{scale}x",
+                    "image": pil_to_model_array(scaled),
+                })
+    return paths, workload
+
+
+def percentiles(samples):
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def measure_cold_start(lang, sample_path):
+    """在全新进程中测量冷启动，避免受当前进程已加载模型的影响。"""
+    completed = subprocess.run([sys.executable, "-c", COLD_START_PROBE, lang, sample_path],
+                               cwd=ROOT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"冷启动探针执行失败：{completed.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {key: round(value, 3) for key, value in result.items()}
+
+
+def measure_latency(ocr, workload, repeat):
+    """单线程逐张识别，返回每张图片的延迟分布 (毫秒)。"""
+    samples = []
+    for _ in range(repeat):
+        for item in workload:
+            start = time.perf_counter()
+            recognize_and_get_text(ocr, item["image"], is_path=False)
+            samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+def measure_throughput(ocr, workload, workers_list, repeat):
+    """不同线程数下并发提交整批图片，返回每秒识别张数。"""
+    results = []
+    images = [item["image"] for item in workload] * repeat
+    for workers in workers_list:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            start = time.perf_counter()
+            list(executor.map(lambda img: recognize_and_get_text(ocr, img, is_path=False), images))
+            elapsed = time.perf_counter() - start
+        results.append({"max_workers": workers, "images_per_s": round(len(images) / elapsed, 3)})
+    return results
+
+
+def measure_batch(ocr, workload, repeat, batch_size):
+    """批量接口 recognize_many 的吞吐量。"""
+    images = [item["image"] for item in workload] * repeat
+    start = time.perf_counter()
+    recognize_many(ocr, images, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {"batch_size": batch_size, "images_per_s": round(len(images) / elapsed, 3)}
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存 (Linux 下 ru_maxrss 单位为 KB)。"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def environment_info():
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import paddle
+        info["paddle"] = paddle.__version__
+    except ImportError:
+        pass
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip()
+        info["git_commit"] = commit or None
+    except OSError:
+        info["git_commit"] = None
+    return info
+
+
+def run(lang='ch', scales=DEFAULT_SCALES, workers_list=DEFAULT_WORKERS, repeat=3, batch_size=4,
+        cold_start=True):
+    paths, workload = load_workload(scales)
+
+    report = {"environment": environment_info(),
+              "workload": {"images": [item["name"] for item in workload], "repeat": repeat}}
+    if cold_start:
+        report["cold_start"] = measure_cold_start(lang, paths[0])
+
+    ocr, executor = init_paddle_ocr(lang=lang, warm_up=True)
+    executor.shutdown(wait=False)
+    if ocr is None:
+        raise RuntimeError("OCR 模型加载失败，请检查 models/ 目录")
+
+    get_metrics().reset()
+    report["latency"] = measure_latency(ocr, workload, repeat)
+    report["throughput"] = measure_throughput(ocr, workload, workers_list, repeat)
+    report["batch"] = measure_batch(ocr, workload, repeat, batch_size)
+    report["stages"] = get_metrics().snapshot()["stages"]
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def _lookup(report, path):
+    value = report
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """
+    与基线比较，返回退化项的描述列表 (为空表示没有退化)。
+    :param tolerance: 允许的相对变化，例如 0.2 表示变差不超过 20%
+    """
+    regressions = []
+    checks = list(REGRESSION_CHECKS)
+    for entry in baseline.get("throughput", []):
+        checks.append((("throughput", entry["max_workers"]), False))
+
+    for path, higher_is_worse in checks:
+        if path[0] == "throughput":
+            current = next((e["images_per_s"] for e in report.get("throughput", [])
+                            if e["max_workers"] == path[1]), None)
+            previous = next(e["images_per_s"] for e in baseline["throughput"] if e["max_workers"] == path[1])
+            label = f"throughput[max_workers={path[1]}]"
+        else:
+            current, previous = _lookup(report, path), _lookup(baseline, path)
+            label = ".".join(path)
+        if current is None or previous is None or previous == 0:
+            continue
+
+        change = (current - previous) / previous
+        if (change > tolerance) if higher_is_worse else (change < -tolerance):
+            regressions.append(f"{label}: {previous} -> {current} ({change:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR 基准测试 (data_test 样例图片及其缩放版本)")
+    parser.add_argument("--lang", default="ch", help="识别语言代码，默认 ch")
+    parser.add_argument("--scales", type=float, nargs="+", default=list(DEFAULT_SCALES),
+                        help="样例图片的缩放倍数，默认 0.5 1.0 2.0")
+    parser.add_argument("--workers", type=int, nargs="+", default=list(DEFAULT_WORKERS),
+                        help="测量吞吐量的线程数列表，默认 1 2 4")
+    parser.add_argument("--repeat", type=int, default=3, help="每项测量的重复轮数，默认 3")
+    parser.add_argument("--batch-size", type=int, default=4, help="recognize_many 的批大小，默认 4")
+    parser.add_argument("--skip-cold-start", action="store_true", help="跳过冷启动测量")
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    parser.add_argument("--baseline", help="基线 JSON 文件；存在退化时以状态码 1 退出")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对退化比例，默认 0.2")
+    args = parser.parse_args(argv)
+
+    report = run(lang=args.lang, scales=args.scales, workers_list=args.workers, repeat=args.repeat,
+                 batch_size=args.batch_size, cold_start=not args.skip_cold_start)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("性能退化：", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"与基线相比无超过 {args.tolerance:.0%} 的退化。", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
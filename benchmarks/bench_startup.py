@@ -0,0 +1,90 @@
+# benchmarks/bench_startup.py
+# ----------------------------------------------------------------------
+# 基准测试：程序启动耗时。
+# - 在全新的子进程中导入 GUI 启动所需的模块，测量导入耗时，并确认 Paddle 未被提前导入；
+# - 可选 (--with-model)：测量模型加载、预热推理以及预热后首次识别的耗时。
+#
+# 用法：
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --with-model --repeat 3 --json startup.json
+# ----------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子进程中执行：导入窗口显示前需要的模块，输出耗时与 Paddle 是否已导入
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ocr_engine, ocr_cache, gui_app
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"import_ms": elapsed_ms, "paddle_imported": "paddle" in sys.modules}))
+"""
+
+# 在子进程中执行：加载模型、预热，并测量预热后的首次识别耗时
+MODEL_PROBE = """
+import json, time
+import numpy as np
+import ocr_engine
+start = time.perf_counter()
+ocr, executor = ocr_engine.init_paddle_ocr(lang='ch')
+load_s = time.perf_counter() - start
+if ocr is None:
+    raise SystemExit("OCR 模型加载失败，请检查 models/ 目录")
+warm_up_s = ocr_engine.warm_up_ocr(ocr)
+img = ocr_engine.load_image_array(ocr_engine.os.path.join('data_test', 'test_image.png'))
+start = time.perf_counter()
+ocr_engine.run_ocr_predict(ocr, img)
+first_ocr_s = time.perf_counter() - start
+executor.shutdown(wait=False)
+print(json.dumps({"model_load_s": load_s, "warm_up_s": warm_up_s, "first_ocr_s": first_ocr_s}))
+"""
+
+
+def run_probe(code):
+    """在 ROOT_DIR 下启动全新解释器执行探针代码，返回其最后一行输出的 JSON。"""
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"探针进程执行失败：{completed.stderr.strip().splitlines()[-1:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(repeat=3, with_model=False):
+    import_samples = [run_probe(IMPORT_PROBE) for _ in range(repeat)]
+    result = {
+        "import_ms": round(statistics.median(s["import_ms"] for s in import_samples), 1),
+        "paddle_imported": any(s["paddle_imported"] for s in import_samples),
+    }
+    if with_model:
+        model = run_probe(MODEL_PROBE)
+        result.update({key: round(value, 2) for key, value in model.items()})
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="程序启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=3, help="导入耗时的重复次数 (取中位数)，默认 3")
+    parser.add_argument("--with-model", action="store_true", help="同时测量模型加载、预热与首次识别耗时")
+    parser.add_argument("--json", dest="json_path", help="可选：将结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    result = run(repeat=args.repeat, with_model=args.with_model)
+
+    print(f"启动前导入耗时: {result['import_ms']:.1f} ms (Paddle 已导入: {result['paddle_imported']})")
+    if args.with_model:
+        print(f"模型加载: {result['model_load_s']:.2f} s，预热: {result['warm_up_s']:.2f} s，"
+              f"预热后首次识别: {result['first_ocr_s']:.2f} s")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 # config_loader.py
-import yaml
+import logging
 import os
+import threading
+from collections import namedtuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
 
 # ======================
 # 1. 路径配置部分
@@ -19,55 +25,314 @@ CONFIG_FOLDER_NAME = 'config'
 CONFIG_PATH = os.path.join(CURRENT_DIR, CONFIG_FOLDER_NAME, CONFIG_FILE_NAME)
 
 # 定义全局变量，用于缓存已加载的配置数据
-# 目的：避免重复加载配置文件（实现单例效果）
+# 目的：避免重复加载配置文件（实现单例效果）；文件修改后由 reload_config() 替换
 _CONFIG_DATA = None
+# 已加载文件的 (修改时间 ns, 大小)，用于判断文件是否变化
+_CONFIG_STAMP = None
+_CONFIG_LOCK = threading.RLock()
+
+# 配置变更订阅者：[(callback, sections)]，sections 为 None 表示订阅全部配置段
+_SUBSCRIBERS = []
+
+
+# ======================
+# 2. 配置校验 (schema)
+# ======================
+class ConfigError(ValueError):
+    """配置文件内容不符合 CONFIG_SCHEMA。"""
+
+
+# 配置项的类型约束：types 为允许的类型，minimum 为数值下限，choices 为允许的取值，nullable 表示可以留空
+Field = namedtuple('Field', ['types', 'minimum', 'choices', 'nullable'], defaults=(None, None, False))
+
+_NUMBER = (int, float)
+
+# 各配置段中已知配置项的类型；未列出的配置项不做检查，缺省的配置项使用代码中的默认值
+CONFIG_SCHEMA = {
+    'general_config': {
+        'det_model': Field(str),
+        'reload_interval_s': Field(_NUMBER, minimum=0),
+    },
+    'executor_config': {
+        'max_workers': Field(int, minimum=1),
+        'det_batch_size': Field(int, minimum=1),
+        'rec_batch_size': Field(int, minimum=1),
+        'backend': Field(str, choices=('thread', 'process')),
+        'process_workers': Field(int, minimum=1),
+        'cpu_threads_per_worker': Field(int, minimum=0, nullable=True),
+        'autoscale': Field(bool),
+        'min_workers': Field(int, minimum=1),
+        'scale_interval_s': Field(_NUMBER, minimum=0.05),
+        'scale_up_queue': Field(_NUMBER, minimum=0),
+        'cpu_high': Field(_NUMBER, minimum=0),
+        'scale_down_idle': Field(int, minimum=1),
+    },
+    'model_pool_config': {
+        'max_instances': Field(int, minimum=1),
+        'max_memory_mb': Field(_NUMBER, minimum=0),
+    },
+    'preprocess_config': {
+        'max_side': Field(int, minimum=0),
+        'tiling_enabled': Field(bool),
+        'tile_aspect_ratio': Field(_NUMBER, minimum=1),
+        'tile_size': Field(int, minimum=1),
+        'tile_overlap': Field(int, minimum=0),
+    },
+    'postprocess_config': {
+        'default': Field(dict, nullable=True),
+        'languages': Field(dict, nullable=True),
+    },
+    'layout_config': {
+        'enabled': Field(bool),
+        'column_gap': Field(_NUMBER, minimum=0),
+        'line_tolerance': Field(_NUMBER, minimum=0),
+        'paragraph_gap': Field(_NUMBER, minimum=0),
+        'indent': Field(_NUMBER, minimum=0),
+        'vertical_ratio': Field(_NUMBER, minimum=0),
+        'text_column_fill': Field(_NUMBER, minimum=0),
+    },
+    'ingest_config': {
+        'max_file_mb': Field(_NUMBER, minimum=0),
+        'max_pages': Field(int, minimum=0),
+    },
+    'pdf_config': {
+        'dpi': Field(_NUMBER, minimum=1),
+        'use_text_layer': Field(bool),
+        'min_text_chars': Field(int, minimum=0),
+    },
+    'watch_config': {
+        'directories': Field(list),
+        'recursive': Field(bool),
+        'settle_s': Field(_NUMBER, minimum=0),
+        'poll_interval_s': Field(_NUMBER, minimum=0.1),
+        'use_inotify': Field(bool),
+        'sidecar_suffix': Field(str),
+        'manifest_path': Field(str),
+    },
+    'live_config': {
+        'interval_s': Field(_NUMBER, minimum=0.05),
+        'max_ocr_per_s': Field(_NUMBER, minimum=0),
+        'hash_size': Field(int, minimum=2),
+        'change_threshold': Field(int, minimum=0),
+    },
+    'incremental_config': {
+        'enabled': Field(bool),
+        'block_size': Field(int, minimum=1),
+        'margin': Field(int, minimum=0),
+        'max_changed_fraction': Field(_NUMBER, minimum=0),
+    },
+    'cache_config': {
+        'enabled': Field(bool),
+        'memory_entries': Field(int, minimum=0),
+        'disk_enabled': Field(bool),
+        'disk_path': Field(str),
+        'disk_max_mb': Field(_NUMBER, minimum=0),
+    },
+    'history_config': {
+        'enabled': Field(bool),
+        'db_path': Field(str),
+        'page_size': Field(int, minimum=1),
+        'max_records': Field(int, minimum=0),
+        'save_thumbnails': Field(bool),
+    },
+    'logging_config': {
+        'level': Field(str, choices=('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')),
+        'file_path': Field(str),
+        'metrics_interval_s': Field(_NUMBER, minimum=0),
+    },
+}
+
+
+def _check_field(name, value, field):
+    """检查单个配置项，返回错误描述；合法时返回 None。"""
+    if value is None:
+        return None if field.nullable else f"{name} 不能为空"
+    types = field.types if isinstance(field.types, tuple) else (field.types,)
+    # bool 是 int 的子类，数值配置项不接受 true / false
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        expected = "/".join(t.__name__ for t in types)
+        return f"{name} 应为 {expected} 类型，实际为 {type(value).__name__}"
+    if field.choices is not None:
+        normalized = value.upper() if field.choices[0].isupper() else value
+        if normalized not in field.choices:
+            return f"{name} 应为 {', '.join(field.choices)} 之一，实际为 {value!r}"
+    if field.minimum is not None and value < field.minimum:
+        return f"{name} 不能小于 {field.minimum}，实际为 {value}"
+    return None
+
+
+def validate_config(data):
+    """
+    按 CONFIG_SCHEMA 校验配置内容，发现的所有问题一次性报告。
+    :raises ConfigError: 配置不合法
+    """
+    if not isinstance(data, dict):
+        raise ConfigError("配置文件顶层应为映射 (key: value)")
+
+    errors = []
+    languages = data.get('supported_languages', [])
+    if not isinstance(languages, list):
+        errors.append("supported_languages 应为列表")
+    else:
+        for index, lang in enumerate(languages):
+            if not isinstance(lang, dict) or not isinstance(lang.get('code'), str) \
+                    or not isinstance(lang.get('rec_model'), str):
+                errors.append(f"supported_languages[{index}] 应包含字符串类型的 code 与 rec_model")
+
+    for section, fields in CONFIG_SCHEMA.items():
+        values = data.get(section)
+        if values is None:
+            continue
+        if not isinstance(values, dict):
+            errors.append(f"{section} 应为映射")
+            continue
+        for key, field in fields.items():
+            if key in values:
+                error = _check_field(f"{section}.{key}", values[key], field)
+                if error:
+                    errors.append(error)
+
+    if errors:
+        raise ConfigError("配置校验失败: " + "；".join(errors))
+    return data
 
 
 # ======================
-# 2. 配置加载函数
+# 3. 配置加载、热加载与变更订阅
 # ======================
+def _file_stamp():
+    """配置文件的 (修改时间 ns, 大小)；文件不存在时返回 None。"""
+    try:
+        stat = os.stat(CONFIG_PATH)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_config():
+    """从磁盘读取、解析并校验配置文件，返回 (配置, 文件标记)。"""
+    # 检查配置文件是否存在
+    stamp = _file_stamp()
+    if stamp is None:
+        # 如果不存在，抛出 FileNotFoundError，并打印完整路径，便于排查问题
+        raise FileNotFoundError(f"配置加载失败: 未找到文件 {CONFIG_PATH}")
+
+    # 打开配置文件并安全解析 YAML
+    # yaml.safe_load 能防止执行潜在的恶意代码（比 load 更安全）
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+    return validate_config(data if data is not None else {}), stamp
+
+
 def load_config():
     """
     加载 YAML 配置文件。
-    - 首次调用时从磁盘读取并解析 YAML；
-    - 后续调用直接返回缓存结果；
-    - 若文件不存在或格式错误，会抛出异常。
+    - 首次调用时从磁盘读取、解析并校验 YAML；
+    - 后续调用直接返回缓存结果 (文件修改后由 reload_config() 更新)；
+    - 若文件不存在、格式错误或校验失败，会抛出异常。
     """
-    global _CONFIG_DATA  # 使用全局变量
+    global _CONFIG_DATA, _CONFIG_STAMP  # 使用全局变量
 
     # 如果配置已经加载过，则直接返回，避免重复 IO 操作
     if _CONFIG_DATA is not None:
         return _CONFIG_DATA
 
-    # 输出提示信息
-    print(f"正在加载配置文件: {CONFIG_PATH}")
+    with _CONFIG_LOCK:
+        if _CONFIG_DATA is not None:
+            return _CONFIG_DATA
 
-    # 检查配置文件是否存在
-    if not os.path.exists(CONFIG_PATH):
-        # 如果不存在，抛出 FileNotFoundError，并打印完整路径，便于排查问题
-        raise FileNotFoundError(f"配置加载失败: 未找到文件 {CONFIG_PATH}")
+        logger.info(f"正在加载配置文件: {CONFIG_PATH}")
+        try:
+            _CONFIG_DATA, _CONFIG_STAMP = _read_config()
+        # 如果 YAML 格式错误或校验失败，则记录后继续抛出
+        except (yaml.YAMLError, ConfigError) as e:
+            logger.error(f"配置文件无效: {e}")
+            raise
+        logger.info("配置文件加载成功。")
+        return _CONFIG_DATA
 
-    try:
-        # 打开配置文件并安全解析 YAML
-        # yaml.safe_load 能防止执行潜在的恶意代码（比 load 更安全）
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            _CONFIG_DATA = yaml.safe_load(f)
-            print("配置文件加载成功。")
-            return _CONFIG_DATA
 
-    # 如果 YAML 格式错误，则捕获并提示
-    except yaml.YAMLError as e:
-        print(f"YAML 解析错误: {e}")
-        raise
+def reload_config(force=False):
+    """
+    配置文件发生变化 (修改时间或大小改变) 时重新加载，并通知订阅了变化配置段的订阅者。
+    新文件无法解析或校验失败时保留当前配置，只记录错误。
+    :param force: 为 True 时不比较文件标记，总是重新读取
+    :return: 发生变化的顶层配置段名称集合 (未变化或加载失败时为空集合)
+    """
+    global _CONFIG_DATA, _CONFIG_STAMP
+
+    with _CONFIG_LOCK:
+        stamp = _file_stamp()
+        if _CONFIG_DATA is not None and not force and (stamp is None or stamp == _CONFIG_STAMP):
+            return set()
+
+        old_data = _CONFIG_DATA or {}
+        try:
+            new_data, stamp = _read_config()
+        except (OSError, yaml.YAMLError, ConfigError) as e:
+            # 记下出错文件的标记，文件再次修改前不重复报告同一错误
+            _CONFIG_STAMP = stamp
+            logger.error(f"配置文件重新加载失败，继续使用当前配置: {e}")
+            return set()
+
+        changed = {section for section in set(old_data) | set(new_data)
+                   if old_data.get(section) != new_data.get(section)}
+        _CONFIG_DATA, _CONFIG_STAMP = new_data, stamp
+        subscribers = list(_SUBSCRIBERS)
+
+    if changed:
+        logger.info(f"配置文件已重新加载，变化的配置段: {', '.join(sorted(changed))}")
+    for callback, sections in subscribers:
+        if sections is not None and not (changed & sections):
+            continue
+        try:
+            callback(changed)
+        except Exception as e:
+            logger.exception(f"配置变更回调 {getattr(callback, '__name__', callback)} 执行失败: {e}")
+    return changed
+
+
+def subscribe(callback, sections=None):
+    """
+    订阅配置变更：reload_config() 发现 sections 中的配置段变化后调用 callback(changed_sections)。
+    回调在执行 reload_config() 的线程 (通常是配置监视线程) 中调用；同一回调重复订阅时只保留最后一次。
+    :param sections: 关心的配置段名称，None 表示任意配置段
+    :return: callback，便于用作装饰器
+    """
+    sections = frozenset(sections) if sections is not None else None
+    with _CONFIG_LOCK:
+        _SUBSCRIBERS[:] = [entry for entry in _SUBSCRIBERS if entry[0] != callback]
+        _SUBSCRIBERS.append((callback, sections))
+    return callback
+
+
+def unsubscribe(callback):
+    """取消订阅 (未订阅时忽略)。"""
+    with _CONFIG_LOCK:
+        _SUBSCRIBERS[:] = [entry for entry in _SUBSCRIBERS if entry[0] != callback]
+
+
+def start_config_watcher(interval_s):
+    """
+    启动后台线程，每隔 interval_s 秒检查配置文件的修改时间，变化时调用 reload_config()。
+    (标准库没有跨平台的文件系统通知接口，这里以 stat 轮询代替，每次检查只是一次 os.stat。)
+    :return: threading.Event，调用其 set() 停止监视；interval_s <= 0 时返回 None
+    """
+    if not interval_s or interval_s <= 0:
+        return None
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.wait(interval_s):
+            reload_config()
 
-    # 捕获其他未知异常
-    except Exception as e:
-        print(f"加载配置文件时发生未知错误: {e}")
-        raise
+    threading.Thread(target=loop, name="config-watcher", daemon=True).start()
+    logger.info(f"配置热加载已启用，每 {interval_s} 秒检查一次 {CONFIG_PATH}。")
+    return stop_event
 
 
 # ======================
-# 3. 配置访问接口
+# 4. 配置访问接口
 # ======================
 # 以下函数封装了常用配置项的访问逻辑，
 # 每次调用时都会自动触发 load_config()（如果尚未加载）。
@@ -115,6 +380,105 @@ def get_executor_config():
     return config.get('executor_config', {})
 
 
+def get_model_pool_config():
+    """
+    获取模型池相关配置。
+    例如：最多同时保留的 OCR 实例数量、内存预算 (MB)。
+    """
+    config = load_config()
+    return config.get('model_pool_config', {})
+
+
+def get_cache_config():
+    """
+    获取识别结果缓存相关配置。
+    例如：是否启用、内存条目数、磁盘缓存路径与容量。
+    """
+    config = load_config()
+    return config.get('cache_config', {})
+
+
+def get_history_config():
+    """
+    获取识别历史记录相关配置。
+    例如：是否持久化、数据库路径、每页条数、记录数上限与是否保存缩略图。
+    """
+    config = load_config()
+    return config.get('history_config', {})
+
+
+def get_postprocess_config():
+    """
+    获取识别文本后处理规则。
+    包含 default (默认规则) 与 languages (按语言代码覆盖的规则)，规则项为断句标点、标题正则与字符替换表。
+    """
+    config = load_config()
+    return config.get('postprocess_config', {})
+
+
+def get_layout_config():
+    """
+    获取版面分析 (按文本框分栏、切行、分段) 相关配置。
+    例如：是否启用、栏间距、行容差、段间距与缩进阈值 (以文本框高度为单位)。
+    """
+    config = load_config()
+    return config.get('layout_config', {})
+
+
+def get_ingest_config():
+    """
+    获取图片文件读取相关配置。
+    例如：文件大小上限 (MB)、多页文件最多识别的页数。
+    """
+    config = load_config()
+    return config.get('ingest_config', {})
+
+
+def get_pdf_config():
+    """
+    获取 PDF 识别相关配置。
+    例如：栅格化分辨率 (DPI)、是否直接使用 PDF 自带的文本层。
+    """
+    config = load_config()
+    return config.get('pdf_config', {})
+
+
+def get_watch_config():
+    """
+    获取目录监视 (ocr_watch) 相关配置。
+    例如：监视的目录、文件写入完成的判定时间、已处理文件清单的路径。
+    """
+    config = load_config()
+    return config.get('watch_config', {})
+
+
+def get_live_config():
+    """
+    获取实时识别 (周期截图) 相关配置。
+    例如：截图间隔、每秒最多识别次数、判断内容变化的哈希阈值。
+    """
+    config = load_config()
+    return config.get('live_config', {})
+
+
+def get_incremental_config():
+    """
+    获取截图增量识别相关配置。
+    例如：是否启用、比较像素的块大小、变化区域的扩展像素与整图识别的面积阈值。
+    """
+    config = load_config()
+    return config.get('incremental_config', {})
+
+
+def get_preprocess_config():
+    """
+    获取超大图片预处理相关配置。
+    例如：最大边长、是否分块、分块长度与重叠像素。
+    """
+    config = load_config()
+    return config.get('preprocess_config', {})
+
+
 def get_rec_model_name(lang_code):
     """
     根据语言代码（如 'ch', 'en'）获取对应的识别模型名称。
@@ -128,12 +492,13 @@ def get_rec_model_name(lang_code):
 
 
 # ======================
-# 4. 测试辅助函数
+# 5. 测试辅助函数
 # ======================
 def _reset_config_for_testing():
     """
     仅供单元测试使用：
     手动重置全局配置缓存，使得下次调用 load_config() 时重新读取文件。
     """
-    global _CONFIG_DATA
+    global _CONFIG_DATA, _CONFIG_STAMP
     _CONFIG_DATA = None
+    _CONFIG_STAMP = None
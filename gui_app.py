@@ -3,11 +3,18 @@ import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
 import io
 import sys
-import concurrent.futures
 import logging
 import time
 from PIL import Image, ImageTk
 
+from ocr_engine import OcrCancelledError
+from ocr_history import HistoryStore, encode_thumbnail
+from ocr_incremental import create_incremental_recognizer
+from ocr_ingest import IMAGE_EXTENSIONS, load_preview
+from ocr_jobs import OcrJobManager
+from ocr_pdf import PDF_EXTENSIONS, is_pdf, pdf_available, load_pdf_preview
+from ocr_metrics import get_metrics
+
 # *****************************************************************
 
 logger = logging.getLogger(__name__)
@@ -20,11 +27,23 @@ PREVIEW_DEFAULT_HEIGHT = 8
 
 # --- 导入配置加载器 ---
 try:
-    from config_loader import get_languages_config
+    from config_loader import get_languages_config, get_history_config, subscribe, unsubscribe
 except ImportError:
     logger.warning("警告: 无法导入 config_loader.py，GUI 将使用硬编码语言列表。")
 
 
+    def subscribe(callback, sections=None):
+        return callback
+
+
+    def unsubscribe(callback):
+        pass
+
+
+    def get_history_config():
+        return {}
+
+
     # ... (get_languages_config 定义保持不变) ...
     def get_languages_config():
         return [
@@ -34,28 +53,48 @@ except ImportError:
 
 # >>> 关键修改 1: 导入自定义工具类 <<<
 try:
-    from utils.screenshot_tool import ScreenshotTaker
+    from utils.screenshot_tool import ScreenshotTaker, bgra_array_to_pil, get_capture_backend
 except ImportError:
     logger.warning("警告: 无法导入 utils.screenshot_tool.ScreenshotTaker。截图功能将不可用。")
     ScreenshotTaker = None
+    bgra_array_to_pil = None
+    get_capture_backend = None
 
 
 # >>> 关键修改 1 结束 <<<
 
 
 class OcrApp:
-    def __init__(self, master, ocr_instance, executor_instance, recognize_func):
+    def __init__(self, master, ocr_instance, executor_instance, recognize_func, result_cache=None,
+                 history_store=None):
         self.master = master
         self.ocr = ocr_instance
         self.executor = executor_instance
         self.recognize_func = recognize_func
+        self.result_cache = result_cache  # ocr_cache.ResultCache，为 None 时不使用缓存
+        # 截图增量识别：连续截取同一区域时只重新识别变化的部分 (未启用时为 None)
+        self.incremental = create_incremental_recognizer()
+
+        # 识别任务：新提交的任务取代旧任务，current_job 为界面正在等待结果的任务
+        self.jobs = OcrJobManager(executor_instance)
+        self.current_job = None
+        self._closing = False
 
         # --- 新增属性用于管理预览图 ---
         self.preview_image = None  # 持有 PhotoImage 引用，防止被垃圾回收
         self.preview_label = None  # 预览图标签
 
         # --- 新增属性用于历史记录 ---
-        self.history_data = []  # 存储历史记录列表：[{"time": "...", "text": "...", "source": "..."}]
+        # ocr_history.HistoryStore；未提供持久化存储时仅保存在内存数据库中 (退出后丢失)
+        history_config = get_history_config()
+        self.history = history_store or HistoryStore(':memory:', max_records=history_config.get('max_records', 0))
+        self.history_page_size = max(1, int(history_config.get('page_size', 100)))
+        self.save_thumbnails = history_config.get('save_thumbnails', True)
+        self.history_page = 0  # 当前页 (从 0 开始)，列表中只保留这一页的记录
+        self.history_query = ""  # 当前搜索关键词
+        self.history_image = None  # 持有历史记录缩略图的 PhotoImage 引用
+        self._current_thumbnail = None  # 当前任务图片的缩略图 (PNG 字节)，识别成功后写入历史记录
+        self._pages_done = 0  # 当前多页文件任务已识别完成的页数
         self.notebook = None  # ttk.Notebook 实例
         self.history_tree = None  # ttk.Treeview 实例
 
@@ -79,15 +118,70 @@ class OcrApp:
 
         # >>> 关键修改 2: 仅存储类引用，不在此实例化 <<<
         self.screenshot_taker_class = ScreenshotTaker
+        self.screenshot_taker = None  # 第一次截图时创建，之后复用
+        self.live_capture = None  # 进行中的实时识别 (ocr_live.LiveCapture)
+        self._live_requested = False  # 当前截图用于选择实时识别区域
         # >>> 关键修改 2 结束 <<<
 
         master.title("PaddleOCR 简易识别工具")
         self.setup_ui(master)
 
-        device_status = "可用" if self.ocr else "初始化失败"
+        # 配置热加载修改检测模型或语言列表后，检查当前模型是否需要重新加载
+        subscribe(self._on_config_changed, sections=('general_config', 'supported_languages'))
+
+        device_status = "可用" if self.ocr else "未加载"
         current_lang = self.lang_var.get()
         self.status_var.set(f"等待操作... | 状态：{device_status} | 语言：{current_lang}")
 
+    def load_model_in_background(self, started_at=None):
+        """
+        窗口显示后在后台加载并预热当前语言的模型，加载期间按钮禁用、状态栏显示进度。
+        :param started_at: 程序启动时刻 (time.perf_counter())，用于记录模型就绪的总耗时
+        """
+        from ocr_engine import init_paddle_ocr
+
+        self._set_ui_state(tk.DISABLED)
+        self.status_var.set("状态：正在后台加载 OCR 模型，窗口可正常使用...")
+        self.progressbar.grid(row=0, column=1, sticky='nse', padx=5, pady=5)
+        self.progressbar.start(10)
+
+        def report(message):
+            # 由工作线程调用，必须切回 Tk 主线程更新界面
+            self.master.after(0, self.status_var.set, f"状态：{message}")
+
+        future = self.executor.submit(
+            init_paddle_ocr,
+            lang=self.current_lang_code,
+            executor=self.executor,
+            warm_up=True,
+            progress=report
+        )
+        future.add_done_callback(lambda f: self.master.after(0, self._on_startup_model_loaded, f, started_at))
+
+    def _on_config_changed(self, sections):
+        """配置热加载回调 (在配置监视线程中调用)：切回 Tk 主线程检查当前模型。"""
+        if not self._closing:
+            self.master.after(0, self._reload_model_if_changed)
+
+    def _reload_model_if_changed(self):
+        """当前语言对应的模型组合被修改时，在后台重新加载；模型未变化时继续使用当前实例。"""
+        if self.ocr is None or self._closing:
+            return
+        from ocr_engine import get_cached_ocr
+        if get_cached_ocr(self.current_lang_code) is self.ocr:
+            return
+        logger.info("配置变更影响当前语言的模型，重新加载。")
+        self.load_model_in_background()
+
+    def _on_startup_model_loaded(self, future, started_at):
+        """启动时的后台加载完成：更新 OCR 实例并记录启动耗时。"""
+        self.update_ocr_instance(future)
+        if started_at is not None:
+            elapsed = time.perf_counter() - started_at
+            logger.info(f"启动耗时：OCR 模型就绪 {elapsed:.2f} 秒 (含预热)。")
+        if self.ocr:
+            self.status_var.set(f"等待操作... | 状态：可用 | 语言：{self.lang_var.get()}")
+
     def setup_ui(self, master):
         self.style = ttk.Style()
         self.style.configure('TButton', font=('Helvetica', 10))
@@ -175,6 +269,15 @@ class OcrApp:
         )
         self.screenshot_button.grid(row=row_idx, column=2, padx=(10, 0), pady=(5, 10), sticky='w')
 
+        # 4.1 实时识别按钮 (选择区域后周期截图，内容变化时才识别)
+        self.live_button = ttk.Button(
+            control_frame,
+            text="实时识别",
+            command=self.toggle_live_capture,
+            state=(tk.NORMAL if self.ocr and self.screenshot_taker_class else tk.DISABLED)
+        )
+        self.live_button.grid(row=row_idx, column=1, padx=(10, 0), pady=(5, 10), sticky='e')
+
         # 5. 识别结果标题
         ttk.Label(control_frame, text="识别结果:", font=('Helvetica', 10, 'bold')).grid(row=row_idx, column=0,
                                                                                         pady=(5, 10), sticky='w')
@@ -234,23 +337,41 @@ class OcrApp:
         self.progressbar.grid(row=0, column=1, sticky='nse', padx=5, pady=5)
         self.progressbar.grid_remove()  # 初始隐藏
 
+        # 取消当前识别任务 (识别进行中时显示)
+        self.cancel_button = ttk.Button(self.status_frame, text="取消识别", command=self.cancel_recognition)
+        self.cancel_button.grid(row=0, column=2, sticky='e', padx=(0, 5), pady=5)
+        self.cancel_button.grid_remove()
+
     # ----------------------------------------------------------------------
     # >>> 新增方法：历史记录 UI 设置 <<<
     # ----------------------------------------------------------------------
     def _setup_history_tab(self):
-        """创建历史记录标签页，包含 Treeview 列表。"""
+        """创建历史记录标签页：搜索框、按页加载的 Treeview 列表与翻页按钮。"""
 
         history_tab_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(history_tab_frame, text=" 历史记录 ")
 
         # 允许历史记录标签页的内容伸展
         history_tab_frame.grid_columnconfigure(0, weight=1)
-        history_tab_frame.grid_rowconfigure(0, weight=1)
+        history_tab_frame.grid_rowconfigure(1, weight=1)
+
+        # --- 搜索栏 ---
+        search_frame = ttk.Frame(history_tab_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky='we', pady=(0, 5))
+        search_frame.grid_columnconfigure(1, weight=1)
+
+        ttk.Label(search_frame, text="搜索:").grid(row=0, column=0, padx=(0, 5))
+        self.history_search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.history_search_var)
+        search_entry.grid(row=0, column=1, sticky='we')
+        search_entry.bind("<Return>", self._search_history)
+        ttk.Button(search_frame, text="搜索", command=self._search_history).grid(row=0, column=2, padx=(5, 0))
+        ttk.Button(search_frame, text="清除", command=self._clear_history_search).grid(row=0, column=3, padx=(5, 0))
 
         # --- Treeview (列表) ---
 
         # 1. 定义列
-        columns = ("#", "time", "source", "text")
+        columns = ("#", "time", "source", "lang", "text")
         self.history_tree = ttk.Treeview(
             history_tab_frame,
             columns=columns,
@@ -261,44 +382,125 @@ class OcrApp:
         self.history_tree.heading("#", text="ID")
         self.history_tree.heading("time", text="识别时间")
         self.history_tree.heading("source", text="来源")
+        self.history_tree.heading("lang", text="语言")
         self.history_tree.heading("text", text="识别结果 (双击查看)")
 
         self.history_tree.column("#", width=50, anchor=tk.CENTER, stretch=tk.NO)
         self.history_tree.column("time", width=150, anchor=tk.W, stretch=tk.NO)
-        self.history_tree.column("source", width=100, anchor=tk.CENTER, stretch=tk.NO)
-        self.history_tree.column("text", width=350, anchor=tk.W, stretch=tk.YES)  # 结果列伸展
+        self.history_tree.column("source", width=70, anchor=tk.CENTER, stretch=tk.NO)
+        self.history_tree.column("lang", width=60, anchor=tk.CENTER, stretch=tk.NO)
+        self.history_tree.column("text", width=320, anchor=tk.W, stretch=tk.YES)  # 结果列伸展
 
         # 3. 添加滚动条
         vsb = ttk.Scrollbar(history_tab_frame, orient="vertical", command=self.history_tree.yview)
         self.history_tree.configure(yscrollcommand=vsb.set)
 
         # 4. 布局
-        self.history_tree.grid(row=0, column=0, sticky='nsew')
-        vsb.grid(row=0, column=1, sticky='ns')
+        self.history_tree.grid(row=1, column=0, sticky='nsew')
+        vsb.grid(row=1, column=1, sticky='ns')
 
         # 5. 绑定双击事件：查看完整文本
         self.history_tree.bind("<Double-1>", self._show_history_detail)
 
+        # --- 翻页栏：列表中只保留当前页的记录 ---
+        paging_frame = ttk.Frame(history_tab_frame)
+        paging_frame.grid(row=2, column=0, columnspan=2, sticky='we', pady=(5, 0))
+        paging_frame.grid_columnconfigure(1, weight=1)
+
+        self.history_prev_button = ttk.Button(paging_frame, text="上一页",
+                                              command=lambda: self._change_history_page(-1))
+        self.history_prev_button.grid(row=0, column=0)
+        self.history_page_var = tk.StringVar()
+        ttk.Label(paging_frame, textvariable=self.history_page_var, anchor=tk.CENTER).grid(row=0, column=1)
+        self.history_next_button = ttk.Button(paging_frame, text="下一页",
+                                              command=lambda: self._change_history_page(1))
+        self.history_next_button.grid(row=0, column=2)
+
+        self.refresh_history()
+
+    def refresh_history(self):
+        """按当前页码与搜索关键词从历史记录库重新加载列表。"""
+        try:
+            total = self.history.count(self.history_query)
+            page_count = max(1, -(-total // self.history_page_size))
+            self.history_page = min(self.history_page, page_count - 1)
+            rows = self.history.page(self.history_page * self.history_page_size, self.history_page_size,
+                                     self.history_query)
+        except Exception as e:
+            logger.exception(f"读取历史记录失败: {e}")
+            self.history_page_var.set("历史记录读取失败")
+            return
+
+        self.history_tree.delete(*self.history_tree.get_children())
+        for row in rows:
+            # Treeview 显示文本的前 30 个字符（去除换行符）
+            display_text = row['preview'].replace('\n', ' ').strip()
+            display_text = (display_text[:30] + '...') if len(display_text) > 30 else display_text
+            # 使用记录 ID 作为 Treeview 的 ID (iid) 和第一列的值 (#)
+            self.history_tree.insert(
+                '', 'end',
+                iid=row['id'],
+                values=(
+                    row['id'],
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row['created_at'])),
+                    row['source'],
+                    row['lang'] or "",
+                    display_text
+                )
+            )
+
+        scope = f"匹配 “{self.history_query}” " if self.history_query else ""
+        self.history_page_var.set(f"第 {self.history_page + 1} / {page_count} 页，{scope}共 {total} 条")
+        self.history_prev_button.config(state=(tk.NORMAL if self.history_page > 0 else tk.DISABLED))
+        self.history_next_button.config(state=(tk.NORMAL if self.history_page < page_count - 1 else tk.DISABLED))
+
+    def _change_history_page(self, delta):
+        self.history_page = max(0, self.history_page + delta)
+        self.refresh_history()
+
+    def _search_history(self, event=None):
+        self.history_query = self.history_search_var.get().strip()
+        self.history_page = 0
+        self.refresh_history()
+
+    def _clear_history_search(self):
+        self.history_search_var.set("")
+        self._search_history()
+
+    def _add_history_record(self, text, source, elapsed_ms):
+        """保存一条识别记录；列表停留在第一页时立即刷新。"""
+        try:
+            self.history.add(text, source, lang=self.current_lang_code, elapsed_ms=elapsed_ms,
+                             thumbnail=self._current_thumbnail)
+        except Exception as e:
+            logger.exception(f"保存历史记录失败: {e}")
+            return
+        if self.history_page == 0:
+            self.refresh_history()
+
     def _show_history_detail(self, event):
         """
-        处理历史记录列表的双击事件，将完整文本显示在主识别区域。
+        处理历史记录列表的双击事件，将完整文本显示在主识别区域，并显示保存的缩略图。
         """
         selected_item = self.history_tree.selection()
         if not selected_item:
             return
 
         item_id = selected_item[0]
-        # 从 Treeview 获取存储的索引（即 ID 列的值）
+        # 从 Treeview 获取存储的记录 ID（即 ID 列的值）
         try:
-            record_index = int(self.history_tree.set(item_id, '#'))
+            record_id = int(self.history_tree.set(item_id, '#'))
         except (ValueError, IndexError):
-            self.status_var.set("错误：无法获取历史记录索引。")
+            self.status_var.set("错误：无法获取历史记录 ID。")
             return
 
         try:
-            record = self.history_data[record_index]
-        except (IndexError, TypeError):
-            logger.error(f"历史记录数据索引 {record_index} 查找失败。")
+            record = self.history.get(record_id)
+        except Exception as e:
+            logger.exception(f"读取历史记录 {record_id} 失败: {e}")
+            record = None
+        if record is None:
+            logger.error(f"历史记录 {record_id} 查找失败。")
             self.status_var.set("错误：历史记录数据查找失败。")
             return
 
@@ -306,12 +508,22 @@ class OcrApp:
         self.notebook.select(0)
 
         # 清空并显示历史文本
+        record_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record['created_at']))
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END,
-                                f"--- 历史记录 ID: {record_index}, 来源: {record['source']}, 时间: {record['time']} ---\n\n")
+                                f"--- 历史记录 ID: {record_id}, 来源: {record['source']}, 时间: {record_time} ---\n\n")
         self.result_text.insert(tk.END, record['text'])
 
-        self.status_var.set(f"状态：已加载 ID {record_index} 的历史记录。")
+        if record['thumbnail']:
+            try:
+                with Image.open(io.BytesIO(record['thumbnail'])) as thumb:
+                    self.history_image = ImageTk.PhotoImage(thumb)
+                self.preview_label.config(image=self.history_image, text="", bg=self.master.cget('bg'),
+                                          width=self.history_image.width(), height=self.history_image.height())
+            except Exception as e:
+                logger.warning(f"历史记录缩略图解码失败: {e}")
+
+        self.status_var.set(f"状态：已加载 ID {record_id} 的历史记录。")
 
     def select_file(self):
         """
@@ -320,17 +532,23 @@ class OcrApp:
         if self.executor is None or self.ocr is None:
             self.status_var.set("错误：OCR 或执行器不可用。")
             return
+        self.stop_live_capture()
 
+        extensions = IMAGE_EXTENSIONS + (PDF_EXTENSIONS if pdf_available() else ())
+        patterns = " ".join(f"*{ext}" for ext in extensions)
         file_path = filedialog.askopenfilename(title="选择图片文件",
-                                               filetypes=[("图片文件", "*.png *.jpg *.jpeg *.bmp"),
+                                               filetypes=[("图片 / PDF 文件", patterns),
                                                           ("所有文件", "*.*")])
         if not file_path:
             return
 
-        # 1. 加载 PIL Image 对象
+        # 1. 只解码预览用的缩略图，完整页面由识别任务逐页解码
         try:
             # --- 增加 try-except 块以捕获文件加载错误并记录 ---
-            img_pil = Image.open(file_path).convert('RGB')
+            if is_pdf(file_path):
+                img_pil = load_pdf_preview(file_path, PREVIEW_MAX_SIZE)
+            else:
+                img_pil = load_preview(file_path, PREVIEW_MAX_SIZE)
         except Exception as e:
             # 记录详细的异常信息，并给用户简洁的提示
             self.status_var.set(f"错误：加载文件失败。")
@@ -338,29 +556,45 @@ class OcrApp:
 
             # 清除之前的错误信息和预览图
             self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"文件加载失败，请检查文件格式是否支持或文件是否损坏。详细信息已写入日志。")
+            self.result_text.insert(tk.END, f"文件加载失败，请检查文件格式是否支持、文件是否过大或已损坏。详细信息已写入日志。")
             self.preview_label.config(image=None, text=PREVIEW_DEFAULT_TEXT, bg='light gray')
             return
 
         self.file_path_var.set(f"文件路径: {file_path}")
 
-        # 2. 启动识别任务
-        self._start_recognition_from_image(img_pil, is_file=True)
+        # 2. 启动识别任务 (同一文件在识别完成前重复选择时不会重复识别)
+        self._start_recognition_from_image(img_pil, is_file=True, source_key=file_path)
 
-    def update_ui_with_result(self, future, start_time):
+    def update_ui_with_result(self, job, start_time):
         """
-        异步任务完成后的 UI 更新。
+        异步任务完成后的 UI 更新。已被新任务取代的任务结果直接丢弃。
         """
+        if job is not self.current_job:
+            logger.debug("丢弃已被取代的识别任务结果。")
+            return
+        self.current_job = None
+
         # 停止进度显示
-        self.progressbar.stop()
-        self.progressbar.grid_forget()
+        self._set_recognizing(False)
 
         end_time = time.time()
         elapsed_time = end_time - start_time
         time_str = f"{elapsed_time:.2f} 秒"
+        # 从提交任务到界面更新的完整耗时 (含排队等待与 Tk 回调延迟)
+        get_metrics().record('end_to_end', elapsed_time * 1000)
 
         try:
-            recognized_text = future.result()
+            if job.cancelled:
+                # 进程池后端无法在检查点中止，取消后完成的结果同样丢弃
+                raise OcrCancelledError("识别任务已取消")
+            recognized_text = job.result()
+
+            # 带缓存的识别任务返回 (文本, 是否命中缓存)
+            if isinstance(recognized_text, tuple):
+                recognized_text, cache_hit = recognized_text
+                if cache_hit:
+                    time_str = f"{time_str}，命中缓存"
+
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, recognized_text)
 
@@ -384,39 +618,15 @@ class OcrApp:
                     # 确保截图操作在没有文件路径时仍被正确标识
                     source_type = "截图"
 
-                    # 创建新的历史记录项
-                new_record = {
-                    "time": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "text": recognized_text,
-                    "source": source_type
-                }
-
-                # 1. 添加到数据列表
-                self.history_data.append(new_record)
-                record_index = len(self.history_data) - 1  # 获取索引作为ID
-
-                # 2. 插入到 Treeview
-                if self.history_tree:
-                    # Treeview 显示文本的前 30 个字符（去除换行符）
-                    display_text = new_record['text'].replace('\n', ' ').strip()
-                    display_text = (display_text[:30] + '...') if len(display_text) > 30 else display_text
-
-                    # 使用索引作为 Treeview 的 ID (iid) 和第一列的值 (#)
-                    self.history_tree.insert(
-                        '', 'end',
-                        iid=record_index,
-                        values=(
-                            record_index,
-                            new_record['time'],
-                            new_record['source'],
-                            display_text
-                        )
-                    )
+                # 保存到历史记录库 (持久化，列表按页从库中读取)
+                self._add_history_record(recognized_text, source_type, elapsed_time * 1000)
                 # =========================================================
 
-        except concurrent.futures.CancelledError:
+        except OcrCancelledError:
+            self.result_text.delete(1.0, tk.END)
+            self.result_text.insert(tk.END, "识别任务已取消。")
             self.status_var.set(f"状态：任务被取消 (耗时: {time_str})。")
-            logger.warning("OCR 任务被取消。")
+            logger.info("OCR 任务被取消。")
         except Exception as e:
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, f"任务出错: {e}")
@@ -432,7 +642,7 @@ class OcrApp:
         处理语言下拉菜单选择事件，根据需要重新初始化 OCR 模型。
         """
         try:
-            from ocr_engine import init_paddle_ocr, get_rec_model_path_by_lang
+            from ocr_engine import init_paddle_ocr, get_rec_model_path_by_lang, get_cached_ocr
         except ImportError:
             self.status_var.set("错误：无法导入 ocr_engine.py 中的所需函数。")
             return
@@ -460,7 +670,17 @@ class OcrApp:
                 self._set_ui_state(tk.NORMAL)
                 return
 
-            # --- 如果模型路径不同，则执行耗时的初始化 ---
+            # --- 模型池中已有该语言的实例：直接切换，无需加载 ---
+            cached_ocr = get_cached_ocr(new_lang_code)
+            if cached_ocr is not None:
+                self.ocr = cached_ocr
+                self.current_lang_code = new_lang_code
+                self.current_rec_model_path = new_rec_path
+                self.status_var.set(f"状态：模型切换成功 ({selected_lang_name}，已从模型池复用)。")
+                self._set_ui_state(tk.NORMAL)
+                return
+
+            # --- 如果模型路径不同且未缓存，则执行耗时的初始化 ---
             self._set_ui_state(tk.DISABLED)
             self.status_var.set(f"状态：正在加载 {selected_lang_name} 模型，请稍候...")
             self.progressbar.grid(row=0, column=1, sticky='nse', padx=5, pady=5)
@@ -469,7 +689,8 @@ class OcrApp:
             future = self.executor.submit(
                 init_paddle_ocr,
                 lang=new_lang_code,
-                executor=self.executor
+                executor=self.executor,
+                warm_up=True
             )
 
             future.add_done_callback(lambda f: self.master.after(0, self.update_ocr_instance, f))
@@ -522,11 +743,16 @@ class OcrApp:
     # ----------------------------------------------------------------------
     # >>> 截图与识别逻辑 <<<
     # ----------------------------------------------------------------------
-    def screenshot_and_recognize(self):
-        # ... (保持不变) ...
+    def screenshot_and_recognize(self, live=False):
+        """
+        启动截图工具选择区域。
+        :param live: 为 True 时选择区域后进入实时识别模式 (见 toggle_live_capture)
+        """
         if self.executor is None or self.ocr is None or self.screenshot_taker_class is None:
             self.status_var.set("错误：OCR 或截图工具不可用。")
             return
+        self.stop_live_capture()
+        self._live_requested = live
 
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END, "--- 正在启动截图工具... ---")
@@ -536,17 +762,15 @@ class OcrApp:
         self.progressbar.grid_forget()
 
         self.master.withdraw()
-
-        def on_capture_done(img_pil):
-            """
-            截图完成后的回调函数。
-            """
-            self.master.deiconify()
-            self.master.after(0, self._start_recognition_from_image, img_pil)
+        # 主窗口真正隐藏后再截取冻结帧，避免把主窗口截进去
+        self.master.update()
 
         try:
-            taker = self.screenshot_taker_class(on_finish=on_capture_done)
-            taker.take_screenshot()
+            if self.screenshot_taker is None:
+                # 截图工具与其遮罩窗口只创建一次，之后的截图复用
+                self.screenshot_taker = self.screenshot_taker_class(
+                    on_finish=self._on_capture_done, as_array=True, master=self.master)
+            self.screenshot_taker.take_screenshot()
         except Exception as e:
             self.master.deiconify()
             self._set_ui_state(tk.NORMAL)
@@ -555,13 +779,102 @@ class OcrApp:
             self.result_text.insert(tk.END, f"截图工具启动失败: {e}")
             logger.exception("截图工具启动失败。")
 
-    def _start_recognition_from_image(self, img_pil: Image.Image or None, is_file=False):
+    def _on_capture_done(self, img_frame):
+        """
+        截图完成后的回调函数 (在 Tk 主线程中)。img_frame 为冻结帧上的 BGRA NumPy 视图。
+        """
+        self.master.deiconify()
+        region = self.screenshot_taker.region if img_frame is not None else None
+        origin = (region["left"], region["top"]) if region else None
+        if self._live_requested and region:
+            self._live_requested = False
+            self.master.after(0, self._start_live_capture, region)
+            return
+        self._live_requested = False
+        self.master.after(0, lambda: self._start_recognition_from_image(img_frame, origin=origin))
+
+    # ----------------------------------------------------------------------
+    # >>> 实时识别 <<<
+    # ----------------------------------------------------------------------
+    def toggle_live_capture(self):
+        """开始 (先选择区域) 或停止实时识别。"""
+        if self.live_capture is not None:
+            self.stop_live_capture()
+            self.status_var.set("状态：实时识别已停止。")
+        else:
+            self.screenshot_and_recognize(live=True)
+
+    def _start_live_capture(self, region):
+        """按 live_config 周期截取 region，内容变化时提交识别 (有增量识别器时只识别变化的部分)。"""
+        from ocr_live import create_live_capture
+
+        self._set_ui_state(tk.NORMAL)
+        backend = get_capture_backend()
+        origin = (region["left"], region["top"])
+        lang = self.current_lang_code
+
+        def recognize(frame):
+            if self.incremental is not None:
+                job = self.jobs.submit(self.incremental.recognize_text, self.ocr, frame, origin=origin, lang=lang)
+            else:
+                job = self.jobs.submit(self.recognize_func, self.ocr, frame, is_path=False, lang=lang)
+            job.future.add_done_callback(lambda f: self._on_live_job_done(job))
+            return job.future
+
+        self.live_capture = create_live_capture(lambda: backend.grab(region), recognize, on_stop=backend.release)
+        self.live_capture.start()
+        self.live_button.config(text="停止实时识别")
+        self.file_path_var.set(f"实时识别区域: {region['width']}x{region['height']}@{region['left']},{region['top']}")
+        self.result_text.delete(1.0, tk.END)
+        self.status_var.set("状态：实时识别中，区域内容变化时自动识别...")
+
+    def _on_live_job_done(self, job):
+        """由工作线程调用：切回 Tk 主线程显示实时识别结果。"""
+        if not self._closing:
+            self.master.after(0, self._show_live_result, job)
+
+    def _show_live_result(self, job):
+        live = self.live_capture
+        if live is None or job.cancelled:
+            return
+        try:
+            text = job.result()
+        except OcrCancelledError:
+            return
+        except Exception as e:
+            logger.exception(f"实时识别任务出错: {e}")
+            return
+
+        stats = live.stats
+        summary = (f"识别 {stats['recognized']} 次，内容未变 {stats['unchanged']} 帧，"
+                   f"丢弃 {stats['dropped_busy'] + stats['dropped_rate']} 帧")
+        if text.startswith("错误"):
+            self.status_var.set(f"状态：实时识别出错 ({summary})")
+            return
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, text)
+        self.status_var.set(f"状态：实时识别中 ({summary})")
+
+    def stop_live_capture(self):
+        """停止实时识别 (未开启时无操作)。"""
+        live, self.live_capture = self.live_capture, None
+        if live is None:
+            return
+        live.stop()
+        self.live_button.config(text="实时识别")
+
+    def _start_recognition_from_image(self, img_data, is_file=False, source_key=None, origin=None):
         """
         在主线程中处理截图/文件加载结果，显示预览图，并启动异步 OCR 识别。
+        新任务会取代尚未完成的旧任务 (旧任务在下一个检查点中止，结果不再显示)。
+        :param img_data: 截图为 BGRA NumPy 数组，将原样交给识别函数，不再经过 PNG 编解码；
+                         文件为预览缩略图 (PIL Image)，识别任务按 source_key 逐页读取文件
+        :param source_key: 图片来源标识 (文件路径)；与进行中的任务相同时复用该任务
+        :param origin: 截图左上角的屏幕坐标；提供时按增量模式识别 (只重新识别与上一次截图相比变化的区域)
         """
         self._set_ui_state(tk.NORMAL)
 
-        if img_pil is None:
+        if img_data is None:
             self.preview_label.config(image=None, text=PREVIEW_DEFAULT_TEXT, bg='light gray')
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, "截图操作被用户取消或区域无效。")
@@ -569,10 +882,16 @@ class OcrApp:
             return
 
         # 2. **>>> [核心：显示预览图逻辑] <<<**
+        thumbnail_png = None
         try:
-            # 缩放图片
-            thumb = img_pil.copy()
+            # 缩放图片 (截图数组先包装为 PIL 图片，仅用于生成缩略图)
+            if isinstance(img_data, Image.Image):
+                thumb = img_data.copy()
+            else:
+                thumb = bgra_array_to_pil(img_data)
             thumb.thumbnail(PREVIEW_MAX_SIZE)
+            if self.save_thumbnails:
+                thumbnail_png = encode_thumbnail(thumb, PREVIEW_MAX_SIZE)
 
             # 转换为 Tkinter PhotoImage
             self.preview_image = ImageTk.PhotoImage(thumb)
@@ -592,20 +911,7 @@ class OcrApp:
             self.preview_label.config(image=None, text="预览失败", bg='red')
         # ----------------------------------------------------
 
-        # 3. 将 PIL Image 对象转换为内存字节流
-        img_byte_arr = io.BytesIO()
-        try:
-            img_pil.save(img_byte_arr, format='PNG')
-        except Exception as e:
-            self.status_var.set(f"错误：图片转换为字节流失败: {e}")
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"图片转换失败: {e}")
-            logger.exception("PIL Image 转换为字节流失败。")
-            return
-
-        img_bytes = img_byte_arr.getvalue()
-
-        # 4. 启动识别任务 (识别阶段需要再次禁用 UI 并显示进度)
+        # 3. 启动识别任务 (识别阶段需要再次禁用 UI 并显示进度)
         if is_file:
             self.result_text.insert(tk.END, "\n--- 文件加载成功，正在识别... ---")
             self.status_var.set("状态：正在处理文件...")
@@ -615,27 +921,110 @@ class OcrApp:
             self.result_text.insert(tk.END, "--- 截图捕获成功，正在识别... ---")
             self.status_var.set("状态：正在处理截图...")
 
-        self._set_ui_state(tk.DISABLED)
-        self.progressbar.grid(row=0, column=1, sticky='nse', padx=5, pady=5)
-        self.progressbar.start(10)
-
         start_time = time.time()
+        key = (source_key, self.current_lang_code) if source_key else None
+
+        # 4. 提交识别任务：文件按页流式识别，内存中的截图直接交给识别函数 (is_path=False)
+        if is_file and source_key:
+            from ocr_engine import recognize_file_text, get_model_identity
+            identity = get_model_identity(self.current_lang_code) if self.result_cache is not None else None
+            on_page = lambda index, count, _text: self._on_page_done(key, index, count)
+            if is_pdf(source_key):
+                # PDF 各页分发到共享执行器的其他线程并行识别
+                from ocr_pdf import recognize_pdf_text
+                job = self.jobs.submit(
+                    recognize_pdf_text, self.ocr, source_key, lang=self.current_lang_code, cache=self.result_cache,
+                    model_identity=identity, executor=self.executor, on_page=on_page, key=key
+                )
+            else:
+                job = self.jobs.submit(
+                    recognize_file_text, self.ocr, source_key, lang=self.current_lang_code,
+                    cache=self.result_cache, model_identity=identity, on_page=on_page, key=key
+                )
+        elif origin is not None and self.incremental is not None:
+            job = self.jobs.submit(self.incremental.recognize_text, self.ocr, img_data, origin=origin,
+                                   lang=self.current_lang_code, key=key)
+        elif self.result_cache is not None:
+            from ocr_engine import recognize_with_cache, get_model_identity
+            job = self.jobs.submit(
+                recognize_with_cache, self.ocr, img_data, self.result_cache,
+                get_model_identity(self.current_lang_code), is_path=False, lang=self.current_lang_code, key=key
+            )
+        else:
+            job = self.jobs.submit(self.recognize_func, self.ocr, img_data, is_path=False,
+                                   lang=self.current_lang_code, key=key)
 
-        # 5. 提交识别任务 (根据来源使用 is_path=False)
-        future_recognize = self.executor.submit(self.recognize_func, self.ocr, img_bytes, is_path=False)
-        future_recognize.add_done_callback(lambda f: self.master.after(0, self.update_ui_with_result, f, start_time))
+        if job is self.current_job:
+            self.status_var.set("状态：相同图片正在识别中...")
+            return
+        self.current_job = job
+        self._pages_done = 0
+        self._current_thumbnail = thumbnail_png
+        self._set_recognizing(True)
+        job.future.add_done_callback(lambda f: self._on_job_done(job, start_time))
+
+    def _on_job_done(self, job, start_time):
+        """由工作线程调用：切回 Tk 主线程更新界面 (窗口关闭后不再回调)。"""
+        if not self._closing:
+            self.master.after(0, self.update_ui_with_result, job, start_time)
+
+    def _on_page_done(self, key, index, count):
+        """由工作线程调用：多页文件每识别完一页，在状态栏显示进度。"""
+        if count > 1 and not self._closing:
+            self.master.after(0, self._show_page_progress, key, index, count)
+
+    def _show_page_progress(self, key, index, count):
+        job = self.current_job
+        if job is not None and job.key == key and not job.done():
+            # PDF 各页并行识别，完成顺序与页码无关，只显示已完成的页数
+            self._pages_done += 1
+            self.status_var.set(f"状态：已识别 {self._pages_done}/{count} 页...")
+
+    def cancel_recognition(self):
+        """取消当前识别任务：排队中的任务不再执行，执行中的任务在检测 / 识别阶段之间中止。"""
+        if self.current_job is not None and not self.current_job.done():
+            self.current_job.cancel()
+            self.status_var.set("状态：正在取消识别任务...")
+
+    def shutdown(self, timeout=5.0):
+        """程序退出时取消所有识别任务，并等待执行中的任务在检查点退出。"""
+        self._closing = True
+        self.current_job = None
+        self.stop_live_capture()
+        unsubscribe(self._on_config_changed)
+        self.jobs.shutdown(timeout=timeout)
+        if get_capture_backend is not None:
+            get_capture_backend().close()
+
+    def _set_recognizing(self, busy):
+        """
+        识别进行中：显示进度条与取消按钮。选择文件与截图按钮保持可用 (新任务会取代当前任务)，
+        语言切换在识别期间禁用。
+        """
+        if busy:
+            self.progressbar.grid(row=0, column=1, sticky='nse', padx=5, pady=5)
+            self.progressbar.start(10)
+            self.cancel_button.grid()
+        else:
+            self.progressbar.stop()
+            self.progressbar.grid_forget()
+            self.cancel_button.grid_remove()
+        self._set_ui_state(tk.NORMAL)
 
     def _set_ui_state(self, state):
         """辅助函数：统一设置 UI 状态"""
         is_normal = (state == tk.NORMAL)
 
         self.select_button.config(state=state)
-        self.lang_combo.config(state=("readonly" if is_normal else tk.DISABLED))
+        # 识别任务进行中时不允许切换语言 (模型)
+        self.lang_combo.config(state=("readonly" if is_normal and self.current_job is None else tk.DISABLED))
 
         if self.screenshot_taker_class:
             self.screenshot_button.config(state=state)
+            self.live_button.config(state=state)
 
         if is_normal and not self.ocr:
             self.select_button.config(state=tk.DISABLED)
             if self.screenshot_taker_class:
-                self.screenshot_button.config(state=tk.DISABLED)
\ No newline at end of file
+                self.screenshot_button.config(state=tk.DISABLED)
+                self.live_button.config(state=tk.DISABLED)
\ No newline at end of file
@@ -1,71 +1,31 @@
 # main.py
 # ----------------------------------------------------------------------
-# 程序主入口：初始化 OCR 核心模型，配置并启动 Tkinter 图形用户界面 (GUI)。
+# 程序主入口：先显示 Tkinter 图形用户界面 (GUI)，再在后台加载并预热 OCR 模型。
 # ----------------------------------------------------------------------
 
+import time
+
+# 启动计时起点：尽量早于其他导入，统计窗口显示与模型就绪的耗时
+STARTUP_STARTED_AT = time.perf_counter()
+
 import tkinter as tk
 import logging  # 导入 logging 库
 import os  # 用于处理文件路径
-from logging.handlers import RotatingFileHandler  # 导入用于文件滚动记录的 Handler
-# 导入后端逻辑：模型初始化和文字识别函数
-from ocr_engine import init_paddle_ocr, recognize_and_get_text
+# 导入后端逻辑：执行器创建和文字识别函数 (Paddle 在后台加载模型时才导入)
+from ocr_engine import create_executor, recognize_and_get_text, get_model_pool
+# 导入识别结果缓存
+from ocr_cache import create_result_cache
+# 导入识别历史记录存储
+from ocr_history import create_history_store
 # 导入前端界面：GUI 应用类
 from gui_app import OcrApp
-# 导入配置加载器
-from config_loader import get_logging_config
+# 导入日志配置函数
+from utils.logging_setup import setup_logging
+from config_loader import get_logging_config, get_general_config, start_config_watcher
+# 导入性能统计
+from ocr_metrics import get_metrics, start_periodic_dump
 from PIL import Image, ImageTk
 
-# --- 日志配置函数 ---
-def setup_logging():
-    """配置统一的日志系统。（此函数内容保持不变）"""
-    try:
-        log_config = get_logging_config()
-        log_level_str = log_config.get('level', 'INFO').upper()
-        log_file_path = log_config.get('file_path', 'app.log')
-
-        # 转换日志级别字符串为 logging 模块的常量
-        log_level = getattr(logging, log_level_str, logging.INFO)
-
-        # 确定日志文件路径（如果需要，创建目录）
-        log_dir = os.path.dirname(log_file_path)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-
-        # 1. 根日志器配置
-        root_logger = logging.getLogger()
-        root_logger.setLevel(log_level)
-
-        # 2. 定义格式
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-
-        # 3. 添加控制台 Handler
-        if not any(isinstance(handler, logging.StreamHandler) for handler in root_logger.handlers):
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            root_logger.addHandler(console_handler)
-
-        # 4. 添加文件 Handler (使用 RotatingFileHandler 实现日志文件自动滚动)
-        if not any(isinstance(handler, logging.FileHandler) for handler in root_logger.handlers):
-            file_handler = RotatingFileHandler(
-                log_file_path,
-                maxBytes=1024 * 1024 * 5,  # 最大 5MB
-                backupCount=5,  # 保留 5 个备份文件
-                encoding='utf-8'
-            )
-            file_handler.setFormatter(formatter)
-            root_logger.addHandler(file_handler)
-
-        logging.info(f"日志系统初始化完成。级别: {log_level_str}, 文件: {log_file_path}")
-
-    except Exception as e:
-        # 如果日志系统配置失败，至少保证能打印出错误
-        # 此处的 print 是必要的，因为日志系统可能未成功建立
-        print(f"[FATAL ERROR] 无法初始化日志系统: {e}")
-
-
 # ----------------------------------------------------
 # >>> 图标文件路径定义 <<<
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -83,17 +43,22 @@ if __name__ == "__main__":
     logger = logging.getLogger(__name__)  # 获取当前模块的logger实例
 
     # ------------------------------------------------------------------
-    # 2. 初始化 PaddleOCR 模型及线程池 (原 1.)
+    # 2. 创建线程池 (原 1.)
+    # 模型加载耗时较长，改为窗口显示后由 OcrApp.load_model_in_background 在后台完成。
     # ------------------------------------------------------------------
-    logger.info("正在初始化 OCR 引擎...")  # 替换原有提示
-    ocr_instance, executor_instance = init_paddle_ocr(lang='ch')
+    executor_instance = create_executor()
+
+    # 识别结果缓存 (按 config.yaml 的 cache_config 创建，未启用时为 None)
+    result_cache = create_result_cache()
 
-    # 检查模型是否加载成功
-    if ocr_instance is None:
-        # 替换 print
-        logger.error("OCR 模型初始化失败。请检查 config.yaml 配置和 models/ 目录下的模型文件是否存在。")
-        # 即使模型加载失败，程序也允许继续，但 GUI 必须处理功能受限的情况。
-        pass
+    # 识别历史记录 (按 config.yaml 的 history_config 持久化到 SQLite，未启用时为 None)
+    history_store = create_history_store()
+
+    # 按 logging_config.metrics_interval_s 定时把分阶段性能统计写入日志
+    metrics_dump = start_periodic_dump(get_logging_config().get('metrics_interval_s', 0))
+
+    # 按 general_config.reload_interval_s 监视 config.yaml，修改后无需重启即可生效
+    config_watcher = start_config_watcher(get_general_config().get('reload_interval_s', 0))
 
     # ------------------------------------------------------------------
     # 3. 启动 Tkinter GUI 应用 (原 2.)
@@ -141,9 +106,11 @@ if __name__ == "__main__":
     # 实例化 GUI 主界面类，传入所有核心依赖
     app = OcrApp(
         master=root,
-        ocr_instance=ocr_instance,
+        ocr_instance=None,
         executor_instance=executor_instance,
-        recognize_func=recognize_and_get_text
+        recognize_func=recognize_and_get_text,
+        result_cache=result_cache,
+        history_store=history_store
     )
 
     # ------------------------------------------------------------------
@@ -155,7 +122,9 @@ if __name__ == "__main__":
             # 使用 root.protocol 确保在 GUI 关闭时，安全地关闭并发执行器/线程池。
             # wait=False 避免在等待线程结束时造成程序阻塞。
             def on_closing():
-                executor_instance.shutdown(wait=False)
+                # 先取消识别任务并等待执行中的任务在检查点退出，再关闭执行器
+                app.shutdown()
+                executor_instance.shutdown(wait=False, cancel_futures=True)
                 # 替换原有逻辑：在关闭时记录日志
                 logger.info("GUI 窗口关闭，并发执行器已安全关闭。")
                 root.destroy()
@@ -163,6 +132,15 @@ if __name__ == "__main__":
 
             root.protocol("WM_DELETE_WINDOW", on_closing)
 
+        # 窗口首次绘制完成后记录启动耗时，再开始后台加载模型
+        def on_window_ready():
+            elapsed_ms = (time.perf_counter() - STARTUP_STARTED_AT) * 1000
+            logger.info(f"启动耗时：窗口显示 {elapsed_ms:.0f} ms。")
+            app.load_model_in_background(started_at=STARTUP_STARTED_AT)
+
+
+        root.after_idle(on_window_ready)
+
         logger.info("启动 Tkinter 主事件循环。")  # 新增信息
         # 启动 Tkinter 主事件循环，等待用户交互
         root.mainloop()
@@ -172,4 +150,16 @@ if __name__ == "__main__":
         if executor_instance:
             # 替换 print
             logger.info("程序退出，安全关闭并发执行器...")
-            executor_instance.shutdown(wait=False)
\ No newline at end of file
+            app.shutdown(timeout=0)
+            executor_instance.shutdown(wait=False, cancel_futures=True)
+        if result_cache:
+            result_cache.close()
+        if history_store:
+            history_store.close()
+        if metrics_dump:
+            metrics_dump.set()
+        if config_watcher:
+            config_watcher.set()
+        logger.info("OCR 性能统计：\n" + get_metrics().format_summary())
+        # 释放模型池中的实例 (进程池后端会在此关闭工作进程)
+        get_model_pool().clear()
\ No newline at end of file
@@ -0,0 +1,134 @@
+# ocr_async.py
+# ----------------------------------------------------------------------
+# asyncio 接口：在 asyncio 服务中使用 OCR 引擎。
+# - await engine.recognize(img) 返回 OcrResult；
+# - async for index, result in engine.recognize_iter(images) 按完成顺序产出批量结果；
+# - 并发数有上限 (同时在线程中执行推理的任务数)，排队任务数也有上限 (背压)；
+# - 取消排队中的任务会让它不再执行；已在推理中的任务无法中断，其结果被丢弃。
+# 模型加载与 GUI 相同，走 init_paddle_ocr (共享模型池)。
+# ----------------------------------------------------------------------
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from ocr_engine import init_paddle_ocr, recognize, MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOcrEngine:
+    """
+    OCR 引擎的 asyncio 外观。
+    推理在内部线程池中执行，事件循环不会被阻塞。
+    """
+
+    def __init__(self, ocr_instance, max_concurrency=None, max_pending=64, lang=None):
+        """
+        :param ocr_instance: init_paddle_ocr 返回的 OCR 实例
+        :param lang: 语言代码，recognize_text() 按该语言的规则做文本后处理
+        :param max_concurrency: 同时执行推理的最大任务数，默认取 max_workers 与后端并行度中的较大者
+        :param max_pending: 已提交但尚未完成的任务数上限 (含执行中的任务)，超出时 recognize() 等待
+        """
+        if max_concurrency is None:
+            max_concurrency = max(MAX_WORKERS, getattr(ocr_instance, 'parallelism', 1))
+        self.ocr = ocr_instance
+        self.lang = lang
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_pending = max(self.max_concurrency, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ocr-async")
+        self._running = asyncio.Semaphore(self.max_concurrency)
+        self._pending = asyncio.Semaphore(self.max_pending)
+        self._pending_count = 0
+
+    @classmethod
+    async def create(cls, lang='ch', warm_up=True, **kwargs):
+        """
+        在后台线程中加载 (或从模型池复用) 模型并创建引擎，加载期间不阻塞事件循环。
+        :param kwargs: 传给构造函数的 max_concurrency / max_pending
+        """
+        loop = asyncio.get_running_loop()
+        ocr_instance, executor = await loop.run_in_executor(
+            None, lambda: init_paddle_ocr(lang=lang, warm_up=warm_up))
+        # init_paddle_ocr 顺带创建的执行器在这里用不到
+        executor.shutdown(wait=False)
+        if ocr_instance is None:
+            raise RuntimeError(f"OCR 模型初始化失败 (语言: {lang})，请检查 config.yaml 与 models/ 目录。")
+        return cls(ocr_instance, lang=lang, **kwargs)
+
+    @property
+    def pending(self):
+        """当前已提交但尚未完成的任务数。"""
+        return self._pending_count
+
+    async def recognize(self, img_data, is_path=True, block=True):
+        """
+        识别一张图片，返回 OcrResult。
+        :param block: 排队任务已满时是否等待；为 False 时立即抛出 asyncio.QueueFull
+        """
+        if not block and self._pending.locked():
+            raise asyncio.QueueFull(f"OCR 排队任务已满 ({self.max_pending})")
+
+        async with self._pending:
+            self._pending_count += 1
+            try:
+                # 获得执行名额前被取消时，任务从未提交到线程池，也就不会执行
+                async with self._running:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor, recognize, self.ocr, img_data, is_path)
+            finally:
+                self._pending_count -= 1
+
+    async def recognize_text(self, img_data, is_path=True):
+        """识别一张图片，返回与 recognize_and_get_text 相同的纯文本。"""
+        return (await self.recognize(img_data, is_path=is_path)).to_text(self.lang)
+
+    async def recognize_iter(self, images, is_path=True):
+        """
+        批量识别，按完成顺序产出 (序号, OcrResult)。
+        - 最多 max_concurrency 张图片同时在途，输入按需从 images 中取出 (可以是普通或异步可迭代对象)；
+        - 提前结束迭代 (break / aclose) 时，尚未完成的任务会被取消。
+        """
+        in_flight = {}
+
+        async def drain(return_when):
+            done, _ = await asyncio.wait(in_flight, return_when=return_when)
+            return [(in_flight.pop(task), task.result()) for task in done]
+
+        try:
+            index = 0
+            async for img_data in _aiter(images):
+                if len(in_flight) >= self.max_concurrency:
+                    for item in await drain(asyncio.FIRST_COMPLETED):
+                        yield item
+                task = asyncio.ensure_future(self.recognize(img_data, is_path=is_path))
+                in_flight[task] = index
+                index += 1
+
+            while in_flight:
+                for item in await drain(asyncio.FIRST_COMPLETED):
+                    yield item
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def close(self):
+        """等待执行中的推理结束并关闭内部线程池 (模型实例仍保留在模型池中)。"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def _aiter(items):
+    """把普通可迭代对象与异步可迭代对象统一为异步迭代。"""
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
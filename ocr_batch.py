@@ -0,0 +1,323 @@
+# ocr_batch.py
+# ----------------------------------------------------------------------
+# 无界面批处理入口：将目录 / 通配符匹配到的图片流式送入同一个 PaddleOCR 实例，
+# 按 “解码 -> 推理 -> 后处理” 三段流水线执行，结果以 JSONL 格式边完成边写出。
+#
+# 用法示例：
+#   python -m ocr_batch data_test/ -o results.jsonl
+#   python -m ocr_batch "scans/**/*.png" --lang en --decode-workers 4
+# ----------------------------------------------------------------------
+
+import argparse
+import glob
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ocr_engine import (init_paddle_ocr, load_image_array, run_ocr_predict_many, postprocess_texts,
+                        get_model_pool, DET_BATCH_SIZE)
+from ocr_ingest import IMAGE_EXTENSIONS
+from ocr_metrics import get_metrics
+from utils.logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# 流水线队列的结束标记
+_SENTINEL = object()
+
+
+# ======================
+# 1. 输入收集
+# ======================
+def collect_image_paths(target, recursive=False):
+    """
+    根据目录或通配符收集待识别的图片路径（排序后返回，保证输出可复现）。
+    :param target: 目录路径或 glob 模式 (如 "scans/**/*.png")
+    :param recursive: 目录模式下是否递归子目录
+    """
+    if os.path.isdir(target):
+        pattern = os.path.join(target, '**', '*') if recursive else os.path.join(target, '*')
+        candidates = glob.glob(pattern, recursive=recursive)
+        paths = [p for p in candidates if p.lower().endswith(IMAGE_EXTENSIONS)]
+    else:
+        paths = glob.glob(target, recursive=True)
+
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+# ======================
+# 2. 流水线各阶段
+# ======================
+def _decode_worker(path_queue, decode_queue, stop):
+    """解码阶段：从路径队列取任务，解码为 NumPy 数组后放入有界的解码队列；stop 置位后跳过剩余任务。"""
+    while True:
+        item = path_queue.get()
+        if item is _SENTINEL:
+            return
+        if stop.is_set():
+            continue
+
+        index, path = item
+        start = time.perf_counter()
+        try:
+            img_array = load_image_array(path, is_path=True)
+            error = None
+        except Exception as e:
+            logger.warning(f"图片解码失败: {path}: {e}")
+            img_array = None
+            error = f"解码失败: {e}"
+        decode_ms = (time.perf_counter() - start) * 1000
+
+        # 队列已满时阻塞，从而限制内存中同时存在的已解码图片数量
+        decode_queue.put((index, path, img_array, error, decode_ms))
+
+
+def _next_predict_batch(decode_queue, batch_size):
+    """
+    从解码队列凑出一批待推理的图片：先阻塞等待一项，再非阻塞地尽量取满 batch_size 项。
+    :return: (batch, finished)，finished 为 True 表示已收到结束标记
+    """
+    batch = []
+    while len(batch) < batch_size:
+        try:
+            item = decode_queue.get(block=not batch)
+        except queue.Empty:
+            break
+        if item is _SENTINEL:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def _predict_stage(ocr_instance, decode_queue, post_queue, stop, batch_size=1):
+    """推理阶段：按批对解码结果执行推理，直到收到结束标记；stop 置位后只取出并丢弃剩余项。"""
+    finished = False
+    while not finished:
+        batch, finished = _next_predict_batch(decode_queue, batch_size)
+        if not batch or stop.is_set():
+            continue
+
+        ready = [item for item in batch if item[3] is None]
+        start = time.perf_counter()
+        try:
+            predictions = run_ocr_predict_many(ocr_instance, [item[2] for item in ready], batch_size=batch_size)
+        except Exception as e:
+            logger.exception(f"批量推理失败: {e}")
+            predictions = [e] * len(ready)
+        # 一批的推理耗时平均分摊到每张图片
+        predict_ms = (time.perf_counter() - start) * 1000 / max(1, len(ready))
+        results_by_index = {item[0]: result for item, result in zip(ready, predictions)}
+
+        for index, path, img_array, error, decode_ms in batch:
+            ocr_result = None
+            item_predict_ms = 0.0
+            if error is None:
+                ocr_result = results_by_index.get(index)
+                item_predict_ms = predict_ms
+                if isinstance(ocr_result, Exception):
+                    error = f"推理失败: {ocr_result}"
+                    ocr_result = None
+                elif ocr_result is None or ocr_result.texts is None:
+                    error = "返回格式异常"
+                    ocr_result = None
+            # 不再传递图片数组，后处理阶段只需要识别结果
+            post_queue.put((index, path, ocr_result, error, decode_ms, item_predict_ms))
+
+
+def _postprocess(ocr_result, lang):
+    """后处理一张图片的识别结果，返回 (文本, 错误信息)；出错时文本为空，不影响其他图片。"""
+    if ocr_result is None or not ocr_result.texts:
+        return "", None
+    try:
+        return postprocess_texts(ocr_result.texts, lang, ocr_result.polys), None
+    except Exception as e:
+        logger.exception(f"文本后处理失败: {e}")
+        return "", f"后处理失败: {e}"
+
+
+def _write_stage(post_queue, output_stream, stats, stop, with_boxes=False, lang=None):
+    """
+    后处理 / 写出阶段：文本后处理后立即写出一行 JSON，并统计结果。
+    写出失败 (如磁盘已满、管道断开) 时记录到 stats['fatal'] 并置位 stop，
+    之后继续取出队列中的剩余项直到结束标记，使上游阶段不会阻塞在有界队列上。
+    """
+    while True:
+        item = post_queue.get()
+        if item is _SENTINEL:
+            return
+        if stop.is_set():
+            continue
+
+        try:
+            _write_record(item, output_stream, stats, with_boxes, lang)
+        except Exception as e:
+            logger.exception(f"写出识别结果失败，批处理终止: {e}")
+            stats['fatal'] = e
+            stop.set()
+
+
+def _write_record(item, output_stream, stats, with_boxes, lang):
+    """后处理一项并写出一行 JSON。"""
+    index, path, ocr_result, error, decode_ms, predict_ms = item
+    start = time.perf_counter()
+    text, post_error = _postprocess(ocr_result, lang)
+    error = error or post_error
+    post_ms = (time.perf_counter() - start) * 1000
+
+    record = {
+        "index": index,
+        "path": path,
+        "text": text,
+        "error": error,
+        "decode_ms": round(decode_ms, 2),
+        "predict_ms": round(predict_ms, 2),
+        "det_ms": round(ocr_result.det_ms, 2) if ocr_result is not None else 0.0,
+        "rec_ms": round(ocr_result.rec_ms, 2) if ocr_result is not None else 0.0,
+        "post_ms": round(post_ms, 2),
+    }
+    if with_boxes and ocr_result is not None:
+        details = ocr_result.to_dict()
+        record.update({"lines": details["texts"], "scores": details["scores"], "polys": details["polys"]})
+    output_stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output_stream.flush()
+
+    stats['done'] += 1
+    if error:
+        stats['failed'] += 1
+
+
+def run_batch(ocr_instance, image_paths, output_stream, executor, decode_workers=2, queue_size=8,
+              batch_size=1, with_boxes=False, lang=None):
+    """
+    以三段流水线处理一批图片，结果按完成顺序写入 output_stream (JSONL)。
+    :param ocr_instance: 共享的 PaddleOCR 实例
+    :param image_paths: 图片路径列表
+    :param output_stream: 可写的文本流
+    :param executor: 执行解码任务的线程池，其线程数不得少于 decode_workers
+    :param decode_workers: 并行解码线程数
+    :param queue_size: 各阶段之间有界队列的容量
+    :param batch_size: 每次提交给模型的最大图片数 (同尺寸图片才会组成一批)
+    :param with_boxes: 是否在输出中附带每行文本、置信度与文本框坐标
+    :param lang: 语言代码，用于选择文本后处理规则
+    :return: 统计信息字典 {"done": ..., "failed": ..., "elapsed": ...}
+    :raises OSError: 写出结果失败 (剩余图片不再处理)
+    """
+    decode_workers = max(1, int(decode_workers))
+    path_queue = queue.Queue()
+    decode_queue = queue.Queue(maxsize=queue_size)
+    post_queue = queue.Queue(maxsize=queue_size)
+    stats = {'done': 0, 'failed': 0}
+    stop = threading.Event()
+
+    for index, path in enumerate(image_paths):
+        path_queue.put((index, path))
+    for _ in range(decode_workers):
+        path_queue.put(_SENTINEL)
+
+    start = time.perf_counter()
+    writer = threading.Thread(target=_write_stage, args=(post_queue, output_stream, stats, stop, with_boxes, lang),
+                              name="ocr-batch-writer", daemon=True)
+    writer.start()
+
+    decode_futures = [executor.submit(_decode_worker, path_queue, decode_queue, stop) for _ in range(decode_workers)]
+
+    # 推理线程数：进程池后端可同时处理多个请求；线程后端只有一个模型，必须串行使用
+    predict_workers = max(1, int(getattr(ocr_instance, 'parallelism', 1)))
+    predictors = [
+        threading.Thread(target=_predict_stage, args=(ocr_instance, decode_queue, post_queue, stop, batch_size),
+                         name=f"ocr-batch-predict-{i}", daemon=True)
+        for i in range(predict_workers)
+    ]
+    for predictor in predictors:
+        predictor.start()
+
+    # 解码全部完成后，为每个推理线程发送一个结束标记
+    wait(decode_futures)
+    for _ in predictors:
+        decode_queue.put(_SENTINEL)
+    for predictor in predictors:
+        predictor.join()
+
+    post_queue.put(_SENTINEL)
+    writer.join()
+    stats['elapsed'] = time.perf_counter() - start
+    fatal = stats.pop('fatal', None)
+    if fatal is not None:
+        raise fatal
+    return stats
+
+
+# ======================
+# 3. 命令行入口
+# ======================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ocr_batch",
+        description="无界面批量 OCR：识别目录或通配符匹配的图片，结果以 JSONL 输出。"
+    )
+    parser.add_argument("target", help="图片目录或 glob 模式 (如 'scans/**/*.png')")
+    parser.add_argument("-o", "--output", default="ocr_results.jsonl",
+                        help="JSONL 输出文件路径，'-' 表示标准输出，默认 ocr_results.jsonl")
+    parser.add_argument("--lang", default="ch", help="识别语言代码 (见 config.yaml)，默认 ch")
+    parser.add_argument("--recursive", action="store_true", help="目录模式下递归处理子目录")
+    parser.add_argument("--decode-workers", type=int, default=2, help="并行解码线程数，默认 2")
+    parser.add_argument("--queue-size", type=int, default=8, help="流水线队列容量，默认 8")
+    parser.add_argument("--batch-size", type=int, default=DET_BATCH_SIZE,
+                        help=f"每次推理的最大图片数，默认取 config.yaml 的 det_batch_size ({DET_BATCH_SIZE})")
+    parser.add_argument("--with-boxes", action="store_true",
+                        help="输出中附带每行文本 (lines)、置信度 (scores) 与文本框坐标 (polys)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+
+    image_paths = collect_image_paths(args.target, recursive=args.recursive)
+    if not image_paths:
+        logger.error(f"未找到待识别的图片: {args.target}")
+        return 1
+    logger.info(f"共收集到 {len(image_paths)} 张图片，开始批量识别。")
+
+    # 线程池按解码线程数创建，并传给 init_paddle_ocr 复用
+    decode_workers = max(1, args.decode_workers)
+    executor = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="ocr-batch-decode")
+    ocr_instance, executor = init_paddle_ocr(lang=args.lang, executor=executor)
+    if ocr_instance is None:
+        logger.error("OCR 模型初始化失败，批处理终止。")
+        executor.shutdown(wait=False)
+        return 2
+
+    try:
+        if args.output == "-":
+            stats = run_batch(ocr_instance, image_paths, sys.stdout, executor,
+                              decode_workers=decode_workers, queue_size=args.queue_size,
+                              batch_size=args.batch_size, with_boxes=args.with_boxes, lang=args.lang)
+        else:
+            output_dir = os.path.dirname(args.output)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                stats = run_batch(ocr_instance, image_paths, f, executor,
+                                  decode_workers=decode_workers, queue_size=args.queue_size,
+                                  batch_size=args.batch_size, with_boxes=args.with_boxes, lang=args.lang)
+    except OSError as e:
+        logger.error(f"写出识别结果失败，批处理终止: {e}")
+        return 3
+    finally:
+        executor.shutdown(wait=True)
+        get_model_pool().clear()
+
+    logger.info(f"批量识别完成：共 {stats['done']} 张，失败 {stats['failed']} 张，"
+                f"耗时 {stats['elapsed']:.2f} 秒。")
+    logger.info("OCR 性能统计：\n" + get_metrics().format_summary())
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
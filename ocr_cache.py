@@ -0,0 +1,207 @@
+# ocr_cache.py
+# ----------------------------------------------------------------------
+# OCR 识别结果缓存：以解码后像素数据的内容哈希 + 模型标识作为键，
+# 内存 LRU 作为一级缓存，可选的 SQLite 文件作为持久化二级缓存 (按总大小淘汰)。
+# ----------------------------------------------------------------------
+
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config_loader import get_cache_config
+from ocr_ingest import map_file
+
+logger = logging.getLogger(__name__)
+
+
+def compute_image_key(img_array, model_identity):
+    """
+    计算图片内容 + 模型标识的缓存键。
+    - 形状与数据类型一并参与哈希，避免不同尺寸但字节相同的图片冲突；
+    - 使用 blake2b (16 字节摘要)，对大图的哈希耗时远小于一次模型推理。
+    """
+    img_array = np.ascontiguousarray(img_array)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(model_identity).encode('utf-8'))
+    hasher.update(f"{img_array.shape}|{img_array.dtype}".encode('utf-8'))
+    hasher.update(memoryview(img_array).cast('B'))
+    return hasher.hexdigest()
+
+
+def compute_file_key(file_path, model_identity):
+    """
+    按文件内容 (而非解码后的像素) 计算缓存键：文件以内存映射方式参与哈希，命中缓存时完全不需要解码。
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(model_identity).encode('utf-8'))
+    hasher.update(b"file|")
+    with map_file(file_path) as source:
+        if isinstance(source, mmap.mmap):
+            hasher.update(source)
+        else:
+            hasher.update(source.read())
+    return hasher.hexdigest()
+
+
+class _DiskStore:
+    """基于 SQLite 的持久化缓存，超出容量时按最近访问时间淘汰。"""
+
+    def __init__(self, db_path, max_bytes):
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache (last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, text):
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, text, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time())
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # 从最久未访问的记录开始删除，直到总大小回到预算以内
+        removed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        logger.debug(f"磁盘缓存超出容量，已淘汰 {removed} 条记录。")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    OCR 结果缓存：内存 LRU + 可选磁盘持久化。
+    - get() 先查内存，未命中再查磁盘，磁盘命中的结果会提升到内存；
+    - 线程安全，可在执行器的多个工作线程中共用。
+    """
+
+    def __init__(self, memory_entries=128, disk_path=None, disk_max_mb=64):
+        """
+        :param memory_entries: 内存中最多保留的结果条数
+        :param disk_path: SQLite 文件路径，None 表示不启用磁盘缓存
+        :param disk_max_mb: 磁盘缓存中文本的总大小上限 (MB)
+        """
+        self.memory_entries = max(1, int(memory_entries))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskStore(disk_path, int(disk_max_mb * 1024 * 1024)) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return text
+
+        text = None
+        if self._disk is not None:
+            try:
+                text = self._disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"读取磁盘缓存失败: {e}")
+
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._put_memory_locked(key, text)
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._put_memory_locked(key, text)
+        if self._disk is not None:
+            try:
+                self._disk.put(key, text)
+            except sqlite3.Error as e:
+                logger.warning(f"写入磁盘缓存失败: {e}")
+
+    def _put_memory_locked(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """返回命中统计，便于日志或界面展示。"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+
+def create_result_cache():
+    """
+    根据 config.yaml 中的 cache_config 创建结果缓存；未启用时返回 None。
+    """
+    cache_config = get_cache_config()
+    if not cache_config.get('enabled', False):
+        logger.info("结果缓存未启用。")
+        return None
+
+    disk_path = cache_config.get('disk_path') if cache_config.get('disk_enabled', False) else None
+    try:
+        cache = ResultCache(
+            memory_entries=cache_config.get('memory_entries', 128),
+            disk_path=disk_path,
+            disk_max_mb=cache_config.get('disk_max_mb', 64),
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"磁盘缓存初始化失败: {e}，仅使用内存缓存。")
+        cache = ResultCache(memory_entries=cache_config.get('memory_entries', 128))
+
+    logger.info(f"结果缓存已启用 (内存条目: {cache.memory_entries}, 磁盘: {disk_path or '未启用'})。")
+    return cache
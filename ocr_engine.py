@@ -1,17 +1,32 @@
 # ocr_engine.py
 
 import os
+import hashlib
 import inspect
-from paddle import device, set_device
-from paddleocr import PaddleOCR
-from concurrent.futures import ThreadPoolExecutor
+import json
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import time
 import io
-from PIL import Image
+from PIL import Image, ImageDraw
 import numpy as np
 import logging  # <-- 导入 logging
 
 # --- 导入配置加载器 ---
-from config_loader import get_general_config, get_executor_config, get_rec_model_name
+from config_loader import (get_general_config, get_executor_config, get_model_pool_config, get_preprocess_config,
+                           get_rec_model_name, get_languages_config, get_postprocess_config, get_layout_config,
+                           get_pdf_config, subscribe)
+from ocr_cache import compute_image_key, compute_file_key
+from ocr_executor import ResizableThreadPoolExecutor, ExecutorAutoscaler
+from ocr_ingest import pil_to_model_array, iter_pages, read_page
+from ocr_result import OcrResult
+from ocr_metrics import get_metrics
+from ocr_layout import layout_text
+from ocr_postprocess import get_postprocessor
+from ocr_preprocess import resize_to_max_side, plan_tiles, needs_tiling, merge_tile_results
+from ocr_process_pool import ProcessOcrProxy
 
 # 获取当前模块的日志器实例
 logger = logging.getLogger(__name__)
@@ -22,98 +37,611 @@ logger = logging.getLogger(__name__)
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_MODEL_DIR = os.path.join(CURRENT_DIR, 'models')
 
-# 获取通用配置 (det model name)
-GENERAL_CONFIG = get_general_config()
-DET_MODEL_NAME = GENERAL_CONFIG.get('det_model', 'PP-OCRv5_server_det')
+def _load_engine_config():
+    """
+    从 config.yaml 读取引擎使用的配置常量：模块导入时调用一次，配置热加载后再次调用 (见 _on_config_changed)。
+    """
+    global GENERAL_CONFIG, DET_MODEL_NAME, EXECUTOR_CONFIG, MAX_WORKERS, DET_BATCH_SIZE, REC_BATCH_SIZE
+    global EXECUTOR_BACKEND, PROCESS_WORKERS, CPU_THREADS_PER_WORKER, MODEL_POOL_CONFIG, PREPROCESS_CONFIG
+    global MAX_SIDE, TILING_ENABLED, TILE_ASPECT_RATIO, TILE_SIZE, TILE_OVERLAP
+
+    # 获取通用配置 (det model name)
+    GENERAL_CONFIG = get_general_config()
+    DET_MODEL_NAME = GENERAL_CONFIG.get('det_model', 'PP-OCRv5_server_det')
+
+    # 获取执行器配置 (max_workers)
+    EXECUTOR_CONFIG = get_executor_config()
+    MAX_WORKERS = EXECUTOR_CONFIG.get('max_workers', 2)
+    # 批量推理：检测阶段每批图片数、识别阶段每批文本行数
+    DET_BATCH_SIZE = max(1, int(EXECUTOR_CONFIG.get('det_batch_size', 1)))
+    REC_BATCH_SIZE = max(1, int(EXECUTOR_CONFIG.get('rec_batch_size', 6)))
+    # 执行后端：thread (线程池共享一个模型) 或 process (每个工作进程各自加载模型)
+    EXECUTOR_BACKEND = EXECUTOR_CONFIG.get('backend', 'thread')
+    PROCESS_WORKERS = max(1, int(EXECUTOR_CONFIG.get('process_workers', 2)))
+    # 每个工作线程 / 进程的 Paddle 推理线程数：None 为 PaddleOCR 默认值，0 为按 CPU 核数自动分配
+    CPU_THREADS_PER_WORKER = EXECUTOR_CONFIG.get('cpu_threads_per_worker')
 
-# 获取执行器配置 (max_workers)
-EXECUTOR_CONFIG = get_executor_config()
-MAX_WORKERS = EXECUTOR_CONFIG.get('max_workers', 2)
+    # 获取模型池配置 (实例数量 / 内存预算)
+    MODEL_POOL_CONFIG = get_model_pool_config()
+
+    # 超大图片预处理：缩小到最大边长，细长图片沿长边分块
+    PREPROCESS_CONFIG = get_preprocess_config()
+    MAX_SIDE = int(PREPROCESS_CONFIG.get('max_side', 4000) or 0)
+    TILING_ENABLED = bool(PREPROCESS_CONFIG.get('tiling_enabled', True))
+    TILE_ASPECT_RATIO = float(PREPROCESS_CONFIG.get('tile_aspect_ratio', 3.0))
+    TILE_SIZE = max(1, int(PREPROCESS_CONFIG.get('tile_size', 2000)))
+    TILE_OVERLAP = max(0, int(PREPROCESS_CONFIG.get('tile_overlap', 120)))
+
+
+_load_engine_config()
 
 
 # ----------------------
 
 
-def init_paddle_ocr(lang='ch', det_path=None, rec_path=None, executor=None):
+# ======================
+# 1. 模型池
+# ======================
+def _estimate_model_size_mb(model_dir):
+    """以模型目录下文件总大小粗略估算加载后占用的内存 (MB)。"""
+    if not model_dir or not os.path.isdir(model_dir):
+        return 0.0
+    total = 0
+    for name in os.listdir(model_dir):
+        file_path = os.path.join(model_dir, name)
+        if os.path.isfile(file_path):
+            total += os.path.getsize(file_path)
+    return total / (1024 * 1024)
+
+
+class OcrModelPool:
     """
-    初始化 PaddleOCR 与线程池。
-    - 根据 lang 参数自动确定模型路径。
+    按 (检测模型目录, 识别模型目录) 缓存已初始化 PaddleOCR 实例的 LRU 池。
+    - 识别模型相同的语言 (如 ch / chinese_cht / japan) 共用同一个实例；
+    - 检测模型相同的实例共用同一个检测模型：新实例加载后换上池中已有的检测模型，自身加载的副本随即释放；
+      内存预算中每个检测模型只计算一次；
+    - 超出实例数量上限或内存预算时，淘汰最久未使用的实例。
+    """
+
+    def __init__(self, max_instances=3, max_memory_mb=0):
+        """
+        :param max_instances: 最多保留的实例数量 (至少为 1)
+        :param max_memory_mb: 按模型文件大小估算的内存预算，0 表示不限制
+        """
+        self.max_instances = max(1, int(max_instances))
+        self.max_memory_mb = float(max_memory_mb or 0)
+        self._entries = OrderedDict()  # key -> (ocr_instance, 识别模型 size_mb)
+        self._det_sizes = {}  # 检测模型目录 -> size_mb
+        self._lock = threading.Lock()  # 保护 _entries
+        self._load_lock = threading.Lock()  # 串行化模型加载，避免同一模型被重复加载
+
+    @staticmethod
+    def make_key(det_path, rec_path):
+        return (os.path.normpath(det_path), os.path.normpath(rec_path))
+
+    def peek(self, det_path, rec_path):
+        """返回已缓存的实例 (并标记为最近使用)；未缓存时返回 None，不触发加载。"""
+        key = self.make_key(det_path, rec_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_or_create(self, det_path, rec_path, factory):
+        """
+        获取实例；未缓存时调用 factory() 加载并放入池中。
+        :param factory: 无参可调用对象，返回新的 OCR 实例
+        """
+        cached = self.peek(det_path, rec_path)
+        if cached is not None:
+            logger.info(f"从模型池复用 OCR 实例: {os.path.basename(rec_path)}")
+            return cached
+
+        key = self.make_key(det_path, rec_path)
+        with self._load_lock:
+            # 等待加载锁期间，其他线程可能已完成同一模型的加载
+            cached = self.peek(det_path, rec_path)
+            if cached is not None:
+                return cached
+
+            ocr_instance = factory()
+            size_mb = _estimate_model_size_mb(rec_path)
+            det_size_mb = _estimate_model_size_mb(det_path)
+
+            with self._lock:
+                donor = next((entry[0] for other, entry in self._entries.items() if other[0] == key[0]), None)
+                self._det_sizes[key[0]] = det_size_mb
+            if donor is not None and _share_detector(donor, ocr_instance):
+                logger.info(f"新实例复用已加载的检测模型: {os.path.basename(det_path)}")
+
+            with self._lock:
+                self._entries[key] = (ocr_instance, size_mb)
+                self._evict_locked(keep_key=key)
+
+        return ocr_instance
+
+    def _evict_locked(self, keep_key):
+        """在持有 _lock 的情况下，按数量与内存预算淘汰最久未使用的实例。"""
+        while len(self._entries) > 1:
+            over_count = len(self._entries) > self.max_instances
+            over_memory = self.max_memory_mb > 0 and self.total_size_mb() > self.max_memory_mb
+            if not (over_count or over_memory):
+                break
+
+            oldest_key = next(iter(self._entries))
+            if oldest_key == keep_key:
+                break
+            ocr_instance, size_mb = self._entries.pop(oldest_key)
+            logger.info(f"模型池已满，淘汰 OCR 实例: {os.path.basename(oldest_key[1])} (约 {size_mb:.1f} MB)")
+            _close_ocr_instance(ocr_instance)
+
+    def resize(self, max_instances, max_memory_mb=0):
+        """调整实例数量上限与内存预算，超出部分立即按 LRU 淘汰。"""
+        with self._lock:
+            self.max_instances = max(1, int(max_instances))
+            self.max_memory_mb = float(max_memory_mb or 0)
+            self._evict_locked(keep_key=next(reversed(self._entries), None))
+
+    def retain(self, keys):
+        """
+        只保留 keys (make_key() 的返回值) 中的实例，其余实例释放。
+        用于配置变更后淘汰不再被任何语言使用的模型，未变化的模型保持加载状态。
+        :return: 被淘汰的实例数量
+        """
+        keys = set(keys)
+        with self._lock:
+            stale = [key for key in self._entries if key not in keys]
+            entries = [self._entries.pop(key) for key in stale]
+        for key, (ocr_instance, _) in zip(stale, entries):
+            logger.info(f"配置已变更，释放不再使用的 OCR 实例: {os.path.basename(key[1])}")
+            _close_ocr_instance(ocr_instance)
+        return len(stale)
+
+    def total_size_mb(self):
+        """估算的总内存：各实例的识别模型，加上池中用到的每个检测模型 (共用的检测模型只计一次)。"""
+        det_paths = {key[0] for key in self._entries}
+        return (sum(size_mb for _, size_mb in self._entries.values())
+                + sum(self._det_sizes.get(det_path, 0.0) for det_path in det_paths))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """清空模型池并释放所有实例。"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for ocr_instance, _ in entries:
+            _close_ocr_instance(ocr_instance)
+
+
+def _close_ocr_instance(ocr_instance):
+    """释放实例持有的外部资源 (若实例提供 close 方法)。"""
+    close = getattr(ocr_instance, 'close', None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"释放 OCR 实例时出错: {e}")
+
+
+_MODEL_POOL = None
+_MODEL_POOL_LOCK = threading.Lock()
+
+
+def get_model_pool():
+    """获取进程内共享的默认模型池 (首次调用时按 config.yaml 创建)。"""
+    global _MODEL_POOL
+    with _MODEL_POOL_LOCK:
+        if _MODEL_POOL is None:
+            _MODEL_POOL = OcrModelPool(
+                max_instances=MODEL_POOL_CONFIG.get('max_instances', 3),
+                max_memory_mb=MODEL_POOL_CONFIG.get('max_memory_mb', 0),
+            )
+        return _MODEL_POOL
+
+
+# ======================
+# 2. 模型初始化
+# ======================
+def resolve_model_paths(lang='ch', det_path=None, rec_path=None):
+    """
+    确定最终的检测 / 识别模型目录。
+    - 未传入 det_path 时使用 config.yaml 中的 det_model；
+    - 未传入 rec_path 时根据 lang 查找识别模型。
+    """
+    # a. 确定检测模型路径 (Det)：如果未传入 det_path，则自动查找
+    if det_path is None:
+        final_det_path = os.path.join(BASE_MODEL_DIR, DET_MODEL_NAME)
+    else:
+        final_det_path = det_path
+
+    # b. 确定识别模型路径 (Rec)：如果未传入 rec_path，则根据 lang 查找
+    if rec_path is None:
+        # --- 通过配置加载器动态获取识别模型目录名 ---
+        rec_model_dir_name = get_rec_model_name(lang)
+        if rec_model_dir_name is None:
+            raise ValueError(f"不支持的语言代码: {lang}。请检查 config.yaml。")
+
+        final_rec_path = os.path.join(BASE_MODEL_DIR, rec_model_dir_name)
+    else:
+        final_rec_path = rec_path
+
+    return final_det_path, final_rec_path
+
+
+def _create_ocr_instance(lang, final_det_path, final_rec_path, cpu_threads=None):
+    """
+    检测设备并加载一个新的 PaddleOCR 实例 (耗时操作)。
+    :param cpu_threads: CPU 推理时 Paddle 使用的线程数，None 表示使用 PaddleOCR 默认值
+    """
+    # Paddle / PaddleOCR 导入耗时约 2 秒，延迟到首次加载模型时进行，避免拖慢程序启动
+    from paddle import device, set_device
+    from paddleocr import PaddleOCR
+
+    logger.info("正在检测可用设备...")
+    has_cuda = device.is_compiled_with_cuda()
+    current_device = "gpu" if has_cuda else "cpu"
+    logger.info(f"检测结果：{current_device.upper()} 模式。")
+    set_device(current_device)
+
+    logger.info(f"正在初始化 PaddleOCR (语言: {lang})...")
+
+    ocr_kwargs = {
+        'lang': lang,
+        'use_doc_orientation_classify': False,
+        'use_doc_unwarping': False,
+        'use_textline_orientation': False
+    }
+
+    # 检查路径是否为有效目录，并设置 det_model_dir
+    if os.path.isdir(final_det_path):
+        ocr_kwargs['det_model_dir'] = final_det_path
+        logger.info(f"Det 模型路径: {final_det_path}")
+    else:
+        logger.warning(f"检测模型目录不存在: {final_det_path}，PaddleOCR 将尝试使用默认行为。")
+
+    # 检查路径是否为有效目录，并设置 rec_model_dir
+    if os.path.isdir(final_rec_path):
+        ocr_kwargs['rec_model_dir'] = final_rec_path
+        logger.info(f"Rec 模型路径: {final_rec_path}")
+    else:
+        logger.warning(f"识别模型目录不存在: {final_rec_path}，PaddleOCR 将尝试使用默认行为。")
+
+    # 检查 use_gpu / 识别批大小参数
+    ocr_params = inspect.signature(PaddleOCR).parameters
+    if "use_gpu" in ocr_params:
+        ocr_kwargs['use_gpu'] = has_cuda
+    if "text_recognition_batch_size" in ocr_params:
+        ocr_kwargs['text_recognition_batch_size'] = REC_BATCH_SIZE
+    if cpu_threads:
+        ocr_kwargs['cpu_threads'] = int(cpu_threads)
+
+    ocr_instance = PaddleOCR(**ocr_kwargs)
+    _apply_det_batch_size(ocr_instance, DET_BATCH_SIZE)
+    _instrument_stages(ocr_instance)
+    logger.info(f"PaddleOCR 初始化完成 ({current_device.upper()}, 语言: {lang})。")
+    return ocr_instance
+
+
+# ======================
+# 阶段耗时统计 (检测 / 识别)
+# ======================
+# 每个线程各自累计当前一次 predict() 中各阶段的耗时，多个线程共用一个模型时互不干扰
+_STAGE_TIMES = threading.local()
+
+
+def reset_stage_times():
+    """清零当前线程的阶段耗时，在每次 predict() 之前调用。"""
+    _STAGE_TIMES.values = {}
+
+
+def get_stage_times():
+    """返回当前线程自上次 reset_stage_times() 以来各阶段的累计耗时 (毫秒)。"""
+    return dict(getattr(_STAGE_TIMES, 'values', {}))
+
+
+def _add_stage_time(stage, elapsed_ms):
+    values = getattr(_STAGE_TIMES, 'values', None)
+    if values is None:
+        values = _STAGE_TIMES.values = {}
+    values[stage] = values.get(stage, 0.0) + elapsed_ms
+
+
+# ======================
+# 任务取消 (在检测 / 识别阶段之间检查)
+# ======================
+class OcrCancelledError(Exception):
+    """识别任务已被取消 (在阶段之间的检查点抛出)。"""
+
+
+# 当前线程正在执行的任务的取消标记 (threading.Event)
+_CANCEL_TOKEN = threading.local()
+
+
+@contextmanager
+def cancellation_scope(token):
     """
+    在 with 块内，当前线程的识别会在每个检查点 (检测前、识别前、每个分块前) 检查 token，
+    token 被 set() 后抛出 OcrCancelledError，不再执行后续阶段。
+    """
+    previous = getattr(_CANCEL_TOKEN, 'event', None)
+    _CANCEL_TOKEN.event = token
     try:
-        # 替换 print
-        logger.info("正在检测可用设备...")
-        has_cuda = device.is_compiled_with_cuda()
-        current_device = "gpu" if has_cuda else "cpu"
-        # 替换 print
-        logger.info(f"检测结果：{current_device.upper()} 模式。")
-        set_device(current_device)
+        yield
+    finally:
+        _CANCEL_TOKEN.event = previous
 
-        # 替换 print
-        logger.info(f"正在初始化 PaddleOCR (语言: {lang})...")
 
-        # 线程执行器：如果外部未提供，则在这里创建
-        if executor is None:
-            # --- 使用配置中的最大线程数 ---
-            executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
-            # 替换 print
-            logger.info(f"线程执行器已创建，最大线程数: {MAX_WORKERS}")
-        else:
-            # 替换 print
-            logger.info(f"使用传入的线程执行器。")
+def current_cancellation_token():
+    """当前线程所在任务的取消标记；把任务拆分到其他线程执行时，用它为子任务建立相同的 cancellation_scope。"""
+    return getattr(_CANCEL_TOKEN, 'event', None)
 
-        # --- 1. 确定最终模型路径 ---
 
-        # a. 确定检测模型路径 (Det)：如果未传入 det_path，则自动查找
-        if det_path is None:
-            final_det_path = os.path.join(BASE_MODEL_DIR, DET_MODEL_NAME)
-        else:
-            final_det_path = det_path
+def check_cancelled():
+    """检查点：当前任务已被取消时抛出 OcrCancelledError。"""
+    token = getattr(_CANCEL_TOKEN, 'event', None)
+    if token is not None and token.is_set():
+        raise OcrCancelledError("识别任务已取消")
 
-        # b. 确定识别模型路径 (Rec)：如果未传入 rec_path，则根据 lang 查找
-        if rec_path is None:
-            # --- 通过配置加载器动态获取识别模型目录名 ---
-            rec_model_dir_name = get_rec_model_name(lang)
-            if rec_model_dir_name is None:
-                raise ValueError(f"不支持的语言代码: {lang}。请检查 config.yaml。")
 
-            final_rec_path = os.path.join(BASE_MODEL_DIR, rec_model_dir_name)
-        else:
-            final_rec_path = rec_path
-
-        # --- 2. 构建 OCR 参数 ---
-
-        ocr_kwargs = {
-            'lang': lang,
-            'use_doc_orientation_classify': False,
-            'use_doc_unwarping': False,
-            'use_textline_orientation': False
-        }
-
-        # 检查路径是否为有效目录，并设置 det_model_dir
-        if os.path.isdir(final_det_path):
-            ocr_kwargs['det_model_dir'] = final_det_path
-            # 替换 print
-            logger.info(f"Det 模型路径: {final_det_path}")
-        else:
-            # 替换 print 为 logger.warning
-            logger.warning(f"检测模型目录不存在: {final_det_path}，PaddleOCR 将尝试使用默认行为。")
-
-        # 检查路径是否为有效目录，并设置 rec_model_dir
-        if os.path.isdir(final_rec_path):
-            ocr_kwargs['rec_model_dir'] = final_rec_path
-            # 替换 print
-            logger.info(f"Rec 模型路径: {final_rec_path}")
+class _TimedStage:
+    """
+    包装流水线中的子模型 (检测 / 识别)：子模型以生成器形式逐项产出结果，
+    这里统计每次取下一项所花费的时间，累计到当前线程的阶段耗时中。
+    """
+
+    def __init__(self, model, stage):
+        self._model = model
+        self._stage = stage
+
+    def __call__(self, *args, **kwargs):
+        # 检测 / 识别阶段开始前的取消检查点
+        check_cancelled()
+        iterator = iter(self._model(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                _add_stage_time(self._stage, (time.perf_counter() - start) * 1000)
+                return
+            _add_stage_time(self._stage, (time.perf_counter() - start) * 1000)
+            yield item
+
+    def __getattr__(self, name):
+        # 其余属性 (如 set_predictor) 透传给原模型
+        return getattr(self._model, name)
+
+
+def _inner_pipelines(ocr_instance):
+    """取出 PaddleOCR 内部实际执行推理的流水线对象 (单设备或多设备)。"""
+    pipeline = getattr(ocr_instance, 'paddlex_pipeline', None)
+    if pipeline is None:
+        return []
+    inner = pipeline.__dict__.get('_pipeline')
+    if inner is not None:
+        return [inner]
+    executor = pipeline.__dict__.get('_executor')
+    return list(getattr(executor, 'pipelines', []))
+
+
+def _instrument_stages(ocr_instance):
+    """为检测、识别子模型加上耗时统计；不支持的 PaddleOCR 版本只记录 total 耗时。"""
+    pipelines = _inner_pipelines(ocr_instance)
+    for pipeline in pipelines:
+        for attr, stage in (('text_det_model', 'det'), ('text_rec_model', 'rec')):
+            model = getattr(pipeline, attr, None)
+            if model is not None and not isinstance(model, _TimedStage):
+                setattr(pipeline, attr, _TimedStage(model, stage))
+    if not pipelines:
+        logger.warning("当前 PaddleOCR 版本不支持分阶段计时，结果中仅包含总耗时。")
+
+
+def _share_detector(source, target):
+    """
+    把 source 内部流水线的检测模型赋给 target 的对应流水线，target 原有的检测模型不再被引用而释放。
+    两者须使用同一个检测模型目录；不支持的实例 (如进程池代理) 返回 False。
+    """
+    sources, targets = _inner_pipelines(source), _inner_pipelines(target)
+    if not targets or len(sources) != len(targets):
+        return False
+    detectors = [getattr(pipeline, 'text_det_model', None) for pipeline in sources]
+    if any(detector is None for detector in detectors):
+        return False
+    for pipeline, detector in zip(targets, detectors):
+        pipeline.text_det_model = detector
+    return True
+
+
+def _apply_det_batch_size(ocr_instance, det_batch_size):
+    """
+    设置检测阶段的批大小 (PaddleOCR 未在构造参数中暴露该项)。
+    - 流水线按该值把输入列表切分成批，检测模型按同样大小组批推理；
+    - 检测模型组批要求同一批内图片尺寸一致，recognize_many 会按尺寸分组提交。
+    """
+    pipeline = getattr(ocr_instance, 'paddlex_pipeline', None)
+    if pipeline is None or det_batch_size <= 1:
+        return
+    try:
+        pipeline.batch_sampler.batch_size = det_batch_size
+        pipeline.text_det_model.set_predictor(batch_size=det_batch_size)
+        logger.info(f"检测批大小: {det_batch_size}，识别批大小: {REC_BATCH_SIZE}")
+    except AttributeError as e:
+        logger.warning(f"当前 PaddleOCR 版本不支持设置检测批大小: {e}")
+
+
+def _create_backend_instance(lang, final_det_path, final_rec_path):
+    """按 executor_config.backend 创建 OCR 实例：本进程内的 PaddleOCR，或进程池代理。"""
+    if EXECUTOR_BACKEND == 'process':
+        return ProcessOcrProxy(lang, final_det_path, final_rec_path,
+                               workers=PROCESS_WORKERS, cpu_threads=_cpu_threads_per_worker())
+    if EXECUTOR_BACKEND != 'thread':
+        logger.warning(f"未知的执行后端: {EXECUTOR_BACKEND}，使用默认的 thread 后端。")
+    return _create_ocr_instance(lang, final_det_path, final_rec_path, cpu_threads=_cpu_threads_per_worker())
+
+
+def _cpu_threads_per_worker():
+    """
+    每个工作者的 Paddle 推理线程数。配置为 0 时把 CPU 核数平均分给最大并发数
+    (thread 后端为 max_workers，process 后端为进程数)，满负载时推理线程总数不超过核数。
+    """
+    if CPU_THREADS_PER_WORKER == 0:
+        workers = PROCESS_WORKERS if EXECUTOR_BACKEND == 'process' else MAX_WORKERS
+        return max(1, (os.cpu_count() or 1) // max(1, workers))
+    return CPU_THREADS_PER_WORKER
+
+
+# create_executor() 创建的执行器，配置热加载后按新的 max_workers 调整
+_EXECUTORS = weakref.WeakSet()
+
+
+def _executor_size():
+    """进程后端下，线程只负责等待工作进程返回，线程数至少与进程数相同才能并行。"""
+    if EXECUTOR_BACKEND == 'process':
+        return max(MAX_WORKERS, PROCESS_WORKERS)
+    return MAX_WORKERS
+
+
+def _apply_executor_policy(executor):
+    """
+    按 executor_config 设置执行器的并发策略：
+    autoscale 启用时并发数在 min_workers ~ max_workers 之间随排队任务数与 CPU 占用伸缩，否则固定为 max_workers。
+    """
+    max_workers = _executor_size()
+    if not EXECUTOR_CONFIG.get('autoscale', False):
+        if executor.autoscaler is not None:
+            executor.autoscaler.stop()
+        executor.set_max_workers(max_workers)
+        return
+
+    policy = dict(
+        min_workers=EXECUTOR_CONFIG.get('min_workers', 1),
+        max_workers=max_workers,
+        scale_up_queue=EXECUTOR_CONFIG.get('scale_up_queue', 1),
+        cpu_high=EXECUTOR_CONFIG.get('cpu_high', 0.85),
+        scale_down_idle=EXECUTOR_CONFIG.get('scale_down_idle', 5),
+    )
+    if executor.autoscaler is not None:
+        executor.autoscaler.configure(**policy)
+    else:
+        ExecutorAutoscaler(executor, **policy).start(EXECUTOR_CONFIG.get('scale_interval_s', 1.0))
+
+
+def create_executor():
+    """
+    按配置创建线程执行器 (不加载模型，可在程序启动时立即调用)。
+    执行器的并发策略会随 executor_config 的热加载自动调整。
+    """
+    max_workers = _executor_size()
+    if EXECUTOR_CONFIG.get('autoscale', False):
+        # 从下限开始，有排队任务时再逐步扩容
+        max_workers = min(max(1, int(EXECUTOR_CONFIG.get('min_workers', 1))), max_workers)
+    executor = ResizableThreadPoolExecutor(max_workers=max_workers)
+    _apply_executor_policy(executor)
+    _EXECUTORS.add(executor)
+    logger.info(f"线程执行器已创建，当前线程数: {executor.max_workers}，上限: {_executor_size()}")
+    return executor
+
+
+def _configured_model_keys():
+    """config.yaml 中各语言当前对应的模型池键。"""
+    keys = set()
+    for lang in get_languages_config():
+        try:
+            keys.add(OcrModelPool.make_key(*resolve_model_paths(lang.get('code'))))
+        except ValueError:
+            continue
+    return keys
+
+
+@subscribe
+def _on_config_changed(sections):
+    """
+    配置热加载后的处理 (在配置监视线程中执行)：
+    - 刷新模块级配置常量，之后的识别按新的预处理 / 批大小参数执行；
+    - 检测模型或语言配置变化时，只释放不再被任何语言使用的模型，其他模型保持加载；
+    - 按新配置调整模型池上限与执行器并发数。
+    """
+    old_backend, old_cpu_threads = EXECUTOR_BACKEND, CPU_THREADS_PER_WORKER
+    _load_engine_config()
+
+    if _MODEL_POOL is not None:
+        if sections & {'general_config', 'supported_languages'}:
+            _MODEL_POOL.retain(_configured_model_keys())
+        if 'model_pool_config' in sections:
+            _MODEL_POOL.resize(MODEL_POOL_CONFIG.get('max_instances', 3), MODEL_POOL_CONFIG.get('max_memory_mb', 0))
+
+    if 'executor_config' in sections:
+        for executor in list(_EXECUTORS):
+            _apply_executor_policy(executor)
+        logger.info(f"执行器并发上限已调整为 {_executor_size()}")
+        if (EXECUTOR_BACKEND, CPU_THREADS_PER_WORKER) != (old_backend, old_cpu_threads):
+            logger.warning("执行后端或推理线程数已修改，新设置对之后加载的模型生效 (已加载的模型不受影响)。")
+
+
+def _make_warm_up_image():
+    """生成一张带文字的小图：检测与识别两个阶段都会被执行到。"""
+    img = Image.new('RGB', (320, 64), 'white')
+    ImageDraw.Draw(img).text((12, 20), "PaddleOCR 123", fill='black')
+    return pil_to_model_array(img)
+
+
+def warm_up_ocr(ocr_instance):
+    """
+    用一张小图执行一次推理，提前完成算子初始化与内存分配，避免首次真实识别变慢。
+    预热失败不影响后续使用，仅记录警告。
+    :return: 预热耗时 (秒)
+    """
+    start = time.perf_counter()
+    try:
+        ocr_instance.predict(_make_warm_up_image())
+    except Exception as e:
+        logger.warning(f"模型预热失败: {e}")
+    elapsed = time.perf_counter() - start
+    logger.info(f"模型预热完成，耗时 {elapsed:.2f} 秒。")
+    return elapsed
+
+
+def init_paddle_ocr(lang='ch', det_path=None, rec_path=None, executor=None, pool=None, warm_up=False,
+                    progress=None):
+    """
+    初始化 PaddleOCR 与线程池。
+    - 根据 lang 参数自动确定模型路径；
+    - 实例从模型池获取，已加载过的 (检测, 识别) 模型组合会直接复用，无需重新加载。
+    :param pool: 使用的模型池，默认为 get_model_pool() 返回的共享池
+    :param warm_up: 新加载的模型是否执行一次预热推理 (从模型池复用的实例不再预热)
+    :param progress: 可选回调 progress(message)，在加载的各个阶段被调用 (在调用线程中执行)
+    """
+    def report(message):
+        if progress is not None:
+            progress(message)
+
+    def load():
+        report(f"正在加载 {lang} 模型...")
+        instance = _create_backend_instance(lang, final_det_path, final_rec_path)
+        if warm_up:
+            report("正在预热模型...")
+            warm_up_ocr(instance)
+        return instance
+
+    try:
+        # 线程执行器：如果外部未提供，则在这里创建
+        if executor is None:
+            executor = create_executor()
         else:
-            # 替换 print 为 logger.warning
-            logger.warning(f"识别模型目录不存在: {final_rec_path}，PaddleOCR 将尝试使用默认行为。")
+            logger.info(f"使用传入的线程执行器。")
 
-        # 检查 use_gpu 参数
-        if "use_gpu" in inspect.signature(PaddleOCR).parameters:
-            ocr_kwargs['use_gpu'] = has_cuda
+        # --- 1. 确定最终模型路径 ---
+        final_det_path, final_rec_path = resolve_model_paths(lang, det_path, rec_path)
 
-        ocr_instance = PaddleOCR(**ocr_kwargs)
-        # 替换 print
-        logger.info(f"PaddleOCR 初始化完成 ({current_device.upper()}, 语言: {lang})。")
+        # --- 2. 从模型池获取 (或加载) OCR 实例 ---
+        if pool is None:
+            pool = get_model_pool()
+        ocr_instance = pool.get_or_create(final_det_path, final_rec_path, load)
 
         return ocr_instance, executor
 
@@ -123,81 +651,522 @@ def init_paddle_ocr(lang='ch', det_path=None, rec_path=None, executor=None):
         return None, executor
 
 
-# recognize_and_get_text 函数保持不变
-def recognize_and_get_text(ocr_instance, img_data, is_path=True):
+def get_cached_ocr(lang, pool=None):
     """
-    执行 OCR 并返回纯文本
-    :param ocr_instance: PaddleOCR 实例
+    若 lang 对应的模型组合已在模型池中，直接返回该实例；否则返回 None (不触发加载)。
+    """
+    try:
+        final_det_path, final_rec_path = resolve_model_paths(lang)
+    except ValueError:
+        return None
+    if pool is None:
+        pool = get_model_pool()
+    return pool.peek(final_det_path, final_rec_path)
+
+
+# ======================
+# 3. 图片输入与识别
+# ======================
+def to_model_input(img_data):
+    """
+    将内存中的图片 (PIL Image 或 NumPy 数组) 规整为可直接送入 PaddleOCR 的数组。
+    - NumPy 数组按 PaddleOCR / OpenCV 约定视为 BGR (HxWx3) 或 BGRA (HxWx4，例如 mss 截图缓冲区)；
+    - BGRA 只通过切片视图丢弃 Alpha 通道，最终仅在必要时做一次连续化拷贝。
+    """
+    with get_metrics().timer('preprocess'):
+        return _normalize_model_input(img_data)
+
+
+def _normalize_model_input(img_data):
+    if isinstance(img_data, Image.Image):
+        return pil_to_model_array(img_data)
+
+    if not isinstance(img_data, np.ndarray):
+        raise TypeError(f"不支持的图片输入类型: {type(img_data).__name__}")
+
+    if img_data.dtype != np.uint8:
+        raise ValueError(f"图片数组必须为 uint8 类型，实际为: {img_data.dtype}")
+
+    if img_data.ndim == 2:
+        # 灰度图：扩展为 3 通道 (此处会产生一次拷贝)
+        return np.repeat(img_data[:, :, np.newaxis], 3, axis=2)
+
+    if img_data.ndim != 3 or img_data.shape[2] not in (3, 4):
+        raise ValueError(f"不支持的图片数组形状: {img_data.shape}")
+
+    if img_data.shape[2] == 4:
+        img_data = img_data[:, :, :3]
+
+    return np.ascontiguousarray(img_data)
+
+
+def load_image_array(img_data, is_path=True):
+    """
+    将图片路径或字节流解码为 BGR NumPy 数组 (PaddleOCR 约定的通道顺序)。
     :param img_data: 图片路径 (str) 或 图片字节流 (bytes)
     :param is_path: True 表示 img_data 是路径，False 表示是字节流
     """
-    if ocr_instance is None:
-        return "错误：OCR 未初始化。"
+    with get_metrics().timer('decode'):
+        if is_path:
+            with Image.open(img_data) as img_pil:
+                return pil_to_model_array(img_pil)
 
-    if is_path and not os.path.exists(img_data):
-        return f"错误：图片文件未找到: {img_data}"
+        with Image.open(io.BytesIO(img_data)) as img_pil:
+            return pil_to_model_array(img_pil)
 
-    try:
-        # ... (图片输入处理、OCR 调用和后处理逻辑保持不变) ...
-        # 兼容处理：如果不是路径，我们需要将字节流转换为 NumPy 数组
-        if not is_path:
-            image_stream = io.BytesIO(img_data)
-            img_pil = Image.open(image_stream).convert('RGB')
-            img_input = np.array(img_pil)
-        else:
-            img_input = img_data  # 路径 (str)
 
-        # 关键调用：img_input 现在是路径 (str) 或 NumPy 数组 (np.ndarray)，符合 PaddleOCR 要求
-        if hasattr(ocr_instance, 'predict'):
-            result = ocr_instance.predict(img_input)
+def _call_predict(ocr_instance, img_input):
+    """调用 PaddleOCR 推理，返回 (原始结果列表, 各阶段耗时, 总耗时 ms)。"""
+    reset_stage_times()
+    start = time.perf_counter()
+    # 关键调用：img_input 是路径 (str)、NumPy 数组 (np.ndarray) 或其列表，符合 PaddleOCR 要求
+    if hasattr(ocr_instance, 'predict'):
+        result = ocr_instance.predict(img_input)
+    else:
+        result = ocr_instance.ocr(img_input)
+    total_ms = (time.perf_counter() - start) * 1000
+    return result, get_stage_times(), total_ms
+
+
+def _to_ocr_results(result, stage_times, total_ms, count):
+    """
+    将一次 predict() 的返回值转换为 OcrResult 列表。
+    一批图片的阶段耗时按图片数平均分摊；进程池后端由工作进程测得的耗时随结果一并返回。
+    """
+    share = max(1, count)
+    metrics = get_metrics()
+    results = []
+    for result_item in result[:count]:
+        if isinstance(result_item, dict) and 'stage_ms' in result_item:
+            item_times = result_item['stage_ms']
         else:
-            result = ocr_instance.ocr(img_input)
+            item_times = {stage: ms / share for stage, ms in stage_times.items()}
+        ocr_result = OcrResult.from_prediction(
+            result_item,
+            det_ms=item_times.get('det', 0.0),
+            rec_ms=item_times.get('rec', 0.0),
+            total_ms=total_ms / share,
+        )
+        metrics.record('predict', ocr_result.total_ms)
+        for stage in ('det', 'rec'):
+            if stage in item_times:
+                metrics.record(stage, item_times[stage])
+        results.append(ocr_result)
+    return results
+
+
+def _needs_preprocess(img_input):
+    """判断数组图片是否超出最大边长或需要分块。"""
+    if not isinstance(img_input, np.ndarray):
+        return False
+    height, width = img_input.shape[:2]
+    if MAX_SIDE and max(height, width) > MAX_SIDE:
+        return True
+    return TILING_ENABLED and needs_tiling(height, width, TILE_ASPECT_RATIO, TILE_SIZE)
+
+
+def _run_preprocessed(ocr_instance, img_input):
+    """
+    超大图片的识别：按需分块，每块缩小到最大边长后逐块推理 (同一时刻只有一块在模型中)，
+    最后把各块结果映射回原图坐标并去重合并。
+    """
+    height, width = img_input.shape[:2]
+    if TILING_ENABLED and needs_tiling(height, width, TILE_ASPECT_RATIO, TILE_SIZE):
+        tiles = plan_tiles(height, width, TILE_SIZE, TILE_OVERLAP)
+    else:
+        tiles = [(0, height, 0, width)]
+    logger.info(f"超大图片预处理：{width}x{height}，分块数 {len(tiles)}，最大边长 {MAX_SIDE or '不限'}")
+
+    tile_results = []
+    placements = []
+    for y0, y1, x0, x1 in tiles:
+        check_cancelled()
+        with get_metrics().timer('preprocess'):
+            tile, scale = resize_to_max_side(img_input[y0:y1, x0:x1], MAX_SIDE)
+            tile = np.ascontiguousarray(tile)
+        tile_result = _predict_single(ocr_instance, tile)
+        if tile_result.texts is None:
+            # 任一分块返回格式异常，视为整张图片异常
+            return tile_result
+        tile_results.append(tile_result)
+        placements.append((x0, y0, scale))
+    return merge_tile_results(tile_results, placements)
+
+
+def _predict_single(ocr_instance, img_input):
+    """对单张图片 (或分块) 调用一次 predict()，返回 OcrResult。"""
+    check_cancelled()
+    result, stage_times, total_ms = _call_predict(ocr_instance, img_input)
+    if not isinstance(result, list) or not result:
+        return OcrResult(texts=None, total_ms=total_ms)
+    return _to_ocr_results(result, stage_times, total_ms, 1)[0]
+
+
+def run_ocr_predict_result(ocr_instance, img_input):
+    """
+    调用 PaddleOCR 推理，并返回第一张图片的结构化结果 (OcrResult)。
+    - 超出 preprocess_config 限制的数组图片会先缩小 / 分块；
+    - 返回格式异常时，结果的 texts 为 None。
+    """
+    if _needs_preprocess(img_input):
+        return _run_preprocessed(ocr_instance, img_input)
+    return _predict_single(ocr_instance, img_input)
+
+
+def run_ocr_predict(ocr_instance, img_input):
+    """
+    调用 PaddleOCR 推理，并返回第一张图片的识别文本行列表。
+    - 返回 None 表示返回格式异常。
+    """
+    return run_ocr_predict_result(ocr_instance, img_input).texts
+
+
+def run_ocr_predict_many(ocr_instance, img_inputs, batch_size=None):
+    """
+    批量推理：把多张图片按尺寸分组后以列表形式一次提交给 PaddleOCR。
+    - 同一批内图片尺寸一致，满足检测模型组批的要求；
+    - 某一批推理失败时，退化为逐张推理以隔离出错的图片。
+    :param img_inputs: NumPy 数组列表 (BGR)
+    :param batch_size: 每批最多图片数，默认使用配置中的 det_batch_size
+    :return: 与输入顺序一致的列表，每项为 OcrResult 或 Exception (该图片推理失败)
+    :raises OcrCancelledError: 所在任务已被取消 (见 cancellation_scope)
+    """
+    batch_size = max(1, int(batch_size or DET_BATCH_SIZE))
+    results = [None] * len(img_inputs)
+
+    # 按尺寸分组 (保持组内原始顺序)，再在组内切分成批；超大图片单独缩小 / 分块识别
+    groups = {}
+    for index, img_input in enumerate(img_inputs):
+        if _needs_preprocess(img_input):
+            try:
+                results[index] = _run_preprocessed(ocr_instance, img_input)
+            except OcrCancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"图片推理失败 (序号 {index}): {e}")
+                results[index] = e
+            continue
+        groups.setdefault(img_input.shape, []).append(index)
+
+    for indices in groups.values():
+        for start in range(0, len(indices), batch_size):
+            batch_indices = indices[start:start + batch_size]
+            batch = [img_inputs[i] for i in batch_indices]
+            try:
+                if not hasattr(ocr_instance, 'predict'):
+                    raise AttributeError("OCR 实例不支持批量 predict")
+                batch_result, stage_times, total_ms = _call_predict(ocr_instance, batch)
+                if not isinstance(batch_result, list) or len(batch_result) != len(batch):
+                    raise ValueError("批量推理返回的结果数量与输入不一致")
+                for i, ocr_result in zip(batch_indices, _to_ocr_results(batch_result, stage_times, total_ms,
+                                                                        len(batch))):
+                    results[i] = ocr_result
+            except OcrCancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"批量推理失败 ({len(batch)} 张)，改为逐张推理: {e}")
+                for i in batch_indices:
+                    try:
+                        results[i] = run_ocr_predict_result(ocr_instance, img_inputs[i])
+                    except OcrCancelledError:
+                        raise
+                    except Exception as single_error:
+                        logger.exception(f"图片推理失败 (序号 {i}): {single_error}")
+                        results[i] = single_error
+
+    return results
 
-        if not isinstance(result, list) or not result or not isinstance(result[0], dict):
-            return "图片中未识别到有效文本或返回格式异常。"
 
-        texts = result[0].get('rec_texts', [])
+def recognize_many_results(ocr_instance, images, batch_size=None):
+    """
+    批量识别多张图片，返回与输入顺序一致的结构化结果 (OcrResult) 列表。
+    :param ocr_instance: PaddleOCR 实例
+    :param images: 图片列表，元素可以是路径 (str)、字节流 (bytes)、PIL Image 或 NumPy 数组
+    :param batch_size: 每次提交给模型的图片数，默认使用配置中的 det_batch_size
+    """
+    if ocr_instance is None:
+        return [OcrResult.failure("错误：OCR 未初始化。") for _ in images]
+
+    results = [None] * len(images)
+    decoded_indices = []
+    decoded_inputs = []
+
+    # 1. 统一解码为模型输入；解码失败的图片单独记录错误
+    for index, img_data in enumerate(images):
+        try:
+            if isinstance(img_data, (Image.Image, np.ndarray)):
+                img_input = to_model_input(img_data)
+            elif isinstance(img_data, (bytes, bytearray)):
+                img_input = load_image_array(bytes(img_data), is_path=False)
+            else:
+                if not os.path.exists(img_data):
+                    results[index] = OcrResult.failure(f"错误：图片文件未找到: {img_data}")
+                    continue
+                img_input = load_image_array(img_data, is_path=True)
+        except Exception as e:
+            logger.exception(f"图片解码失败 (序号 {index}): {e}")
+            results[index] = OcrResult.failure(f"错误：图片解码失败: {e}")
+            continue
+        decoded_indices.append(index)
+        decoded_inputs.append(img_input)
+
+    # 2. 分批推理
+    predictions = run_ocr_predict_many(ocr_instance, decoded_inputs, batch_size=batch_size)
+    for index, ocr_result in zip(decoded_indices, predictions):
+        if isinstance(ocr_result, Exception):
+            ocr_result = OcrResult.failure("错误：OCR 识别任务执行失败，请查看日志文件了解详情。")
+        results[index] = ocr_result
+
+    return results
 
-        if not texts:
-            return "图片中未识别到有效文本。"
 
-        # =======================================================
-        # >>>>>>>>>>>>>> 改进后的文本后处理逻辑 <<<<<<<<<<<<<<<<
+def recognize_many(ocr_instance, images, batch_size=None):
+    """
+    批量识别多张图片，返回与输入顺序一致的文本列表 (参数同 recognize_many_results)。
+    """
+    return [result.to_text() for result in recognize_many_results(ocr_instance, images, batch_size=batch_size)]
+
+
+def postprocess_texts(texts, lang=None, polys=None):
+    """
+    将识别出的文本行合并为最终展示的段落文本。
+    :param texts: PaddleOCR 返回的 rec_texts 列表
+    :param lang: 语言代码，决定使用 postprocess_config 中的哪组规则；None 使用默认规则
+    :param polys: 与 texts 对应的文本框 (N, 4, 2)；提供时按版面 (分栏 / 表格 / 段落) 组织文本
+    """
+    with get_metrics().timer('postprocess'):
+        postprocess = get_postprocessor(lang)
+        if polys is not None and len(texts) > 1:
+            text = layout_text(texts, polys, postprocess)
+            if text is not None:
+                return text
+        return postprocess(texts)
 
-        # 1. 用空格连接所有文本行。这解决了“一句话从中间断开”的问题。
-        combined_text = " ".join(texts)
 
-        # 2. 清理多余空格：将连续的空白字符（包括空格和因 join 引入的额外空格）缩减为单个空格
-        cleaned_text = " ".join(combined_text.split())
+def recognize(ocr_instance, img_data, is_path=True):
+    """
+    执行 OCR 并返回结构化结果 (OcrResult)，包含文本行、置信度、文本框与各阶段耗时。
+    出错时不抛出异常，而是返回 error 字段为错误提示的结果；
+    只有所在任务被取消 (见 cancellation_scope) 时抛出 OcrCancelledError。
+    :param ocr_instance: PaddleOCR 实例
+    :param img_data: 图片路径 (str)、图片字节流 (bytes)、PIL Image 或 NumPy 数组 (BGR / BGRA)
+    :param is_path: True 表示 img_data 是路径，False 表示是字节流；
+                    传入 PIL Image / NumPy 数组时忽略此参数，直接送入模型，不经过编解码
+    """
+    metrics = get_metrics()
+    start = time.perf_counter()
+    try:
+        result = _recognize(ocr_instance, img_data, is_path)
+    except OcrCancelledError:
+        metrics.increment('cancelled')
+        raise
+    metrics.record('recognize', (time.perf_counter() - start) * 1000)
+    metrics.increment('requests')
+    if not result.ok:
+        metrics.increment('errors')
+    return result
 
-        # 3. 【核心改进】：根据标点符号或明显的段落分隔符，重新插入换行。
-        separators = ('。', '？', '！', '”', '」', '：', '；')
 
-        final_text = cleaned_text
+def _recognize(ocr_instance, img_data, is_path):
+    if ocr_instance is None:
+        return OcrResult.failure("错误：OCR 未初始化。")
 
-        # 简单但有效的处理方法：在标点符号后插入换行和空格，然后清理多余空格
-        for sep in separators:
-            # 替换： [标点符号 + 空格] -> [标点符号 + 两个换行符]
-            final_text = final_text.replace(sep + " ", sep + "\n\n")
+    is_in_memory_image = isinstance(img_data, (Image.Image, np.ndarray))
 
-        # 针对你的示例文本，特别处理标题分隔符（如：一、）
-        final_text = final_text.replace(" 一、", "\n\n一、")
-        final_text = final_text.replace(" 第一，", "\n\n第一，")
+    if is_path and not is_in_memory_image and not os.path.exists(img_data):
+        return OcrResult.failure(f"错误：图片文件未找到: {img_data}")
 
-        # 4. 再次清理多余的换行符或空格，防止连续换行过多
-        # 替换多个连续换行符为最多两个
-        while "\n\n\n" in final_text:
-            final_text = final_text.replace("\n\n\n", "\n\n")
+    try:
+        if is_in_memory_image:
+            # 零拷贝交接：内存中的图片直接规整为模型输入
+            img_input = to_model_input(img_data)
+        elif not is_path:
+            # 兼容处理：字节流需要先解码为 NumPy 数组
+            img_input = load_image_array(img_data, is_path=False)
+        else:
+            # 路径经内存映射读取第一页，并按预处理需要的分辨率直接解码 (多页文件见 recognize_file)
+            return recognize_page(ocr_instance, read_page(img_data, scale_for=decode_scale))
 
-        # 移除行首尾的空格和换行
-        return final_text.strip()
-        # =======================================================
+        return run_ocr_predict_result(ocr_instance, img_input)
 
+    except OcrCancelledError:
+        # 取消不是错误，交给调用方 (任务管理器) 处理
+        raise
     except Exception as e:
-        # 替换 return f"处理出错: {e}\n{traceback.format_exc()}"
         # 使用 logger.exception 记录完整的 Traceback，界面只返回精简错误
         logger.exception(f"OCR 识别任务处理出错: {e}")
-        return f"错误：OCR 识别任务执行失败，请查看日志文件了解详情。"
+        return OcrResult.failure("错误：OCR 识别任务执行失败，请查看日志文件了解详情。")
+
+
+def recognize_and_get_text(ocr_instance, img_data, is_path=True, lang=None):
+    """
+    执行 OCR 并返回纯文本 (由 recognize() 的结构化结果推导，参数相同)。
+    :param lang: 语言代码，用于选择文本后处理规则
+    """
+    return recognize(ocr_instance, img_data, is_path=is_path).to_text(lang)
+
+
+def decode_scale(width, height):
+    """
+    预处理 (见 _run_preprocessed) 最终会把 width x height 的图片缩小到的比例，读取文件时直接按该比例解码。
+    需要分块的细长图片按原尺寸解码 (分块大小以原图像素为单位，逐块缩小)。
+    """
+    if not MAX_SIDE or (TILING_ENABLED and needs_tiling(height, width, TILE_ASPECT_RATIO, TILE_SIZE)):
+        return 1.0
+    return min(1.0, MAX_SIDE / max(width, height))
+
+
+def recognize_page(ocr_instance, page):
+    """识别 ocr_ingest 解码的一页，文本框坐标换算回原图坐标。"""
+    result = run_ocr_predict_result(ocr_instance, page.image)
+    if page.scale != 1.0 and len(result.polys):
+        result.polys = result.polys / np.float32(page.scale)
+    return result
+
+
+def recognize_file(ocr_instance, file_path):
+    """
+    逐页识别图片文件 (多页 TIFF 逐页解码)，每识别完一页 yield 一次 (页码, 页数, OcrResult)。
+    文件以内存映射方式读取、按预处理需要的分辨率解码，内存中只保留当前页的像素；文本框为原图坐标。
+    某页识别出错时该页为失败结果，其余页继续识别；文件无法读取时产出一个失败结果。
+    """
+    metrics = get_metrics()
+    # 下一页的页码与已知页数，解码中途出错时用于标记出错的页
+    index, count = 0, 1
+    try:
+        for page in iter_pages(file_path, scale_for=decode_scale):
+            index, count = page.index, page.count
+            start = time.perf_counter()
+            try:
+                result = recognize_page(ocr_instance, page)
+            except OcrCancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"第 {index + 1} 页识别出错 ({file_path}): {e}")
+                result = OcrResult.failure("错误：OCR 识别任务执行失败，请查看日志文件了解详情。")
+            del page  # 识别完成后立即释放本页像素
+            metrics.record('recognize', (time.perf_counter() - start) * 1000)
+            metrics.increment('requests')
+            if not result.ok:
+                metrics.increment('errors')
+            yield index, count, result
+            index += 1
+    except OcrCancelledError:
+        metrics.increment('cancelled')
+        raise
+    except ValueError as e:
+        # 文件大小超过 ingest_config 的限制等
+        metrics.increment('errors')
+        yield index, max(count, index + 1), OcrResult.failure(f"错误：{e}")
+    except OSError as e:
+        logger.exception(f"读取图片文件失败 ({file_path}): {e}")
+        metrics.increment('errors')
+        yield index, max(count, index + 1), OcrResult.failure(
+            "错误：无法读取图片文件，请检查文件格式是否支持或文件是否损坏。")
+
+
+def recognize_file_text(ocr_instance, file_path, lang=None, cache=None, model_identity=None, on_page=None):
+    """
+    识别图片文件并返回界面展示的文本：多页文件按页输出，每页前加页码标题。
+    :param cache: ocr_cache.ResultCache；提供时以文件内容 (而非解码后的像素) 计算缓存键，命中缓存时无需解码
+    :param model_identity: get_model_identity() 的返回值，与 cache 一起使用
+    :param on_page: 可选回调 on_page(页码, 页数, 本页文本)，每识别完一页调用一次 (在工作线程中)
+    :return: (识别文本, 是否命中缓存)
+    """
+    if ocr_instance is None:
+        return "错误：OCR 未初始化。", False
+    if not os.path.exists(file_path):
+        return f"错误：图片文件未找到: {file_path}", False
+
+    cache_key = None
+    if cache is not None and model_identity is not None:
+        try:
+            cache_key = compute_file_key(file_path, model_identity)
+        except OSError as e:
+            logger.warning(f"计算文件缓存键失败，跳过缓存: {e}")
+        else:
+            cached_text = cache.get(cache_key)
+            get_metrics().increment('cache_hits' if cached_text is not None else 'cache_misses')
+            if cached_text is not None:
+                logger.info(f"识别结果命中缓存 ({cache_key[:8]})。")
+                return cached_text, True
+
+    parts = []
+    failed = False
+    for index, count, result in recognize_file(ocr_instance, file_path):
+        page_text = result.to_text(lang)
+        failed = failed or not result.ok or result.texts is None
+        parts.append(page_text if count == 1 else f"--- 第 {index + 1}/{count} 页 ---\n{page_text}")
+        if on_page is not None:
+            on_page(index, count, page_text)
+    text = "\n\n".join(parts)
+
+    # 含错误页 (或返回格式异常的页) 的结果不写入缓存，下次仍会重新识别
+    if cache_key is not None and not failed:
+        cache.put(cache_key, text)
+    return text, False
+
+
+def result_config_fingerprint():
+    """
+    影响最终输出文本的配置段 (预处理、后处理、版面、PDF) 的指纹。
+    每次调用时读取当前配置，配置热加载或重启后修改了这些规则，缓存键随之改变，不会返回按旧规则生成的文本。
+    """
+    sections = {
+        'preprocess_config': get_preprocess_config(),
+        'postprocess_config': get_postprocess_config(),
+        'layout_config': get_layout_config(),
+        'pdf_config': get_pdf_config(),
+    }
+    encoded = json.dumps(sections, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def get_model_identity(lang):
+    """
+    返回标识 “模型组合 + 语言 + 输出相关配置” 的字符串，用于结果缓存键。
+    """
+    final_det_path, final_rec_path = resolve_model_paths(lang)
+    return (f"{os.path.basename(final_det_path)}|{os.path.basename(final_rec_path)}|{lang}"
+            f"|{result_config_fingerprint()}")
+
+
+def recognize_with_cache(ocr_instance, img_data, cache, model_identity, is_path=True, lang=None):
+    """
+    带结果缓存的识别：以像素内容哈希 + 模型标识查缓存，命中时完全跳过模型推理。
+    :param cache: ocr_cache.ResultCache 实例，为 None 时等同于 recognize_and_get_text
+    :param model_identity: get_model_identity() 的返回值
+    :param lang: 语言代码，用于选择文本后处理规则
+    :return: (识别文本, 是否命中缓存)
+    """
+    if cache is None or ocr_instance is None:
+        return recognize_and_get_text(ocr_instance, img_data, is_path=is_path, lang=lang), False
+
+    try:
+        # 缓存键基于解码后的像素数据，因此需要先统一解码为模型输入数组
+        if isinstance(img_data, (Image.Image, np.ndarray)):
+            img_input = to_model_input(img_data)
+        else:
+            if is_path and not os.path.exists(img_data):
+                return f"错误：图片文件未找到: {img_data}", False
+            img_input = load_image_array(img_data, is_path=is_path)
+        cache_key = compute_image_key(img_input, model_identity)
+    except Exception as e:
+        logger.exception(f"计算缓存键失败，跳过缓存: {e}")
+        return recognize_and_get_text(ocr_instance, img_data, is_path=is_path, lang=lang), False
+
+    cached_text = cache.get(cache_key)
+    get_metrics().increment('cache_hits' if cached_text is not None else 'cache_misses')
+    if cached_text is not None:
+        logger.info(f"识别结果命中缓存 ({cache_key[:8]})。")
+        return cached_text, True
+
+    result = recognize(ocr_instance, img_input, is_path=False)
+    text = result.to_text(lang)
+    # 出错或返回格式异常的结果不写入缓存，下次仍会重新识别
+    if result.ok and result.texts is not None:
+        cache.put(cache_key, text)
+    return text, False
 
 
 def get_rec_model_path_by_lang(lang_code):
@@ -0,0 +1,183 @@
+# ocr_executor.py
+# ----------------------------------------------------------------------
+# 可在运行时调整并发数的线程执行器：配置热加载修改 executor_config.max_workers 后，
+# 已创建的执行器 (GUI 共享的线程池) 无需重建即可生效。
+# ExecutorAutoscaler 按排队任务数与本进程 CPU 占用在 [min_workers, max_workers] 之间自动调整并发数：
+# 平时只用少量线程保持桌面响应，批量任务涌入时逐步扩容到上限。
+# ----------------------------------------------------------------------
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class ResizableThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor 的线程按需创建、之后不会退出，因此并发数由一个计数闸门控制：
+    - 调大上限：后续提交会继续创建线程，直到达到新上限；
+    - 调小上限：多出的线程在开始执行下一个任务前等待，直到执行中的任务数低于新上限。
+    """
+
+    def __init__(self, max_workers, thread_name_prefix=''):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._limit = self._max_workers
+        self._running = 0
+        self._pending = 0
+        self._gate = threading.Condition()
+        # 绑定的 ExecutorAutoscaler，执行器关闭时随之停止
+        self.autoscaler = None
+
+    @property
+    def max_workers(self):
+        """当前允许同时执行的任务数。"""
+        return self._limit
+
+    @property
+    def running(self):
+        """正在执行的任务数。"""
+        return self._running
+
+    @property
+    def pending(self):
+        """已提交、尚未开始执行的任务数 (包括队列中的任务与等待并发闸门的任务)。"""
+        return self._pending
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._gate:
+            self._pending += 1
+        try:
+            future = super().submit(self._run_gated, fn, args, kwargs)
+        except BaseException:
+            with self._gate:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._on_future_done)
+        return future
+
+    def _on_future_done(self, future):
+        # 开始执行前被取消的任务不会进入 _run_gated，在这里扣除排队计数
+        if future.cancelled():
+            with self._gate:
+                self._pending -= 1
+
+    def _run_gated(self, fn, args, kwargs):
+        with self._gate:
+            while self._running >= self._limit:
+                self._gate.wait()
+            self._pending -= 1
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._gate:
+                self._running -= 1
+                self._gate.notify()
+
+    def set_max_workers(self, max_workers):
+        """调整并发上限 (至少为 1)，立即生效，不影响执行中的任务。"""
+        max_workers = max(1, int(max_workers))
+        with self._gate:
+            self._limit = max_workers
+            # ThreadPoolExecutor 在线程数低于 _max_workers 时才创建新线程
+            self._max_workers = max(self._max_workers, max_workers)
+            self._gate.notify_all()
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+class ProcessCpuMeter:
+    """本进程 (所有线程合计) 的 CPU 占用，按逻辑核心数归一化到 0 ~ 1。"""
+
+    def __init__(self):
+        self.cores = os.cpu_count() or 1
+        self._last = (time.perf_counter(), time.process_time())
+
+    def sample(self):
+        """返回自上次调用以来的平均 CPU 占用。"""
+        now = (time.perf_counter(), time.process_time())
+        wall, cpu = now[0] - self._last[0], now[1] - self._last[1]
+        self._last = now
+        if wall <= 0:
+            return 0.0
+        return min(1.0, cpu / (wall * self.cores))
+
+
+class ExecutorAutoscaler:
+    """
+    按排队任务数与 CPU 占用调整 ResizableThreadPoolExecutor 的并发数，每次评估最多增减一个线程：
+    - 平均每个线程排队的任务数达到 scale_up_queue，且本进程 CPU 占用低于 cpu_high 时扩容；
+    - 连续 scale_down_idle 次评估都没有排队任务、且有空闲线程时缩容。
+    """
+
+    def __init__(self, executor, min_workers=1, max_workers=None, scale_up_queue=1.0, cpu_high=0.85,
+                 scale_down_idle=5, cpu_meter=None):
+        """
+        :param executor: ResizableThreadPoolExecutor
+        :param max_workers: 并发上限，默认为执行器当前的并发数
+        :param cpu_meter: 提供 sample() -> 0 ~ 1 的对象，默认为 ProcessCpuMeter
+        """
+        self.executor = executor
+        self._cpu_meter = cpu_meter or ProcessCpuMeter()
+        self._idle_rounds = 0
+        self._stop_event = threading.Event()
+        self.configure(min_workers, max_workers or executor.max_workers, scale_up_queue, cpu_high, scale_down_idle)
+
+    def configure(self, min_workers, max_workers, scale_up_queue=1.0, cpu_high=0.85, scale_down_idle=5):
+        """更新伸缩参数 (配置热加载时调用)，执行器当前并发数超出新范围时立即调整到范围内。"""
+        self.max_workers = max(1, int(max_workers))
+        self.min_workers = min(max(1, int(min_workers)), self.max_workers)
+        self.scale_up_queue = max(float(scale_up_queue), 0.01)
+        self.cpu_high = float(cpu_high)
+        self.scale_down_idle = max(1, int(scale_down_idle))
+        limit = min(max(self.executor.max_workers, self.min_workers), self.max_workers)
+        if limit != self.executor.max_workers:
+            self.executor.set_max_workers(limit)
+
+    def step(self):
+        """评估一次并按需调整并发数，返回调整后的并发数。"""
+        executor = self.executor
+        limit, pending = executor.max_workers, executor.pending
+        cpu = self._cpu_meter.sample()
+
+        target = limit
+        if pending and pending >= self.scale_up_queue * limit:
+            self._idle_rounds = 0
+            if limit < self.max_workers and cpu < self.cpu_high:
+                target = limit + 1
+        elif not pending and executor.running < limit:
+            self._idle_rounds += 1
+            if self._idle_rounds >= self.scale_down_idle and limit > self.min_workers:
+                target = limit - 1
+                self._idle_rounds = 0
+        else:
+            self._idle_rounds = 0
+
+        if target != limit:
+            executor.set_max_workers(target)
+            logger.info(f"执行器并发数 {limit} -> {target} (排队任务 {pending}，CPU 占用 {cpu:.0%})")
+        return target
+
+    def start(self, interval_s=1.0):
+        """启动后台线程，每隔 interval_s 秒评估一次；执行器关闭或调用 stop() 后退出。"""
+        executor = self.executor
+        executor.autoscaler = self
+
+        def loop():
+            while not self._stop_event.wait(interval_s):
+                self.step()
+
+        threading.Thread(target=loop, name="executor-autoscaler", daemon=True).start()
+        logger.info(f"执行器并发数自动伸缩已启用 ({self.min_workers} ~ {self.max_workers})，每 {interval_s} 秒评估一次。")
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self.executor.autoscaler is self:
+            self.executor.autoscaler = None
@@ -0,0 +1,178 @@
+# ocr_history.py
+# ----------------------------------------------------------------------
+# 识别历史记录：保存在 SQLite 文件中 (程序退出后仍保留)，包括识别文本、来源、语言、
+# 耗时与可选的缩略图 (PNG)。
+# - 列表按页读取，每页只取文本的前若干字符，界面内存占用与记录总数无关；
+# - 全文搜索使用 FTS5 (trigram 分词，支持中文子串匹配)；少于 3 个字符的关键词
+#   或当前 SQLite 不支持 FTS5 时退回 LIKE 查询。
+# ----------------------------------------------------------------------
+
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config_loader import get_history_config
+
+logger = logging.getLogger(__name__)
+
+# 列表中每条记录预览的字符数
+PREVIEW_CHARS = 80
+
+# trigram 分词器能匹配的最短关键词长度
+_MIN_FTS_QUERY = 3
+
+
+def encode_thumbnail(img, max_size=(100, 100)):
+    """把 PIL 图片缩小为缩略图并编码为 PNG 字节，用于保存到历史记录。"""
+    thumb = img.copy()
+    thumb.thumbnail(max_size)
+    buffer = io.BytesIO()
+    thumb.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+class HistoryStore:
+    """基于 SQLite (FTS5) 的识别历史记录，线程安全。"""
+
+    def __init__(self, db_path, max_records=0):
+        """
+        :param db_path: SQLite 文件路径 (':memory:' 表示仅在内存中，用于测试)
+        :param max_records: 最多保留的记录数，超出后删除最旧的记录；0 表示不限制
+        """
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.max_records = max(0, int(max_records or 0))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " created_at REAL NOT NULL,"
+            " source TEXT NOT NULL,"
+            " lang TEXT,"
+            " text TEXT NOT NULL,"
+            " elapsed_ms REAL,"
+            " thumbnail BLOB)"
+        )
+        self.fts_enabled = self._create_fts_locked()
+        self._conn.commit()
+
+    def _create_fts_locked(self):
+        """创建与 history 表同步的 FTS5 索引；不支持时返回 False。"""
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                " text, content='history', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"当前 SQLite 不支持 FTS5 trigram，历史搜索改用 LIKE 查询: {e}")
+            return False
+        self._conn.executescript(
+            "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN"
+            "  INSERT INTO history_fts (rowid, text) VALUES (new.id, new.text);"
+            " END;"
+            "CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN"
+            "  INSERT INTO history_fts (history_fts, rowid, text) VALUES ('delete', old.id, old.text);"
+            " END;"
+        )
+        return True
+
+    def add(self, text, source, lang=None, elapsed_ms=None, thumbnail=None):
+        """
+        保存一条记录，返回记录 ID。
+        :param thumbnail: PNG 字节 (见 encode_thumbnail)，None 表示不保存缩略图
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO history (created_at, source, lang, text, elapsed_ms, thumbnail)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), source, lang, text, elapsed_ms, thumbnail)
+            )
+            if self.max_records:
+                self._conn.execute(
+                    "DELETE FROM history WHERE id <= ("
+                    " SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_records,)
+                )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def _where(self, query):
+        """根据搜索关键词生成 (FROM ... WHERE 子句, 参数)。"""
+        query = (query or "").strip()
+        if not query:
+            return "history", ()
+        if self.fts_enabled and len(query) >= _MIN_FTS_QUERY:
+            # 整体作为一个短语匹配，关键词中的双引号按 FTS5 规则转义
+            phrase = '"' + query.replace('"', '""') + '"'
+            return ("history JOIN history_fts ON history_fts.rowid = history.id"
+                    " WHERE history_fts MATCH ?"), (phrase,)
+        escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return "history WHERE history.text LIKE ? ESCAPE '\\'", (f"%{escaped}%",)
+
+    def count(self, query=None):
+        """记录总数 (指定 query 时为匹配的记录数)。"""
+        source, params = self._where(query)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+    def page(self, offset=0, limit=100, query=None):
+        """
+        按时间倒序读取一页记录，每条只包含文本预览 (不含全文与缩略图)。
+        :return: [{"id", "created_at", "source", "lang", "preview", "elapsed_ms"}, ...]
+        """
+        source, params = self._where(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT history.id, history.created_at, history.source, history.lang,"
+                f" substr(history.text, 1, {PREVIEW_CHARS}) AS preview, history.elapsed_ms"
+                f" FROM {source} ORDER BY history.id DESC LIMIT ? OFFSET ?",
+                params + (int(limit), max(0, int(offset)))
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, record_id):
+        """读取一条完整记录 (含全文与缩略图)；不存在时返回 None。"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM history WHERE id = ?", (record_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def delete(self, record_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE id = ?", (record_id,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM history")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_history_store():
+    """
+    根据 config.yaml 中的 history_config 创建历史记录存储；未启用或打开失败时返回 None。
+    """
+    history_config = get_history_config()
+    if not history_config.get('enabled', True):
+        logger.info("历史记录持久化未启用。")
+        return None
+
+    db_path = history_config.get('db_path', 'cache/history.sqlite3')
+    try:
+        store = HistoryStore(db_path, max_records=history_config.get('max_records', 0))
+    except sqlite3.Error as e:
+        logger.warning(f"历史记录数据库打开失败: {e}，本次运行不保存历史记录。")
+        return None
+
+    logger.info(f"历史记录保存在 {db_path} (全文索引: {'FTS5' if store.fts_enabled else 'LIKE'})。")
+    return store
@@ -0,0 +1,257 @@
+# ocr_incremental.py
+# ----------------------------------------------------------------------
+# 增量识别：对同一屏幕区域的连续截图 (聊天窗口、滚动日志等缓慢变化的内容)，
+# 与上一帧按块比较像素，只对变化的区域重新检测 / 识别，其余文本行沿用上一次的结果。
+# - 两次截图的选区不必完全相同：按屏幕坐标对齐后比较重叠部分，选区外新露出的部分视为变化；
+# - 变化区域会扩大到完整覆盖与之相交的旧文本框，避免一行文字被切成两半分别识别；
+# - 变化面积超过 max_changed_fraction、模型实例变化或增量识别出错时，退回整图识别。
+# ----------------------------------------------------------------------
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+from config_loader import get_incremental_config
+from ocr_engine import OcrCancelledError, recognize, run_ocr_predict_result, to_model_input
+from ocr_metrics import get_metrics
+from ocr_result import OcrResult
+
+logger = logging.getLogger(__name__)
+
+
+class _Frame:
+    """上一次识别的帧：模型实例、像素、屏幕坐标原点与识别结果。"""
+
+    __slots__ = ('ocr', 'pixels', 'origin', 'result')
+
+    def __init__(self, ocr, pixels, origin, result):
+        self.ocr = ocr
+        self.pixels = pixels
+        self.origin = origin
+        self.result = result
+
+
+def changed_blocks(previous, current, offset, block_size):
+    """
+    按块比较两帧，返回形状 (ceil(H / block_size), ceil(W / block_size)) 的布尔数组，True 表示该块有像素变化。
+    :param offset: 上一帧左上角在当前帧中的坐标 (dx, dy)；上一帧没有覆盖到的区域视为变化
+    """
+    height, width = current.shape[:2]
+    dx, dy = offset
+    changed = np.ones((height, width), dtype=bool)
+    x0, y0 = max(0, dx), max(0, dy)
+    x1, y1 = min(width, dx + previous.shape[1]), min(height, dy + previous.shape[0])
+    if x1 > x0 and y1 > y0:
+        changed[y0:y1, x0:x1] = np.any(
+            current[y0:y1, x0:x1] != previous[y0 - dy:y1 - dy, x0 - dx:x1 - dx], axis=2)
+
+    rows, cols = -(-height // block_size), -(-width // block_size)
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=bool)
+    padded[:height, :width] = changed
+    return padded.reshape(rows, block_size, cols, block_size).any(axis=(1, 3))
+
+
+def block_regions(blocks):
+    """
+    把相邻 (含对角相邻) 的变化块归为一组，返回各组的外接矩形 [(row0, col0, row1, col1), ...] (右下为开区间)。
+    """
+    rows, cols = blocks.shape
+    seen = np.zeros_like(blocks)
+    regions = []
+    for start in zip(*np.nonzero(blocks)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        stack = [start]
+        r0, c0, r1, c1 = start[0], start[1], start[0] + 1, start[1] + 1
+        while stack:
+            r, c = stack.pop()
+            r0, c0, r1, c1 = min(r0, r), min(c0, c), max(r1, r + 1), max(c1, c + 1)
+            for nr in range(max(0, r - 1), min(rows, r + 2)):
+                for nc in range(max(0, c - 1), min(cols, c + 2)):
+                    if blocks[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+        regions.append((r0, c0, r1, c1))
+    return regions
+
+
+def _intersects(boxes, rect):
+    """boxes (N, 4) 中与 rect 相交的行 (布尔数组)。"""
+    return ((boxes[:, 0] < rect[2]) & (boxes[:, 2] > rect[0])
+            & (boxes[:, 1] < rect[3]) & (boxes[:, 3] > rect[1]))
+
+
+def expand_regions(rects, boxes):
+    """
+    反复合并相交的矩形，并把矩形扩大到完整覆盖与之相交的文本框，直到不再变化。
+    :param rects: [[x0, y0, x1, y1], ...]
+    :param boxes: 文本框外接矩形，形状 (N, 4)
+    :return: 互不相交的矩形列表
+    """
+    rects = [list(rect) for rect in rects]
+    changed = True
+    while changed:
+        changed = False
+        merged = []
+        for rect in rects:
+            for other in merged:
+                if rect[0] < other[2] and rect[2] > other[0] and rect[1] < other[3] and rect[3] > other[1]:
+                    other[:] = [min(rect[0], other[0]), min(rect[1], other[1]),
+                                max(rect[2], other[2]), max(rect[3], other[3])]
+                    changed = True
+                    break
+            else:
+                merged.append(rect)
+        rects = merged
+
+        for rect in rects:
+            hit = _intersects(boxes, rect)
+            if not hit.any():
+                continue
+            covered = [min(rect[0], boxes[hit, 0].min()), min(rect[1], boxes[hit, 1].min()),
+                       max(rect[2], boxes[hit, 2].max()), max(rect[3], boxes[hit, 3].max())]
+            if covered != rect:
+                rect[:] = covered
+                changed = True
+    return rects
+
+
+class IncrementalRecognizer:
+    """
+    同一区域连续截图的增量识别器 (线程安全，同一时刻只处理一帧)。
+    使用 recognize() / recognize_text() 代替 ocr_engine.recognize() / recognize_and_get_text()。
+    """
+
+    def __init__(self, block_size=16, margin=8, max_changed_fraction=0.5):
+        """
+        :param block_size: 比较像素的块边长 (像素)
+        :param margin: 变化区域向外扩展的像素数，为检测模型保留文字边缘
+        :param max_changed_fraction: 需要重新识别的面积超过整帧的该比例时，直接整图识别
+        """
+        self.block_size = max(1, int(block_size))
+        self.margin = max(0, int(margin))
+        self.max_changed_fraction = float(max_changed_fraction)
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def reset(self):
+        """丢弃上一帧，下一次识别为整图识别。"""
+        with self._lock:
+            self._previous = None
+
+    def recognize_text(self, ocr_instance, img_data, origin=(0, 0), lang=None):
+        """增量识别并返回界面展示的文本 (参数见 recognize)。"""
+        return self.recognize(ocr_instance, img_data, origin).to_text(lang)
+
+    def recognize(self, ocr_instance, img_data, origin=(0, 0)):
+        """
+        识别一帧截图，返回 OcrResult (文本框坐标相对于当前帧)。
+        :param img_data: PIL Image 或 NumPy 数组 (BGR / BGRA)
+        :param origin: 该帧左上角的屏幕坐标 (x, y)，用于对齐选区略有不同的两次截图
+        """
+        if ocr_instance is None:
+            return OcrResult.failure("错误：OCR 未初始化。")
+
+        with self._lock:
+            img_input = to_model_input(img_data)
+            # 保存为上一帧的像素不能与调用方的缓冲区共享内存
+            shared = isinstance(img_data, np.ndarray) and np.shares_memory(img_input, img_data)
+            pixels = img_input.copy() if shared else img_input
+            origin = (int(origin[0]), int(origin[1]))
+
+            result = None
+            previous = self._previous
+            if previous is not None and previous.ocr is ocr_instance:
+                try:
+                    result = self._recognize_changes(ocr_instance, pixels, origin, previous)
+                except OcrCancelledError:
+                    raise
+                except Exception as e:
+                    logger.exception(f"增量识别失败，改为整图识别: {e}")
+            if result is None:
+                get_metrics().increment('incremental_full')
+                result = recognize(ocr_instance, pixels, is_path=False)
+
+            ok = result.ok and result.texts is not None
+            self._previous = _Frame(ocr_instance, pixels, origin, result) if ok else None
+            return result
+
+    def _recognize_changes(self, ocr_instance, pixels, origin, previous):
+        """只识别变化区域；需要整图识别时返回 None。"""
+        start = time.perf_counter()
+        height, width = pixels.shape[:2]
+        offset = (previous.origin[0] - origin[0], previous.origin[1] - origin[1])
+
+        with get_metrics().timer('diff'):
+            blocks = changed_blocks(previous.pixels, pixels, offset, self.block_size)
+            if blocks.mean() > self.max_changed_fraction:
+                return None
+
+            # 上一帧的文本框换算到当前帧坐标；只有一部分仍在帧内的文本行需要重新识别
+            old = previous.result
+            polys = old.polys + np.asarray(offset, dtype=np.float32)
+            boxes = old.boxes + np.asarray(offset * 2, dtype=np.float32)
+            inside = ((boxes[:, 0] >= 0) & (boxes[:, 1] >= 0)
+                      & (boxes[:, 2] <= width) & (boxes[:, 3] <= height))
+            visible = (boxes[:, 0] < width) & (boxes[:, 2] > 0) & (boxes[:, 1] < height) & (boxes[:, 3] > 0)
+
+            size, margin = self.block_size, self.margin
+            rects = [[c0 * size - margin, r0 * size - margin, c1 * size + margin, r1 * size + margin]
+                     for r0, c0, r1, c1 in block_regions(blocks)]
+            rects.extend(boxes[visible & ~inside].tolist())
+            rects = [[max(0, int(x0)), max(0, int(y0)), min(width, int(np.ceil(x1))), min(height, int(np.ceil(y1)))]
+                     for x0, y0, x1, y1 in expand_regions(rects, boxes[inside])]
+            rects = [rect for rect in rects if rect[2] > rect[0] and rect[3] > rect[1]]
+            area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+            if area > self.max_changed_fraction * width * height:
+                return None
+
+            keep = inside.copy()
+            for rect in rects:
+                keep &= ~_intersects(boxes, rect)
+
+        texts = [old.texts[i] for i in np.flatnonzero(keep)]
+        scores = [old.scores[keep]]
+        all_polys = [polys[keep]]
+        det_ms = rec_ms = 0.0
+        for x0, y0, x1, y1 in rects:
+            region = run_ocr_predict_result(ocr_instance, np.ascontiguousarray(pixels[y0:y1, x0:x1]))
+            if region.texts is None:
+                return None
+            texts.extend(region.texts)
+            scores.append(region.scores)
+            all_polys.append(region.polys + np.array([x0, y0], dtype=np.float32))
+            det_ms += region.det_ms
+            rec_ms += region.rec_ms
+
+        polys = np.concatenate(all_polys)
+        # 按文本框左上角 (先纵后横) 排列，与整图识别的输出顺序接近
+        order = np.lexsort((polys[:, :, 0].min(axis=1), polys[:, :, 1].min(axis=1))) if len(polys) else []
+        metrics = get_metrics()
+        metrics.increment('incremental_partial' if rects else 'incremental_unchanged')
+        metrics.increment('incremental_reused_lines', int(np.count_nonzero(keep)))
+        logger.info(f"增量识别：重新识别 {len(rects)} 个区域 (占 {area / (width * height):.0%})，"
+                    f"沿用 {np.count_nonzero(keep)} 行。")
+        return OcrResult(
+            texts=[texts[i] for i in order],
+            scores=np.concatenate(scores)[order],
+            polys=polys[order],
+            det_ms=det_ms,
+            rec_ms=rec_ms,
+            total_ms=(time.perf_counter() - start) * 1000,
+        )
+
+
+def create_incremental_recognizer():
+    """根据 config.yaml 中的 incremental_config 创建增量识别器；未启用时返回 None。"""
+    config = get_incremental_config()
+    if not config.get('enabled', True):
+        return None
+    return IncrementalRecognizer(
+        block_size=config.get('block_size', 16),
+        margin=config.get('margin', 8),
+        max_changed_fraction=config.get('max_changed_fraction', 0.5),
+    )
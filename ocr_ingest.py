@@ -0,0 +1,144 @@
+# ocr_ingest.py
+# ----------------------------------------------------------------------
+# 图片文件读取层：
+# - 文件以内存映射 (mmap) 方式交给 PIL，不先把整个文件读入内存；
+# - 多页 TIFF 逐页解码 (生成器)，同一时刻只持有一页像素，峰值内存与页数无关；
+# - 解码时直接按最终需要的分辨率缩小：JPEG 使用 draft 模式在 DCT 域按 1/2、1/4、1/8 解码，
+#   其他格式解码后用 reduce 按整数倍快速缩小，剩余的精确缩放交给 ocr_engine 的预处理。
+# ----------------------------------------------------------------------
+
+import math
+import mmap
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+from PIL import Image
+
+from config_loader import get_ingest_config
+from ocr_metrics import get_metrics
+
+# 文件对话框与批处理收集的图片扩展名
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+# 逐页解码的格式 (GIF 等动画格式只取第一帧)
+_MULTI_PAGE_FORMATS = ('TIFF',)
+
+# reduce() 支持的图片模式，其他模式先转换为 RGB
+_REDUCE_MODES = ('L', 'RGB', 'RGBA', 'I', 'F')
+
+# 解码后的一页：image 为 BGR 数组，scale 为解码尺寸相对原始尺寸的比例 (文本框坐标除以 scale 即为原图坐标)
+Page = namedtuple('Page', ['index', 'count', 'image', 'scale'])
+
+
+def pil_to_model_array(img_pil):
+    """
+    将 PIL Image 转换为 PaddleOCR 约定的 BGR NumPy 数组。
+    - 由 PIL 直接按 BGR 顺序导出像素，只产生一次内存拷贝，无需编码为 PNG 再解码。
+    """
+    if img_pil.mode != 'RGB':
+        img_pil = img_pil.convert('RGB')
+    width, height = img_pil.size
+    buffer = img_pil.tobytes('raw', 'BGR')
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+
+
+def check_file_size(file_path):
+    """文件超过 ingest_config.max_file_mb 时抛出 ValueError (0 表示不限制)。"""
+    max_mb = float(get_ingest_config().get('max_file_mb', 0) or 0)
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    if max_mb and size_mb > max_mb:
+        raise ValueError(f"文件过大 ({size_mb:.1f} MB)，超过上限 {max_mb:g} MB: {file_path}")
+
+
+@contextmanager
+def map_file(file_path):
+    """以只读内存映射打开文件，产出可供 PIL / hashlib 读取的对象；空文件等无法映射时退回普通文件对象。"""
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            yield f
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+@contextmanager
+def open_image(file_path):
+    """检查文件大小后，经内存映射打开图片 (不解码像素)。"""
+    check_file_size(file_path)
+    with map_file(file_path) as source:
+        with Image.open(source) as img:
+            yield img
+
+
+def page_count(img):
+    """图片的页数：多页 TIFF 为页数，其他格式为 1。"""
+    count = getattr(img, 'n_frames', 1) if img.format in _MULTI_PAGE_FORMATS else 1
+    max_pages = int(get_ingest_config().get('max_pages', 0) or 0)
+    return min(count, max_pages) if max_pages else count
+
+
+def decode_page(img, scale_for=None):
+    """
+    解码当前页为 BGR 数组。
+    :param scale_for: 可选函数 scale_for(width, height) -> 预处理最终会缩小到的比例 (<= 1)；
+                      提供时解码阶段直接缩小，避免先解码出全尺寸像素
+    :return: (BGR 数组, 实际缩放比例)
+    """
+    width, height = img.size
+    scale = min(1.0, scale_for(width, height)) if scale_for is not None else 1.0
+    page = img
+    if scale < 1.0:
+        target = (max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale)))
+        if img.format == 'JPEG':
+            # 按不小于 target 的最大 1/2^n 比例解码
+            img.draft('RGB', target)
+        if page.mode not in _REDUCE_MODES:
+            page = page.convert('RGB')
+        factor = min(page.size[0] // target[0], page.size[1] // target[1])
+        if factor >= 2:
+            page = page.reduce(factor)
+    return pil_to_model_array(page), page.size[0] / width
+
+
+def iter_pages(file_path, scale_for=None):
+    """
+    逐页解码图片文件，yield Page。调用方处理完一页后再取下一页，内存中只保留一页像素。
+    :param scale_for: 见 decode_page
+    """
+    with open_image(file_path) as img:
+        count = page_count(img)
+        for index in range(count):
+            if index:
+                img.seek(index)
+            with get_metrics().timer('decode'):
+                page = Page(index, count, *decode_page(img, scale_for))
+            yield page
+            # 解码下一页之前释放本页，调用方不再持有时内存即可回收
+            del page
+
+
+def read_page(file_path, index=0, scale_for=None):
+    """解码文件中的一页 (默认第一页)，返回 Page。"""
+    with open_image(file_path) as img:
+        count = page_count(img)
+        if not 0 <= index < count:
+            raise IndexError(f"页码超出范围: {index} (共 {count} 页)")
+        if index:
+            img.seek(index)
+        with get_metrics().timer('decode'):
+            image, scale = decode_page(img, scale_for)
+        return Page(index, count, image, scale)
+
+
+def load_preview(file_path, max_size):
+    """读取第一页的缩略图 (PIL RGB 图片，用于界面预览)，返回的图片不再引用文件。"""
+    with open_image(file_path) as img:
+        # thumbnail() 对 JPEG 先按 draft 模式解码，再逐步缩小
+        img.thumbnail(max_size)
+        return img.convert('RGB')
@@ -0,0 +1,128 @@
+# ocr_jobs.py
+# ----------------------------------------------------------------------
+# GUI 识别任务管理：
+# - 新任务默认取代 (supersede) 旧任务：排队中的旧任务不再执行，执行中的旧任务
+#   在下一个检查点 (检测前、识别前、分块之间) 中止，用户重新截图后无需等待过期结果；
+# - 去重：与未完成任务 key 相同的提交直接返回已有任务 (例如重复选择同一文件)；
+# - shutdown() 取消全部任务并等待执行中的任务退出，程序关闭时干净收尾。
+# ----------------------------------------------------------------------
+
+import logging
+import threading
+from concurrent.futures import CancelledError, wait
+
+from ocr_engine import OcrCancelledError, cancellation_scope
+from ocr_metrics import submit_timed
+
+logger = logging.getLogger(__name__)
+
+
+class OcrJob:
+    """一个已提交的识别任务：future 为执行器返回的 Future，cancel() 请求取消。"""
+
+    __slots__ = ('key', 'future', '_token')
+
+    def __init__(self, key=None):
+        self.key = key
+        self.future = None
+        self._token = threading.Event()
+
+    @property
+    def cancelled(self):
+        """是否已请求取消 (执行中的任务要到下一个检查点才真正停止)。"""
+        return self._token.is_set()
+
+    def cancel(self):
+        """请求取消：排队中的任务不再执行，执行中的任务在下一个检查点抛出 OcrCancelledError。"""
+        self._token.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout=None):
+        """
+        返回任务结果；任务被取消时抛出 OcrCancelledError
+        (无论是排队中被取消还是在检查点中止)。
+        """
+        try:
+            return self.future.result(timeout=timeout)
+        except CancelledError:
+            raise OcrCancelledError("识别任务已取消") from None
+
+
+class OcrJobManager:
+    """在共享执行器上提交可取消、可取代、可去重的识别任务。"""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._jobs = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def active(self):
+        """尚未完成的任务数。"""
+        with self._lock:
+            return len(self._jobs)
+
+    def submit(self, fn, *args, key=None, supersede=True, **kwargs):
+        """
+        提交任务，返回 OcrJob。
+        :param key: 去重键；与某个未完成且未取消的任务相同时直接返回该任务
+        :param supersede: 为 True 时取消所有其他未完成的任务
+        :raises RuntimeError: 管理器已关闭
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("任务管理器已关闭")
+            if key is not None:
+                for job in self._jobs:
+                    if job.key == key and not job.cancelled:
+                        logger.debug(f"相同任务仍在进行中，复用: {key}")
+                        return job
+            if supersede:
+                for job in self._jobs:
+                    job.cancel()
+
+            job = OcrJob(key)
+
+            def run():
+                # 提交后、开始执行前被取代的任务直接结束
+                if job.cancelled:
+                    raise OcrCancelledError("识别任务已取消")
+                with cancellation_scope(job._token):
+                    return fn(*args, **kwargs)
+
+            # 排队等待时间由 submit_timed 统一记录
+            job.future = submit_timed(self.executor, run)
+            self._jobs.add(job)
+        job.future.add_done_callback(lambda _: self._discard(job))
+        return job
+
+    def _discard(self, job):
+        with self._lock:
+            self._jobs.discard(job)
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.cancel()
+
+    def shutdown(self, timeout=5.0):
+        """
+        取消所有任务并最多等待 timeout 秒，让执行中的任务在检查点退出；
+        之后不再接受新任务。执行器本身由调用方关闭。
+        :return: True 表示所有任务都已结束
+        """
+        with self._lock:
+            self._closed = True
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.cancel()
+        _, not_done = wait([job.future for job in jobs], timeout=timeout)
+        if not_done:
+            logger.warning(f"仍有 {len(not_done)} 个识别任务未在 {timeout} 秒内结束。")
+        return not not_done
@@ -0,0 +1,223 @@
+# ocr_layout.py
+# ----------------------------------------------------------------------
+# 版面分析：利用检测阶段返回的文本框，把识别出的文本行按阅读顺序分组为段落，
+# 而不是简单地全部用空格连接 (那样会打乱分栏与表格)。
+# - 分栏：按文本框在 x 方向投影的空白间隔切分栏，横跨分栏的文本框 (如标题) 单独成节；
+# - 表格：相邻两栏的文本框大多上下对齐、且不像正文栏那样铺满栏宽时，按行合并，单元格以制表符分隔；
+# - 竖排文本 (如日文竖排)：多数文本框高远大于宽时，按从右到左的列处理；
+# - 行与段落：按中心纵坐标排序后以相邻差值切行，以行距与首行缩进切段。
+# 全部分组都基于排序 + 向量化运算，复杂度 O(n log n)，没有两两比较的循环。
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+from config_loader import get_layout_config
+
+# 默认参数 (长度均以文本框高度的中位数为单位)
+DEFAULT_LAYOUT = {
+    # 版面分析开关，关闭时退回空格连接
+    "enabled": True,
+    # 栏间距超过该值时视为分栏；行内两个文本框的间距超过该值时视为不同单元格
+    "column_gap": 1.0,
+    # 相邻文本框中心纵坐标之差不超过该值时属于同一行
+    "line_tolerance": 0.5,
+    # 相邻两行的间距超过该值时开始新段落
+    "paragraph_gap": 0.8,
+    # 行首相对栏左边缘缩进超过该值时开始新段落
+    "indent": 1.5,
+    # 文本框高宽比超过该值 (且至少两个字符) 视为竖排
+    "vertical_ratio": 1.5,
+    # 正文栏中文本框宽度的中位数至少占栏宽的比例，低于该值且与相邻栏逐行对齐时视为表格
+    "text_column_fill": 0.7,
+}
+
+
+class Line:
+    """版面中的一行：cells 为按阅读顺序排列的单元格文本 (普通文本行只有一个单元格)。"""
+
+    __slots__ = ('cells',)
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    @property
+    def is_table_row(self):
+        return len(self.cells) > 1
+
+    def __repr__(self):
+        return f"Line({self.cells!r})"
+
+
+def _gap_boundaries(starts, ends, min_gap):
+    """
+    一维区间的投影中宽度超过 min_gap 的空白，返回各空白中点 (升序)，可用于 np.searchsorted 分组。
+    """
+    order = np.argsort(starts, kind='stable')
+    sorted_starts = starts[order]
+    reach = np.maximum.accumulate(ends[order])
+    gaps = sorted_starts[1:] - reach[:-1]
+    cut = np.flatnonzero(gaps > min_gap)
+    boundaries = (sorted_starts[cut + 1] + reach[cut]) / 2
+    return boundaries
+
+
+def _merge_table_columns(col, cy, widths, column_widths, section, unit, params):
+    """
+    同一节中相邻两栏的文本框多数上下对齐、且都不是正文栏时，视为同一表格，合并为一栏。
+    各 (节, 栏) 分组由一次排序得到，总耗时 O(n log n)。
+    :return: 合并后的栏号
+    """
+    merged = col.copy()
+    order = np.lexsort((col, section))
+    keys = np.stack((section[order], col[order]), axis=1)
+    splits = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    groups = np.split(order, splits)
+    tolerance = params["line_tolerance"] * unit
+
+    for left, right in zip(groups[:-1], groups[1:]):
+        if section[left[0]] != section[right[0]]:
+            continue
+        fill_left = np.median(widths[left]) / column_widths[col[left[0]]]
+        fill_right = np.median(widths[right]) / column_widths[col[right[0]]]
+        if min(fill_left, fill_right) >= params["text_column_fill"]:
+            continue
+        if (_aligned_fraction(cy[left], cy[right], tolerance) >= 0.5
+                and _aligned_fraction(cy[right], cy[left], tolerance) >= 0.5):
+            # 左栏可能已并入更左侧的栏，沿用其合并后的栏号
+            merged[right] = merged[left[0]]
+    return merged
+
+
+def _aligned_fraction(values, others, tolerance):
+    """values 中与 others 里最近的值相差不超过 tolerance 的比例 (排序 + 二分查找)。"""
+    others = np.sort(others)
+    pos = np.searchsorted(others, values)
+    after = others[np.minimum(pos, len(others) - 1)]
+    before = others[np.maximum(pos - 1, 0)]
+    nearest = np.minimum(np.abs(after - values), np.abs(before - values))
+    return float(np.mean(nearest <= tolerance))
+
+
+def group_lines(texts, polys, **overrides):
+    """
+    按阅读顺序把文本框分组为段落。
+    :param texts: 识别文本列表
+    :param polys: 文本框顶点，形状 (N, 4, 2)
+    :param overrides: 覆盖 layout_config 中的参数
+    :return: 段落列表，每个段落是 Line 列表；版面分析未启用或文本框无效 (如全为 0) 时返回 None
+    """
+    params = dict(DEFAULT_LAYOUT)
+    params.update(get_layout_config())
+    params.update(overrides)
+    if not params["enabled"]:
+        return None
+
+    count = len(texts)
+    polys = np.asarray(polys, dtype=np.float32).reshape(-1, 4, 2)
+    if count == 0 or len(polys) != count:
+        return None
+    mins, maxs = polys.min(axis=1), polys.max(axis=1)
+    x0, y0, x1, y1 = mins[:, 0], mins[:, 1], maxs[:, 0], maxs[:, 1]
+    widths, heights = x1 - x0, y1 - y0
+    if not np.any(heights > 0):
+        return None
+
+    # 1. 竖排：多数多字符文本框高远大于宽时，旋转坐标使“列”变成“行” (从右到左、从上到下)
+    multi_char = np.fromiter((len(t) > 1 for t in texts), dtype=bool, count=count)
+    tall = heights > widths * params["vertical_ratio"]
+    vertical = multi_char.any() and np.count_nonzero(tall & multi_char) * 2 > np.count_nonzero(multi_char)
+    if vertical:
+        x0, x1, y0, y1 = y0, y1, -x1, -x0
+        widths, heights = x1 - x0, y1 - y0
+
+    unit = max(float(np.median(heights)), 1.0)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+
+    # 2. 分栏：只用不太宽的文本框计算 x 方向的空白，避免标题把两栏连在一起
+    page_width = max(float(x1.max() - x0.min()), 1.0)
+    narrow = widths < page_width * 0.6
+    source = narrow if narrow.any() else np.ones(count, dtype=bool)
+    boundaries = _gap_boundaries(x0[source], x1[source], params["column_gap"] * unit)
+    col = np.searchsorted(boundaries, cx)
+    spanning = np.searchsorted(boundaries, x0) != np.searchsorted(boundaries, x1)
+
+    # 3. 分节：按中心纵坐标排序，横跨分栏的文本框与普通文本框交替处即为节的边界
+    by_y = np.argsort(cy, kind='stable')
+    flags = spanning[by_y]
+    section = np.empty(count, dtype=np.int64)
+    section[by_y] = np.concatenate(([0], np.cumsum(flags[1:] != flags[:-1])))
+    col[spanning] = 0
+
+    # 4. 表格：逐行对齐的相邻窄栏合并
+    if len(boundaries):
+        edges = np.concatenate(([x0.min()], boundaries, [x1.max()]))
+        column_widths = np.maximum(np.diff(edges), 1.0)
+        col = _merge_table_columns(col, cy, widths, column_widths, section, unit, params)
+
+    # 5. 切行：按 (节, 栏, 中心纵坐标) 排序，块变化或纵坐标跳变处开始新行
+    order = np.lexsort((cy, col, section))
+    block = section[order] * (len(boundaries) + 1) + col[order]
+    new_block = np.concatenate(([True], block[1:] != block[:-1]))
+    new_line = new_block | np.concatenate(([True], np.diff(cy[order]) > params["line_tolerance"] * unit))
+    line_of = np.empty(count, dtype=np.int64)
+    line_of[order] = np.cumsum(new_line) - 1
+
+    # 6. 行内按左边缘排序，得到最终阅读顺序
+    reading = np.lexsort((x0, line_of))
+    line_sorted = line_of[reading]
+    starts = np.flatnonzero(np.concatenate(([True], line_sorted[1:] != line_sorted[:-1])))
+
+    # 7. 每行的范围与单元格切分 (行内间距超过 column_gap 即为新单元格)
+    line_x0 = np.minimum.reduceat(x0[reading], starts)
+    line_y0 = np.minimum.reduceat(y0[reading], starts)
+    line_y1 = np.maximum.reduceat(y1[reading], starts)
+    first_of_line = reading[starts]
+    line_block = section[first_of_line] * (len(boundaries) + 1) + col[first_of_line]
+    prev_end = np.concatenate(([-np.inf], x1[reading][:-1]))
+    new_cell = (x0[reading] - prev_end) > params["column_gap"] * unit
+    new_cell[starts] = True
+
+    # 8. 分段：块变化、行距过大，或出现首行缩进
+    _, block_index = np.unique(line_block, return_inverse=True)
+    left_edge = np.full(block_index.max() + 1, np.inf, dtype=np.float32)
+    np.minimum.at(left_edge, block_index, line_x0)
+    indented = (line_x0 - left_edge[block_index]) > params["indent"] * unit
+    new_paragraph = np.ones(len(starts), dtype=bool)
+    new_paragraph[1:] = ((line_block[1:] != line_block[:-1])
+                         | ((line_y0[1:] - line_y1[:-1]) > params["paragraph_gap"] * unit)
+                         | (indented[1:] & ~indented[:-1]))
+
+    # 9. 组装文本 (O(n) 的字符串拼接)
+    joiner = "" if vertical else " "
+    ordered_texts = [texts[i] for i in reading]
+    cell_starts = np.flatnonzero(new_cell).tolist() + [count]
+    cells = [joiner.join(ordered_texts[a:b]) for a, b in zip(cell_starts[:-1], cell_starts[1:])]
+    cells_per_line = np.add.reduceat(new_cell.astype(np.int64), starts).tolist()
+
+    paragraphs = []
+    cell_index = 0
+    for number, cell_count in enumerate(cells_per_line):
+        if new_paragraph[number]:
+            paragraphs.append([])
+        paragraphs[-1].append(Line(cells[cell_index:cell_index + cell_count]))
+        cell_index += cell_count
+    return paragraphs
+
+
+def layout_text(texts, polys, postprocess, **overrides):
+    """
+    按版面生成展示文本：普通段落交给 postprocess (按标点断句)，
+    表格行逐行输出、单元格以制表符分隔；段落之间空一行。
+    :param postprocess: 文本后处理函数 (见 ocr_postprocess.get_postprocessor)
+    :return: 文本；版面分析不可用时返回 None
+    """
+    paragraphs = group_lines(texts, polys, **overrides)
+    if paragraphs is None:
+        return None
+    blocks = []
+    for lines in paragraphs:
+        if any(line.is_table_row for line in lines):
+            blocks.append("\n".join("\t".join(line.cells) for line in lines))
+        else:
+            blocks.append(postprocess([line.cells[0] for line in lines]))
+    return "\n\n".join(block for block in blocks if block)
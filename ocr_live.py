@@ -0,0 +1,188 @@
+# ocr_live.py
+# ----------------------------------------------------------------------
+# 实时识别：按固定间隔截取同一屏幕区域，只有内容发生明显变化时才提交 OCR。
+# - 变化判断使用缩小后的灰度图的差分哈希：先按步长抽样再分块求均值，单次计算只需零点几毫秒；
+#   与上一次提交识别的帧相比，不同的比特数超过 change_threshold 才视为变化；
+# - 识别频率上限为 max_ocr_per_s，上一次识别尚未完成时不提交新任务；
+#   因限速或忙碌而放弃的帧计入统计 (内容仍在变化时，下一次截图会再次尝试)。
+# ----------------------------------------------------------------------
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+from config_loader import get_live_config
+from ocr_metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# BGR 转灰度的系数
+_GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def _block_means(values, bins, axis):
+    """沿 axis 把 values 均匀分成 bins 组并求各组均值。"""
+    length = values.shape[axis]
+    edges = np.linspace(0, length, bins + 1).astype(np.int64)
+    starts = np.minimum(edges[:-1], length - 1)
+    counts = np.maximum(np.diff(edges), 1)
+    sums = np.add.reduceat(values, starts, axis=axis)
+    shape = [1, 1]
+    shape[axis] = bins
+    return sums / counts.reshape(shape)
+
+
+def frame_hash(frame, hash_size=32, tolerance=2.0):
+    """
+    计算截图的差分哈希：缩小为 (hash_size + 1) x (hash_size + 1) 的灰度图，
+    每个格子与右侧、下方相邻格子的亮度差超过 tolerance 时对应比特为 1 (横竖两个方向，文字行的上下边缘同样敏感)。
+    均匀背景上零星的像素噪声被格子均值摊薄，不会翻转比特。
+    :param frame: HxWx3 (BGR) 或 HxWx4 (BGRA) 的 uint8 数组
+    :return: 打包后的比特数组 (2 * hash_size * hash_size 位)
+    """
+    height, width = frame.shape[:2]
+    # 先按步长抽样，使参与计算的像素数与截图大小无关
+    step = max(1, min(height // (hash_size * 4), width // (hash_size * 4)))
+    sample = frame[::step, ::step, :3].astype(np.float32) @ _GRAY_WEIGHTS
+    small = _block_means(_block_means(sample, hash_size + 1, axis=0), hash_size + 1, axis=1)
+    horizontal = np.abs(small[:-1, 1:] - small[:-1, :-1]) > tolerance
+    vertical = np.abs(small[1:, :-1] - small[:-1, :-1]) > tolerance
+    return np.packbits(np.concatenate((horizontal.ravel(), vertical.ravel())))
+
+
+def hash_distance(a, b):
+    """两个哈希不同的比特数。"""
+    return int(np.unpackbits(np.bitwise_xor(a, b)).sum())
+
+
+class LiveCapture:
+    """
+    周期性截取同一区域并按内容变化提交识别。
+    tick() 执行一次截图与判断；start() 在后台线程中每隔 interval_s 秒调用一次 tick()。
+    """
+
+    def __init__(self, grab, recognize, interval_s=0.5, max_ocr_per_s=1.0, hash_size=32, change_threshold=8,
+                 on_stop=None, clock=time.monotonic):
+        """
+        :param grab: 截图函数 grab() -> BGRA / BGR 数组
+        :param recognize: 提交识别的函数 recognize(frame) -> concurrent.futures.Future
+        :param max_ocr_per_s: 每秒最多提交的识别次数，0 表示不限制
+        :param change_threshold: 哈希不同的比特数超过该值时视为内容变化
+        :param on_stop: 后台线程退出前调用 (在该线程中)，例如释放线程的截图会话
+        :param clock: 单调时钟，测试时可替换
+        """
+        self.grab = grab
+        self.recognize = recognize
+        self.interval_s = max(0.05, float(interval_s))
+        self.min_ocr_interval = 1.0 / max_ocr_per_s if max_ocr_per_s else 0.0
+        self.hash_size = max(2, int(hash_size))
+        self.change_threshold = max(0, int(change_threshold))
+        self.on_stop = on_stop
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_hash = None  # 最近一次提交识别的帧的哈希
+        self._last_submit = None
+        self._inflight = None
+        self._stats = {'frames': 0, 'unchanged': 0, 'dropped_busy': 0, 'dropped_rate': 0, 'recognized': 0}
+
+    @property
+    def stats(self):
+        """截图帧数、内容未变而跳过的帧数、因识别未完成 / 限速而丢弃的帧数与提交识别的次数。"""
+        with self._lock:
+            return dict(self._stats)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+        get_metrics().increment(f'live_{key}')
+
+    def tick(self):
+        """
+        截图一次并按需提交识别。
+        :return: 'unchanged'、'dropped' 或 'recognized'
+        """
+        frame = self.grab()
+        digest = frame_hash(frame, self.hash_size)
+        self._count('frames')
+
+        if self._last_hash is not None and hash_distance(digest, self._last_hash) <= self.change_threshold:
+            self._count('unchanged')
+            return 'unchanged'
+
+        if self._inflight is not None and not self._inflight.done():
+            self._count('dropped_busy')
+            return 'dropped'
+        now = self._clock()
+        if self._last_submit is not None and now - self._last_submit < self.min_ocr_interval:
+            self._count('dropped_rate')
+            return 'dropped'
+
+        future = self.recognize(frame)
+        self._inflight = future
+        self._last_hash = digest
+        self._last_submit = now
+        self._count('recognized')
+        future.add_done_callback(lambda f: self._on_done(f, digest))
+        return 'recognized'
+
+    def _on_done(self, future, digest):
+        # 识别失败或被取消时忘记该帧，内容不变也会重新识别
+        if future.cancelled() or future.exception() is not None:
+            if self._last_hash is digest:
+                self._last_hash = None
+
+    def start(self):
+        """启动后台截图线程。"""
+        if self.running:
+            return self
+        self._stop_event.clear()
+
+        def loop():
+            try:
+                while not self._stop_event.is_set():
+                    started = time.perf_counter()
+                    try:
+                        self.tick()
+                    except Exception as e:
+                        logger.exception(f"实时识别截图失败: {e}")
+                    self._stop_event.wait(max(0.0, self.interval_s - (time.perf_counter() - started)))
+            finally:
+                if self.on_stop is not None:
+                    self.on_stop()
+
+        self._thread = threading.Thread(target=loop, name="live-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"实时识别已启动：每 {self.interval_s} 秒截图一次。")
+        return self
+
+    def stop(self, timeout=2.0):
+        """停止后台截图线程 (已提交的识别任务不受影响)。"""
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        stats = self.stats
+        logger.info(f"实时识别已停止：截图 {stats['frames']} 帧，识别 {stats['recognized']} 次，"
+                    f"内容未变 {stats['unchanged']} 帧，丢弃 {stats['dropped_busy'] + stats['dropped_rate']} 帧。")
+
+
+def create_live_capture(grab, recognize, on_stop=None):
+    """根据 config.yaml 中的 live_config 创建 LiveCapture。"""
+    config = get_live_config()
+    return LiveCapture(
+        grab,
+        recognize,
+        interval_s=config.get('interval_s', 0.5),
+        max_ocr_per_s=config.get('max_ocr_per_s', 1.0),
+        hash_size=config.get('hash_size', 32),
+        change_threshold=config.get('change_threshold', 8),
+        on_stop=on_stop,
+    )
@@ -0,0 +1,158 @@
+# ocr_metrics.py
+# ----------------------------------------------------------------------
+# OCR 流水线的分阶段性能统计：
+# - 各阶段 (解码、预处理、检测、识别、后处理、执行器排队等待等) 的耗时分布，
+#   按最近 N 次样本计算 p50 / p95 / p99；
+# - 计数器 (识别次数、缓存命中 / 未命中、错误数等)；
+# - 可选的定时任务，把统计摘要周期性写入 logging_config 配置的日志。
+# ----------------------------------------------------------------------
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 每个阶段保留的最近样本数 (用于计算分位数)
+DEFAULT_WINDOW = 1024
+
+# 摘要中各阶段的展示顺序 (其余阶段按名称排在后面)
+STAGE_ORDER = ('queue_wait', 'decode', 'preprocess', 'det', 'rec', 'predict', 'postprocess', 'recognize',
+               'end_to_end')
+
+
+class _StageStats:
+    """单个阶段的耗时统计：全量计数 / 总和 / 最大值，以及最近 window 个样本。"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'samples')
+
+    def __init__(self, window):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=window)
+
+    def add(self, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.samples.append(elapsed_ms)
+
+    def summary(self):
+        p50, p95, p99 = np.percentile(np.fromiter(self.samples, dtype=np.float64), (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class OcrMetrics:
+    """
+    线程安全的阶段耗时与计数器注册表。
+    - record(stage, ms) / timer(stage)：记录一次阶段耗时；
+    - increment(name)：计数器加一；
+    - snapshot()：返回当前统计的字典，可直接 JSON 序列化。
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = max(1, int(window))
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, elapsed_ms):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats(self.window)
+            stats.add(float(elapsed_ms))
+
+    @contextmanager
+    def timer(self, stage):
+        """with metrics.timer('decode'): ... 统计代码块耗时 (异常时同样记录)。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: stats.summary() for name, stats in self._stages.items()}
+            counters = dict(self._counters)
+        return {"stages": stages, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def format_summary(self):
+        """生成一段便于阅读的多行摘要文本 (用于日志)。"""
+        snapshot = self.snapshot()
+        if not snapshot["stages"] and not snapshot["counters"]:
+            return "暂无统计数据。"
+
+        order = {name: i for i, name in enumerate(STAGE_ORDER)}
+        names = sorted(snapshot["stages"], key=lambda name: (order.get(name, len(order)), name))
+        lines = [f"{'阶段':<12}{'次数':>8}{'平均':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'最大':>10}"]
+        for name in names:
+            s = snapshot["stages"][name]
+            lines.append(f"{name:<12}{s['count']:>8}{s['mean_ms']:>10.1f}{s['p50_ms']:>10.1f}"
+                         f"{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+        if snapshot["counters"]:
+            lines.append("计数: " + ", ".join(f"{k}={v}" for k, v in sorted(snapshot["counters"].items())))
+        return "\n".join(lines)
+
+
+# 模块级共享实例：ocr_engine、GUI 与批处理入口都记录到这里
+_METRICS = OcrMetrics()
+
+
+def get_metrics():
+    """返回全局共享的 OcrMetrics 实例。"""
+    return _METRICS
+
+
+def submit_timed(executor, fn, *args, **kwargs):
+    """
+    向执行器提交任务，并把任务在队列中等待的时间记录为 queue_wait 阶段。
+    """
+    submitted_at = time.perf_counter()
+
+    def run():
+        get_metrics().record('queue_wait', (time.perf_counter() - submitted_at) * 1000)
+        return fn(*args, **kwargs)
+
+    return executor.submit(run)
+
+
+def start_periodic_dump(interval_s, metrics=None):
+    """
+    启动后台线程，每隔 interval_s 秒把统计摘要写入日志。
+    :return: threading.Event，调用其 set() 停止定时输出；interval_s <= 0 时返回 None
+    """
+    if not interval_s or interval_s <= 0:
+        return None
+    metrics = metrics or get_metrics()
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.wait(interval_s):
+            logger.info("OCR 性能统计：\n" + metrics.format_summary())
+
+    threading.Thread(target=loop, name="ocr-metrics-dump", daemon=True).start()
+    logger.info(f"性能统计将每 {interval_s} 秒写入日志。")
+    return stop_event
@@ -0,0 +1,302 @@
+# ocr_pdf.py
+# ----------------------------------------------------------------------
+# PDF 识别 (依赖可选的 pypdfium2)：
+# - 页面在识别前才按 pdf_config.dpi 栅格化 (并按预处理需要的分辨率直接缩小)，内存中只保留正在识别的页；
+# - 页面自带文本层 (电子版 PDF) 且字符数达到 min_text_chars 时直接提取文本，不再 OCR；
+# - 各页分发到执行器的多个工作线程处理，调用线程也参与处理，结果按页码重新排序，并记录每页耗时。
+# PDFium 不是线程安全的，所有 PDFium 调用 (打开、栅格化、提取文本) 由一把全局锁串行化；
+# 同时调用模型的线程数不超过 OCR 实例的 parallelism (线程后端只有一个模型，OCR 串行执行)，
+# 因此多线程的收益在于一页 OCR 的同时栅格化 / 提取下一页。
+# ----------------------------------------------------------------------
+
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # 未安装 pypdfium2 时不支持 PDF
+    pdfium = None
+
+from config_loader import get_pdf_config, get_ingest_config
+from ocr_cache import compute_file_key
+from ocr_engine import (OcrCancelledError, cancellation_scope, check_cancelled, current_cancellation_token,
+                        decode_scale, recognize_page)
+from ocr_ingest import Page, check_file_size
+from ocr_metrics import get_metrics
+from ocr_result import OcrResult
+
+logger = logging.getLogger(__name__)
+
+PDF_EXTENSIONS = ('.pdf',)
+
+# PDF 坐标单位 (point) 为 1/72 英寸
+_POINTS_PER_INCH = 72.0
+
+_PDFIUM_LOCK = threading.Lock()
+
+# 一页的识别结果：source 为 'text' (文本层) 或 'ocr'；elapsed_ms 为该页栅格化 + 识别 (或提取文本) 的耗时
+PdfPage = namedtuple('PdfPage', ['index', 'count', 'text', 'source', 'elapsed_ms', 'result'])
+
+
+def pdf_available():
+    """是否已安装 pypdfium2。"""
+    return pdfium is not None
+
+
+def is_pdf(file_path):
+    return str(file_path).lower().endswith(PDF_EXTENSIONS)
+
+
+class PdfDocument:
+    """
+    线程安全的 PDF 文档封装：PDFium 按需读取文件内容，不会把整个文件读入内存。
+    可在多个线程中同时调用 render() / text_layer()，PDFium 调用会被串行化。
+    """
+
+    def __init__(self, file_path):
+        if pdfium is None:
+            raise RuntimeError("未安装 pypdfium2，无法读取 PDF 文件 (pip install pypdfium2)。")
+        check_file_size(file_path)
+        with _PDFIUM_LOCK:
+            self._doc = pdfium.PdfDocument(file_path)
+            count = len(self._doc)
+        max_pages = int(get_ingest_config().get('max_pages', 0) or 0)
+        self.page_count = min(count, max_pages) if max_pages else count
+
+    def __len__(self):
+        return self.page_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with _PDFIUM_LOCK:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+
+    def text_layer(self, index):
+        """返回该页文本层的文本 (扫描件通常为空字符串)。"""
+        with _PDFIUM_LOCK:
+            page = self._doc[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    return textpage.get_text_range()
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+
+    def render(self, index, dpi, scale_for=None):
+        """
+        按 dpi 栅格化一页，返回 ocr_ingest.Page (BGR 数组)。
+        :param scale_for: 见 ocr_ingest.decode_page；提供时直接以缩小后的分辨率栅格化，
+                          Page.scale 为相对 dpi 分辨率的比例
+        """
+        scale = dpi / _POINTS_PER_INCH
+        with _PDFIUM_LOCK:
+            page = self._doc[index]
+            try:
+                width, height = page.get_size()
+                width, height = width * scale, height * scale
+                factor = min(1.0, scale_for(width, height)) if scale_for is not None else 1.0
+                bitmap = page.render(scale=scale * factor)
+                try:
+                    # PDFium 默认输出 BGR，拷贝出位图缓冲区后即可释放位图
+                    image = np.array(bitmap.to_numpy()[:, :, :3])
+                finally:
+                    bitmap.close()
+            finally:
+                page.close()
+        return Page(index, self.page_count, image, image.shape[1] / width)
+
+
+def _clean_text_layer(text):
+    """文本层的换行统一为 \\n，去掉行尾空白与空行。"""
+    lines = (line.rstrip() for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'))
+    return "\n".join(line for line in lines if line)
+
+
+def _recognize_pdf_page(ocr_instance, doc, index, config, lang, ocr_slots):
+    """
+    处理一页：文本层足够时直接使用，否则栅格化后 OCR。出错时返回失败结果 (取消除外)。
+    :param ocr_slots: 限制同时调用模型的线程数的信号量，只在 OCR 期间持有
+    """
+    start = time.perf_counter()
+    metrics = get_metrics()
+    try:
+        if config.get('use_text_layer', True):
+            text = _clean_text_layer(doc.text_layer(index))
+            if len(text) >= int(config.get('min_text_chars', 20)):
+                metrics.increment('pdf_text_pages')
+                return PdfPage(index, doc.page_count, text, 'text', (time.perf_counter() - start) * 1000, None)
+
+        check_cancelled()
+        with metrics.timer('decode'):
+            page = doc.render(index, float(config.get('dpi', 200)), scale_for=decode_scale)
+        with ocr_slots:
+            result = recognize_page(ocr_instance, page)
+    except OcrCancelledError:
+        raise
+    except Exception as e:
+        logger.exception(f"PDF 第 {index + 1} 页处理出错: {e}")
+        result = OcrResult.failure("错误：OCR 识别任务执行失败，请查看日志文件了解详情。")
+    metrics.increment('pdf_ocr_pages')
+    metrics.record('recognize', (time.perf_counter() - start) * 1000)
+    metrics.increment('requests')
+    if not result.ok:
+        metrics.increment('errors')
+    return PdfPage(index, doc.page_count, result.to_text(lang), 'ocr', (time.perf_counter() - start) * 1000, result)
+
+
+def recognize_pdf(ocr_instance, file_path, executor=None, lang=None, on_page=None):
+    """
+    识别 PDF 的每一页，返回按页码排序的 PdfPage 列表。
+    :param executor: 提供时把各页分发到执行器的其他工作线程并行处理；调用线程同样处理页面，
+                     因此即使执行器没有空闲线程 (例如调用方本身就运行在执行器中) 也不会死锁。
+                     栅格化与文本层提取可与 OCR 重叠，同时调用模型的线程数不超过 ocr_instance.parallelism
+    :param on_page: 可选回调 on_page(PdfPage)，每完成一页调用一次 (按完成顺序，可能在任一工作线程中)
+    :raises OcrCancelledError: 所在任务被取消
+    :raises RuntimeError: 未安装 pypdfium2，或 PDF 无法解析 (pypdfium2.PdfiumError)
+    :raises ValueError: 文件超过 ingest_config.max_file_mb
+    """
+    config = get_pdf_config()
+    token = current_cancellation_token()
+    # 线程后端只有一个模型，不能被多个线程同时调用；进程池后端可同时处理 parallelism 个请求
+    ocr_slots = threading.BoundedSemaphore(max(1, int(getattr(ocr_instance, 'parallelism', 1))))
+    total_start = time.perf_counter()
+
+    with PdfDocument(file_path) as doc:
+        count = doc.page_count
+        pages = [None] * count
+        # next: 下一个待领取的页码；active: 已领取、尚未处理完的页数
+        state = {'next': 0, 'active': 0, 'error': None}
+        cond = threading.Condition()
+
+        def claim():
+            with cond:
+                if state['error'] is not None or state['next'] >= count:
+                    return None
+                index = state['next']
+                state['next'] += 1
+                state['active'] += 1
+                return index
+
+        def work():
+            with cancellation_scope(token):
+                while True:
+                    index = claim()
+                    if index is None:
+                        return
+                    try:
+                        page = _recognize_pdf_page(ocr_instance, doc, index, config, lang, ocr_slots)
+                        pages[index] = page
+                        if on_page is not None:
+                            on_page(page)
+                    except BaseException as e:
+                        with cond:
+                            state['error'] = state['error'] or e
+                    finally:
+                        with cond:
+                            state['active'] -= 1
+                            cond.notify_all()
+
+        # 辅助线程数不超过执行器并发数 - 1 (调用线程占一个)；晚启动的辅助线程领不到页面时直接退出
+        helpers = 0
+        if executor is not None and count > 1:
+            workers = getattr(executor, 'max_workers', None) or getattr(executor, '_max_workers', 1)
+            for _ in range(min(workers - 1, count - 1)):
+                try:
+                    executor.submit(work)
+                except RuntimeError:  # 执行器已关闭
+                    break
+                helpers += 1
+
+        work()
+        # 只等待已被领取的页面 (它们都在运行中的线程里处理，不会因执行器繁忙而阻塞)，
+        # 出错或取消时同样等待，关闭文档前不能再有线程访问 PDFium
+        with cond:
+            while state['active']:
+                cond.wait()
+        if state['error'] is not None:
+            raise state['error']
+
+    total_ms = (time.perf_counter() - total_start) * 1000
+    text_pages = sum(1 for page in pages if page.source == 'text')
+    logger.info(f"PDF 识别完成：{count} 页 (文本层 {text_pages} 页)，{helpers + 1} 个线程，总耗时 {total_ms:.0f} ms；"
+                f"各页耗时 (ms): {', '.join(f'{page.elapsed_ms:.0f}' for page in pages)}")
+    return pages
+
+
+def recognize_pdf_text(ocr_instance, file_path, lang=None, cache=None, model_identity=None, executor=None,
+                       on_page=None):
+    """
+    识别 PDF 并返回界面展示的文本 (参数与返回值同 ocr_engine.recognize_file_text)，多页时每页前加页码标题。
+    :param executor: 见 recognize_pdf
+    """
+    if ocr_instance is None:
+        return "错误：OCR 未初始化。", False
+    if not os.path.exists(file_path):
+        return f"错误：PDF 文件未找到: {file_path}", False
+    if not pdf_available():
+        return "错误：未安装 pypdfium2，无法识别 PDF 文件。", False
+
+    cache_key = None
+    if cache is not None and model_identity is not None:
+        try:
+            cache_key = compute_file_key(file_path, model_identity)
+        except OSError as e:
+            logger.warning(f"计算文件缓存键失败，跳过缓存: {e}")
+        else:
+            cached_text = cache.get(cache_key)
+            get_metrics().increment('cache_hits' if cached_text is not None else 'cache_misses')
+            if cached_text is not None:
+                logger.info(f"识别结果命中缓存 ({cache_key[:8]})。")
+                return cached_text, True
+
+    callback = None
+    if on_page is not None:
+        def callback(page):
+            on_page(page.index, page.count, page.text)
+
+    try:
+        pages = recognize_pdf(ocr_instance, file_path, executor=executor, lang=lang, on_page=callback)
+    except OcrCancelledError:
+        raise
+    except ValueError as e:
+        # 文件大小超过 ingest_config 的限制
+        return f"错误：{e}", False
+    except Exception as e:
+        logger.exception(f"读取 PDF 文件失败 ({file_path}): {e}")
+        return "错误：无法读取 PDF 文件，请检查文件是否损坏或已加密。", False
+
+    if not pages:
+        return "错误：PDF 文件没有页面。", False
+    text = "\n\n".join(page.text if page.count == 1 else f"--- 第 {page.index + 1}/{page.count} 页 ---\n{page.text}"
+                        for page in pages)
+
+    # 含错误页 (或返回格式异常的页) 的结果不写入缓存，下次仍会重新识别
+    if cache_key is not None and all(page.result is None or (page.result.ok and page.result.texts is not None)
+                                     for page in pages):
+        cache.put(cache_key, text)
+    return text, False
+
+
+def load_pdf_preview(file_path, max_size):
+    """栅格化第一页的缩略图 (PIL RGB 图片，用于界面预览)。"""
+    with PdfDocument(file_path) as doc:
+        if not len(doc):
+            raise ValueError(f"PDF 文件没有页面: {file_path}")
+        page = doc.render(0, _POINTS_PER_INCH,
+                          scale_for=lambda width, height: min(max_size[0] / width, max_size[1] / height))
+    return Image.fromarray(page.image[:, :, ::-1].copy())
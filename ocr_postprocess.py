@@ -0,0 +1,86 @@
+# ocr_postprocess.py
+# ----------------------------------------------------------------------
+# 识别文本的后处理：把 rec_texts 合并为界面展示的段落文本。
+# 规则按语言从 config.yaml 的 postprocess_config 读取，并预编译为
+# 字符替换表 + 一个断段正则，整段文本只需扫描常数遍，耗时与文本长度成线性关系。
+# ----------------------------------------------------------------------
+
+import re
+
+from config_loader import get_postprocess_config, subscribe
+
+# 未配置 postprocess_config 时的默认规则 (中文)
+DEFAULT_RULES = {
+    # 这些标点之后的空格替换为段落分隔 (两个换行)
+    "separators": "。？！”」：；",
+    # 匹配这些正则的文本 (如标题序号) 之前的空格替换为段落分隔
+    "heading_patterns": ["一、", "第一，"],
+    # 单字符替换表，例如 {"|": "丨"}；值可以是多个字符或空字符串 (删除)
+    "replacements": {},
+}
+
+
+class TextPostprocessor:
+    """预编译的后处理规则，调用实例即可处理一组文本行。"""
+
+    def __init__(self, separators=DEFAULT_RULES["separators"], heading_patterns=DEFAULT_RULES["heading_patterns"],
+                 replacements=None):
+        self._table = str.maketrans(dict(replacements)) if replacements else None
+
+        # 文本行以单个空格连接后，只有空格可能变为段落分隔：
+        # 前一个字符是断句标点，或后面紧跟标题序号。
+        # 正则以空格字面量开头，匹配时可直接跳到下一个空格，而不必在每个字符处尝试各条规则
+        rules = []
+        if separators:
+            rules.append(f"(?<=[{re.escape(separators)}] )")
+        if heading_patterns:
+            rules.append("(?=" + "|".join(f"(?:{pattern})" for pattern in heading_patterns) + ")")
+        self._break = re.compile(" (?:" + "|".join(rules) + ")") if rules else None
+
+    def __call__(self, texts):
+        # 1. 用空格连接所有文本行 (解决一句话从中间断开的问题)，字符替换后把连续空白缩减为单个空格
+        text = " ".join(texts)
+        if self._table is not None:
+            text = text.translate(self._table)
+        text = " ".join(text.split())
+
+        # 2. 一次替换插入全部段落分隔；被替换的空格互不相邻，不会产生三个以上的连续换行
+        if self._break is not None:
+            text = self._break.sub("\n\n", text)
+        return text.strip()
+
+
+# 按语言缓存已编译的后处理器
+_POSTPROCESSORS = {}
+
+
+def _rules_for(lang):
+    """默认规则 <- postprocess_config.default <- postprocess_config.languages[lang]，逐项覆盖。"""
+    config = get_postprocess_config()
+    rules = dict(DEFAULT_RULES)
+    rules.update(config.get('default') or {})
+    if lang:
+        rules.update((config.get('languages') or {}).get(lang) or {})
+    return rules
+
+
+def get_postprocessor(lang=None):
+    """返回指定语言 (None 表示默认规则) 的后处理器，首次调用时编译并缓存。"""
+    postprocessor = _POSTPROCESSORS.get(lang)
+    if postprocessor is None:
+        rules = _rules_for(lang)
+        postprocessor = TextPostprocessor(
+            separators=rules.get('separators') or "",
+            heading_patterns=rules.get('heading_patterns') or (),
+            replacements=rules.get('replacements'),
+        )
+        _POSTPROCESSORS[lang] = postprocessor
+    return postprocessor
+
+
+def clear_postprocessors(sections=None):
+    """清空已编译的后处理器 (postprocess_config 热加载后自动调用)，下次使用时按新规则重新编译。"""
+    _POSTPROCESSORS.clear()
+
+
+subscribe(clear_postprocessors, sections=('postprocess_config',))
@@ -0,0 +1,175 @@
+# ocr_preprocess.py
+# ----------------------------------------------------------------------
+# 超大图片的预处理：
+# - 等比缩小：长边超过 max_side 的图片 (或分块) 缩小到 max_side，限制检测耗时与内存；
+# - 分块：特别细长 (长宽比超过阈值) 的图片沿长边切成带重叠的分块分别识别，
+#   再把各分块的文本框映射回原图坐标，并去除重叠区域中重复识别的文本行。
+# ----------------------------------------------------------------------
+
+import math
+
+import numpy as np
+
+from ocr_result import OcrResult
+
+try:
+    import cv2
+except ImportError:  # 未安装 OpenCV 时退回 PIL 缩放
+    cv2 = None
+
+# 两个文本框的交集占较小框面积的比例超过该值时，视为同一行文本被重复识别
+DUPLICATE_OVERLAP_RATIO = 0.6
+
+
+def resize_to_max_side(img, max_side):
+    """
+    长边超过 max_side 时等比缩小，返回 (图片, 缩放比例)；无需缩放时原样返回，比例为 1.0。
+    """
+    height, width = img.shape[:2]
+    long_side = max(height, width)
+    if not max_side or long_side <= max_side:
+        return img, 1.0
+
+    scale = max_side / long_side
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    if cv2 is not None:
+        resized = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    else:
+        from PIL import Image
+        resized = np.asarray(Image.fromarray(img[:, :, ::-1]).resize(size, Image.BOX))[:, :, ::-1]
+    return np.ascontiguousarray(resized), scale
+
+
+def plan_tiles(height, width, tile_size, overlap):
+    """
+    沿图片长边规划分块，相邻分块重叠 overlap 像素。
+    :return: [(y0, y1, x0, x1), ...]，按阅读顺序 (从上到下 / 从左到右) 排列
+    """
+    vertical = height >= width
+    length = height if vertical else width
+    tile_size = max(1, int(tile_size))
+    overlap = min(max(0, int(overlap)), tile_size - 1)
+    if length <= tile_size:
+        return [(0, height, 0, width)]
+
+    step = tile_size - overlap
+    count = math.ceil((length - overlap) / step)
+    tiles = []
+    for i in range(count):
+        # 最后一块与图片末端对齐，保证每块长度一致 (相同尺寸的分块可以组批推理)
+        start = min(i * step, length - tile_size)
+        end = start + tile_size
+        tiles.append((start, end, 0, width) if vertical else (0, height, start, end))
+    return tiles
+
+
+def needs_tiling(height, width, aspect_ratio, tile_size):
+    """长宽比超过阈值且长边超过分块长度时才需要分块。"""
+    long_side, short_side = max(height, width), max(1, min(height, width))
+    return long_side > tile_size and long_side / short_side > aspect_ratio
+
+
+def _mark_duplicates(boxes, areas, rank, first, second, cross, keep):
+    """
+    比较两组文本行 (分别来自两个分块)，每对重复行中 rank 较小的一行标记为丢弃。
+    second 按垂直于分块方向的坐标排序，first 中每一行只与 searchsorted 找到的可能相交的窗口比较。
+    """
+    if not len(first) or not len(second):
+        return
+    order = second[np.argsort(boxes[second, cross], kind='stable')]
+    starts = boxes[order, cross]
+    reach = (boxes[order, cross + 2] - starts).max()
+    for a in first:
+        window = order[np.searchsorted(starts, boxes[a, cross] - reach, 'right'):
+                       np.searchsorted(starts, boxes[a, cross + 2], 'left')]
+        if not len(window):
+            continue
+        inter_w = np.maximum(np.minimum(boxes[a, 2], boxes[window, 2]) - np.maximum(boxes[a, 0], boxes[window, 0]), 0)
+        inter_h = np.maximum(np.minimum(boxes[a, 3], boxes[window, 3]) - np.maximum(boxes[a, 1], boxes[window, 1]), 0)
+        min_area = np.maximum(np.minimum(areas[a], areas[window]), 1e-6)
+        duplicate = window[inter_w * inter_h / min_area > DUPLICATE_OVERLAP_RATIO]
+        if not len(duplicate):
+            continue
+        if (rank[duplicate] > rank[a]).any():
+            keep[a] = False
+        keep[duplicate[rank[duplicate] < rank[a]]] = False
+
+
+def _dedupe_mask(boxes, scores, tile_ids, tile_starts, axis):
+    """
+    标记需要保留的文本行：来自不同分块、且框高度重叠的两行视为重复，
+    保留面积较大的一行 (位于分块边缘的那一行通常被截断)，面积相同时保留置信度较高的。
+    重复行只可能出现在分块的重叠带内，因此只比较与后续分块重叠的那部分文本行，
+    内存与耗时取决于重叠带内的行数，而不是全部行数的平方。
+    :param tile_ids: 各行所属的分块序号 (非递减)
+    :param tile_starts: 各分块沿分块方向的起始坐标 (递增)
+    :param axis: 分块方向，0 为横向 (x)，1 为纵向 (y)
+    """
+    count = len(boxes)
+    keep = np.ones(count, dtype=bool)
+    if count < 2 or len(tile_starts) < 2:
+        return keep
+
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    # (面积, 置信度) 较小的一方被丢弃
+    rank = np.empty(count, dtype=np.int64)
+    rank[np.lexsort((scores, areas))] = np.arange(count)
+
+    low, high = boxes[:, axis], boxes[:, axis + 2]
+    bounds = np.searchsorted(tile_ids, np.arange(len(tile_starts) + 1))
+    for i in range(len(tile_starts) - 1):
+        lines = np.arange(bounds[i], bounds[i + 1])
+        if not len(lines):
+            continue
+        # 分块 i 中文本行的最远边缘；起点在此之后的分块与它没有重叠带
+        end = high[lines].max()
+        for j in range(i + 1, len(tile_starts)):
+            if tile_starts[j] >= end:
+                break
+            others = np.arange(bounds[j], bounds[j + 1])
+            _mark_duplicates(boxes, areas, rank, lines[high[lines] > tile_starts[j]],
+                             others[low[others] < end], 1 - axis, keep)
+    return keep
+
+
+def merge_tile_results(tile_results, placements):
+    """
+    合并各分块的识别结果。
+    :param tile_results: 各分块的 OcrResult (坐标相对于缩放后的分块)
+    :param placements: 各分块的 (x0, y0, scale)，用于把坐标映射回原图
+    :return: 合并后的 OcrResult，耗时为各分块之和
+    """
+    texts, scores, polys, tile_ids = [], [], [], []
+    det_ms = rec_ms = total_ms = 0.0
+    for tile_id, (result, (x0, y0, scale)) in enumerate(zip(tile_results, placements)):
+        det_ms += result.det_ms
+        rec_ms += result.rec_ms
+        total_ms += result.total_ms
+        if not result.texts:
+            continue
+        texts.extend(result.texts)
+        scores.append(result.scores)
+        polys.append(result.polys / scale + np.array([x0, y0], dtype=np.float32))
+        tile_ids.extend([tile_id] * len(result.texts))
+
+    if not texts:
+        return OcrResult(texts=[], det_ms=det_ms, rec_ms=rec_ms, total_ms=total_ms)
+
+    scores = np.concatenate(scores)
+    polys = np.concatenate(polys)
+    boxes = np.concatenate([polys.min(axis=1), polys.max(axis=1)], axis=1)
+    horizontal = any(x0 for x0, _, _ in placements)
+    tile_starts = [x0 if horizontal else y0 for x0, y0, _ in placements]
+    keep = np.flatnonzero(_dedupe_mask(boxes, scores, np.asarray(tile_ids), tile_starts, 0 if horizontal else 1))
+
+    # 纵向分块时按分块顺序拼接即为阅读顺序；横向分块时按行 (上边缘，10 像素容差) 再按左边缘排序
+    if horizontal:
+        keep = keep[np.lexsort((boxes[keep, 0], np.floor(boxes[keep, 1] / 10)))]
+    return OcrResult(
+        texts=[texts[i] for i in keep],
+        scores=scores[keep],
+        polys=polys[keep],
+        det_ms=det_ms,
+        rec_ms=rec_ms,
+        total_ms=total_ms,
+    )
@@ -0,0 +1,166 @@
+# ocr_process_pool.py
+# ----------------------------------------------------------------------
+# 进程池 OCR 后端：每个工作进程在初始化时加载一份自己的 PaddleOCR 模型，
+# 并固定 CPU 线程数；图片通过共享内存传递给工作进程，避免 pickle 大数组。
+#
+# ProcessOcrProxy 对外提供与 PaddleOCR 相同的 predict() 接口，
+# 因此 recognize_and_get_text / recognize_many / 批处理命令都可以直接使用。
+# ----------------------------------------------------------------------
+
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 工作进程内的 OCR 实例 (每个进程加载一次)
+_WORKER_OCR = None
+
+# 推理结果中需要传回主进程的字段 (其余字段如中间图片体积大且不可靠地可序列化)
+_RESULT_KEYS = ('rec_texts', 'rec_scores', 'rec_polys', 'rec_boxes', 'dt_polys')
+
+
+# ======================
+# 1. 工作进程侧
+# ======================
+def _pin_cpu_threads(cpu_threads):
+    """限制工作进程内各计算库的线程数，避免多个进程互相抢占 CPU。"""
+    if not cpu_threads:
+        return
+    for env_name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[env_name] = str(cpu_threads)
+    try:
+        import cv2
+        cv2.setNumThreads(int(cpu_threads))
+    except ImportError:
+        pass
+
+
+def _worker_init(lang, det_path, rec_path, cpu_threads):
+    """工作进程初始化函数：固定线程数并加载模型 (每个进程只执行一次)。"""
+    global _WORKER_OCR
+    _pin_cpu_threads(cpu_threads)
+
+    from ocr_engine import _create_ocr_instance, warm_up_ocr
+    _WORKER_OCR = _create_ocr_instance(lang, det_path, rec_path, cpu_threads=cpu_threads)
+    # 每个进程各自预热，避免分配到新进程的第一次识别变慢
+    warm_up_ocr(_WORKER_OCR)
+    logging.getLogger(__name__).info(f"OCR 工作进程已就绪 (PID: {os.getpid()}, CPU 线程数: {cpu_threads})")
+
+
+def _attach_shared_memory(name):
+    """
+    在工作进程中挂载主进程创建的共享内存。
+    - 共享内存的释放 (unlink) 始终由主进程负责；
+    - 工作进程与主进程共用同一个 resource_tracker，重复登记不会导致提前释放。
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _to_plain_result(result_item):
+    """将 PaddleOCR 结果对象转换为可跨进程传递的普通字典。"""
+    if not isinstance(result_item, dict):
+        return result_item
+    plain = {}
+    for key in _RESULT_KEYS:
+        if key in result_item:
+            value = result_item[key]
+            plain[key] = list(value) if isinstance(value, tuple) else value
+    return plain
+
+
+def _worker_predict(inputs):
+    """
+    在工作进程中执行推理。
+    :param inputs: 列表，元素为图片路径 (str) 或共享内存描述 (name, shape, dtype)
+    """
+    handles = []
+    try:
+        img_inputs = []
+        for item in inputs:
+            if isinstance(item, str):
+                img_inputs.append(item)
+                continue
+            name, shape, dtype = item
+            shm = _attach_shared_memory(name)
+            handles.append(shm)
+            img_inputs.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+
+        from ocr_engine import reset_stage_times, get_stage_times
+        reset_stage_times()
+        result = _WORKER_OCR.predict(img_inputs if len(img_inputs) > 1 else img_inputs[0])
+        # 阶段耗时在工作进程中测得，按图片数平均后随结果传回主进程
+        share = max(1, len(result))
+        stage_ms = {stage: ms / share for stage, ms in get_stage_times().items()}
+        plain = [_to_plain_result(item) for item in result]
+        for item in plain:
+            if isinstance(item, dict):
+                item['stage_ms'] = stage_ms
+        # 结果中的数组可能引用输入图片，转换后再释放共享内存视图
+        del img_inputs, result
+        return plain
+    finally:
+        for shm in handles:
+            try:
+                shm.close()
+            except BufferError:
+                # 异常回溯仍引用着数组视图时无法立即关闭，交由进程回收
+                pass
+
+
+# ======================
+# 2. 主进程侧代理
+# ======================
+class ProcessOcrProxy:
+    """
+    进程池 OCR 代理：具有 predict() 方法，可替代 PaddleOCR 实例使用。
+    - 调用线程阻塞等待工作进程返回结果，因此线程池中的多个线程可以真正并行地使用多个进程；
+    - parallelism 表示可同时处理的请求数 (即工作进程数)。
+    """
+
+    def __init__(self, lang, det_path, rec_path, workers=2, cpu_threads=None):
+        self.lang = lang
+        self.parallelism = max(1, int(workers))
+        # spawn：避免在已加载 Paddle / 已启动线程的进程中 fork
+        mp_context = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.parallelism,
+            mp_context=mp_context,
+            initializer=_worker_init,
+            initargs=(lang, det_path, rec_path, cpu_threads),
+        )
+        logger.info(f"进程池 OCR 后端已创建 (进程数: {self.parallelism}, 每进程 CPU 线程数: {cpu_threads})")
+
+    def predict(self, img_input):
+        """与 PaddleOCR.predict 相同的调用方式：单张图片或图片列表，返回结果字典列表。"""
+        items = img_input if isinstance(img_input, list) else [img_input]
+        segments = []
+        payload = []
+        try:
+            for item in items:
+                if isinstance(item, str):
+                    payload.append(item)
+                    continue
+                item = np.ascontiguousarray(item)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, item.nbytes))
+                segments.append(shm)
+                np.ndarray(item.shape, dtype=item.dtype, buffer=shm.buf)[...] = item
+                payload.append((shm.name, item.shape, item.dtype.str))
+
+            return self._pool.submit(_worker_predict, payload).result()
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        """关闭进程池 (由模型池淘汰或程序退出时调用)，排队中的任务会被取消。"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        logger.info("进程池 OCR 后端已关闭。")
@@ -0,0 +1,156 @@
+# ocr_result.py
+# ----------------------------------------------------------------------
+# 结构化的 OCR 识别结果：保留文本行、置信度、文本框坐标以及检测 / 识别耗时，
+# 下游可以按置信度过滤、做版面分析或序列化保存，而无需重新推理。
+# 界面展示用的纯文本可由 to_text() 从结果中推导。
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+# 空结果使用的共享数组 (只读，避免每次创建)
+_EMPTY_SCORES = np.zeros(0, dtype=np.float32)
+_EMPTY_POLYS = np.zeros((0, 4, 2), dtype=np.float32)
+_EMPTY_SCORES.flags.writeable = False
+_EMPTY_POLYS.flags.writeable = False
+
+
+def _to_quad(poly):
+    """将任意点数的多边形规整为 4 个顶点 (非四边形时取其外接矩形)。"""
+    poly = np.asarray(poly, dtype=np.float32).reshape(-1, 2)
+    if len(poly) == 4:
+        return poly
+    x_min, y_min = poly.min(axis=0)
+    x_max, y_max = poly.max(axis=0)
+    return np.array([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]], dtype=np.float32)
+
+
+def _polys_to_array(polys, count):
+    """将文本框列表转换为形状 (N, 4, 2) 的 float32 数组。"""
+    if polys is None or len(polys) == 0:
+        return _EMPTY_POLYS if count == 0 else np.zeros((count, 4, 2), dtype=np.float32)
+    try:
+        arr = np.asarray(polys, dtype=np.float32)
+        if arr.ndim == 3 and arr.shape[1:] == (4, 2):
+            return arr
+    except ValueError:
+        # 各文本框点数不一致，无法直接组成数组
+        pass
+    return np.stack([_to_quad(poly) for poly in polys])
+
+
+class OcrResult:
+    """
+    单张图片的 OCR 结果。
+    - texts: 文本行列表；为 None 表示模型返回格式异常
+    - scores: 每行置信度，float32 数组，形状 (N,)
+    - polys: 每行文本框四个顶点坐标，float32 数组，形状 (N, 4, 2)
+    - det_ms / rec_ms / total_ms: 检测、识别阶段及整次调用的耗时 (毫秒)
+    - error: 错误提示 (以 “错误” 开头)，识别成功时为 None
+    """
+
+    __slots__ = ('texts', 'scores', 'polys', 'det_ms', 'rec_ms', 'total_ms', 'error')
+
+    def __init__(self, texts=(), scores=None, polys=None, det_ms=0.0, rec_ms=0.0, total_ms=0.0, error=None):
+        self.texts = list(texts) if texts is not None else None
+        count = len(self.texts) if self.texts else 0
+        if scores is None or len(scores) == 0:
+            self.scores = _EMPTY_SCORES if count == 0 else np.ones(count, dtype=np.float32)
+        else:
+            self.scores = np.asarray(scores, dtype=np.float32)
+        self.polys = _polys_to_array(polys, count)
+        self.det_ms = float(det_ms)
+        self.rec_ms = float(rec_ms)
+        self.total_ms = float(total_ms)
+        self.error = error
+
+    @classmethod
+    def from_prediction(cls, result_item, det_ms=0.0, rec_ms=0.0, total_ms=0.0):
+        """由 PaddleOCR predict() 返回的单张图片结果 (字典) 构造。"""
+        if not isinstance(result_item, dict):
+            return cls(texts=None, det_ms=det_ms, rec_ms=rec_ms, total_ms=total_ms)
+        return cls(
+            texts=result_item.get('rec_texts', []),
+            scores=result_item.get('rec_scores'),
+            polys=result_item.get('rec_polys'),
+            det_ms=det_ms,
+            rec_ms=rec_ms,
+            total_ms=total_ms,
+        )
+
+    @classmethod
+    def failure(cls, error, total_ms=0.0):
+        """构造表示失败的结果，error 为展示给用户的错误提示。"""
+        return cls(texts=[], total_ms=total_ms, error=error)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __len__(self):
+        return len(self.texts) if self.texts else 0
+
+    def __repr__(self):
+        if self.error:
+            return f"OcrResult(error={self.error!r})"
+        return f"OcrResult(lines={len(self)}, det_ms={self.det_ms:.1f}, rec_ms={self.rec_ms:.1f})"
+
+    @property
+    def boxes(self):
+        """每行文本框的外接矩形 [x_min, y_min, x_max, y_max]，形状 (N, 4)。"""
+        if len(self.polys) == 0:
+            return np.zeros((0, 4), dtype=np.float32)
+        return np.concatenate([self.polys.min(axis=1), self.polys.max(axis=1)], axis=1)
+
+    def filter(self, min_score):
+        """返回只保留置信度不低于 min_score 的文本行的新结果 (耗时信息保持不变)。"""
+        if not self.texts:
+            return self
+        keep = np.flatnonzero(self.scores >= min_score)
+        return OcrResult(
+            texts=[self.texts[i] for i in keep],
+            scores=self.scores[keep],
+            polys=self.polys[keep],
+            det_ms=self.det_ms,
+            rec_ms=self.rec_ms,
+            total_ms=self.total_ms,
+            error=self.error,
+        )
+
+    def to_text(self, lang=None):
+        """
+        推导界面展示的纯文本 (与 recognize_and_get_text 的返回值一致)。
+        :param lang: 语言代码，用于选择文本后处理规则；None 使用默认规则
+        """
+        if self.error:
+            return self.error
+        if self.texts is None:
+            return "图片中未识别到有效文本或返回格式异常。"
+        if not self.texts:
+            return "图片中未识别到有效文本。"
+        from ocr_engine import postprocess_texts
+        return postprocess_texts(self.texts, lang, self.polys)
+
+    def to_dict(self):
+        """转换为可直接 JSON 序列化的字典 (坐标保留 1 位小数)。"""
+        return {
+            "texts": self.texts,
+            "scores": [round(float(s), 4) for s in self.scores],
+            "polys": np.round(self.polys, 1).tolist(),
+            "det_ms": round(self.det_ms, 2),
+            "rec_ms": round(self.rec_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """由 to_dict() 的结果还原。"""
+        return cls(
+            texts=data.get("texts"),
+            scores=data.get("scores"),
+            polys=data.get("polys"),
+            det_ms=data.get("det_ms", 0.0),
+            rec_ms=data.get("rec_ms", 0.0),
+            total_ms=data.get("total_ms", 0.0),
+            error=data.get("error"),
+        )
@@ -0,0 +1,290 @@
+# ocr_server.py
+# ----------------------------------------------------------------------
+# 本地 HTTP OCR 服务：常驻进程加载一次模型 (并预热)，多个客户端共享。
+# - POST /ocr：请求体为图片字节 (任意 Content-Type) 或 multipart/form-data 中的第一个文件，
+#   返回 JSON (文本、每行置信度与文本框、耗时)；可选查询参数 min_score 过滤低置信度行；
+# - GET /health：服务状态与当前排队数；GET /metrics：分阶段性能统计。
+# 并发请求在很短的时间窗口内合并成小批量 (micro-batch) 一次送入模型；
+# 排队数有上限，超出时返回 503；等待超时返回 504，仍在排队的请求随之取消。
+#
+# 用法：
+#   python -m ocr_server --port 8765 --lang ch
+#   curl --data-binary @data_test/test_image.png http://127.0.0.1:8765/ocr
+# ----------------------------------------------------------------------
+
+import argparse
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from ocr_engine import init_paddle_ocr, load_image_array, run_ocr_predict_many, get_model_pool, DET_BATCH_SIZE
+from ocr_metrics import get_metrics
+from utils.logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# 单个请求体的大小上限 (字节)
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# 批处理线程的结束标记
+_STOP = object()
+
+
+class _Request:
+    """排队中的一次识别请求。"""
+
+    __slots__ = ('image', 'future', 'enqueued_at')
+
+    def __init__(self, image):
+        self.image = image
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    把并发到达的请求合并成小批量：取到第一项后，最多再等待 window_ms 毫秒凑满 batch_size 项，
+    然后一次调用 run_ocr_predict_many。排队上限由 queue_size 决定。
+    """
+
+    def __init__(self, ocr_instance, batch_size=4, window_ms=10, queue_size=64, workers=None):
+        self.ocr = ocr_instance
+        self.batch_size = max(1, int(batch_size))
+        self.window_s = max(0.0, window_ms / 1000)
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        # 进程池后端可以同时处理多个批次，线程后端只有一个模型，批次串行执行
+        workers = workers or getattr(ocr_instance, 'parallelism', 1)
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"ocr-server-batcher-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    def submit(self, image):
+        """
+        提交一张已解码的图片，返回 Future (结果为 (OcrResult, 排队毫秒数, 批大小))。
+        :raises queue.Full: 排队已满
+        """
+        request = _Request(image)
+        self._queue.put_nowait(request)
+        return request.future
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.window_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # 放回结束标记，由本线程在处理完当前批次后退出
+                self._queue.put(_STOP)
+                break
+            if item.future.set_running_or_notify_cancel():
+                batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            # 已超时并被客户端处理线程取消的请求不再送入模型
+            if not first.future.set_running_or_notify_cancel():
+                continue
+            batch = self._collect_batch(first)
+
+            started_at = time.perf_counter()
+            for request in batch:
+                get_metrics().record('queue_wait', (started_at - request.enqueued_at) * 1000)
+            try:
+                results = run_ocr_predict_many(self.ocr, [r.image for r in batch], batch_size=self.batch_size)
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for request, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    request.future.set_exception(result)
+                else:
+                    queue_ms = (started_at - request.enqueued_at) * 1000
+                    request.future.set_result((result, queue_ms, len(batch)))
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+
+def _extract_upload(content_type, body):
+    """从请求体中取出图片字节：multipart/form-data 取第一个文件字段，其余类型直接视为图片。"""
+    if not content_type.startswith('multipart/form-data'):
+        return body
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body)
+    for part in message.iter_parts():
+        if part.get_filename() or part.get_content_maintype() == 'image':
+            return part.get_payload(decode=True)
+    raise ValueError("multipart 请求中未找到图片文件")
+
+
+class OcrRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理：每个连接在独立线程中解码图片，推理交给 MicroBatcher。"""
+
+    server_version = "PaddleOcrServer/1.0"
+
+    def log_message(self, fmt, *args):
+        logger.debug("%s - %s" % (self.address_string(), fmt % args))
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok", "queued": self.server.batcher.queued})
+        elif path == "/metrics":
+            self._send_json(HTTPStatus.OK, get_metrics().snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "未知路径"})
+
+    def do_POST(self):
+        received_at = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != "/ocr":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "未知路径"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "请求体为空"})
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "图片过大"})
+            return
+
+        try:
+            body = self.rfile.read(length)
+            image = load_image_array(_extract_upload(self.headers.get("Content-Type", ""), body), is_path=False)
+            min_score = float(parse_qs(url.query).get("min_score", [0])[0])
+        except Exception as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"图片解码失败: {e}"})
+            return
+
+        try:
+            future = self.server.batcher.submit(image)
+        except queue.Full:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "服务繁忙，请稍后重试"})
+            return
+
+        try:
+            result, queue_ms, batch_size = future.result(timeout=self.server.request_timeout)
+        except FutureTimeoutError:
+            # 仍在排队的请求直接取消，不再占用模型；已开始推理的请求无法中止，结果被丢弃
+            future.cancel()
+            get_metrics().increment('server_timeouts')
+            self._send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": "OCR 识别超时，请稍后重试"})
+            return
+        except Exception as e:
+            logger.exception(f"识别请求失败: {e}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "OCR 识别任务执行失败"})
+            return
+
+        if min_score > 0:
+            result = result.filter(min_score)
+        latency_ms = (time.perf_counter() - received_at) * 1000
+        get_metrics().record('end_to_end', latency_ms)
+
+        payload = result.to_dict()
+        payload.update({
+            "text": result.to_text(self.server.lang),
+            "queue_ms": round(queue_ms, 2),
+            "batch_size": batch_size,
+            "latency_ms": round(latency_ms, 2),
+        })
+        self._send_json(HTTPStatus.OK, payload)
+
+
+class OcrHTTPServer(ThreadingHTTPServer):
+    """持有共享 MicroBatcher 的 HTTP 服务。"""
+
+    daemon_threads = True
+
+    def __init__(self, address, batcher, request_timeout=60, lang=None):
+        super().__init__(address, OcrRequestHandler)
+        self.batcher = batcher
+        self.request_timeout = request_timeout
+        self.lang = lang
+
+
+def create_server(ocr_instance, host="127.0.0.1", port=8765, batch_size=DET_BATCH_SIZE, window_ms=10,
+                  queue_size=64, lang=None, request_timeout=60):
+    """
+    创建 (但不启动) OCR HTTP 服务；port 为 0 时由系统分配端口。
+    :param lang: 模型的语言代码，用于选择文本后处理规则
+    :param request_timeout: 单个请求等待识别结果的秒数，超时返回 504 并取消仍在排队的请求
+    """
+    batcher = MicroBatcher(ocr_instance, batch_size=batch_size, window_ms=window_ms, queue_size=queue_size)
+    return OcrHTTPServer((host, port), batcher, request_timeout=request_timeout, lang=lang)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ocr_server", description="本地 HTTP OCR 服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址，默认 127.0.0.1 (仅本机)")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口，默认 8765")
+    parser.add_argument("--lang", default="ch", help="识别语言代码 (见 config.yaml)，默认 ch")
+    parser.add_argument("--batch-size", type=int, default=DET_BATCH_SIZE,
+                        help=f"每个小批量的最大图片数，默认取 det_batch_size ({DET_BATCH_SIZE})")
+    parser.add_argument("--batch-window-ms", type=float, default=10,
+                        help="凑批的最长等待时间 (毫秒)，默认 10")
+    parser.add_argument("--queue-size", type=int, default=64, help="排队请求数上限，超出返回 503，默认 64")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+
+    ocr_instance, executor = init_paddle_ocr(lang=args.lang, warm_up=True)
+    executor.shutdown(wait=False)
+    if ocr_instance is None:
+        logger.error("OCR 模型初始化失败，服务无法启动。")
+        return 2
+
+    server = create_server(ocr_instance, host=args.host, port=args.port, batch_size=args.batch_size,
+                           window_ms=args.batch_window_ms, queue_size=args.queue_size, lang=args.lang)
+    logger.info(f"OCR 服务已启动: http://{args.host}:{server.server_address[1]}/ocr")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，正在停止服务...")
+    finally:
+        server.server_close()
+        server.batcher.close()
+        get_model_pool().clear()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
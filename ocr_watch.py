@@ -0,0 +1,379 @@
+# ocr_watch.py
+# ----------------------------------------------------------------------
+# 监视目录的常驻进程：新放入 (或被修改) 的图片 / PDF 识别后，在原文件旁写出同名的结果文件 (sidecar)。
+# - Linux 上用 inotify 在目录变化时立即唤醒，其他平台 (或网络共享等收不到 inotify 事件的目录) 按间隔轮询；
+# - 文件大小与修改时间连续 settle_s 秒不变才视为写入完成，避免识别只复制了一半的文件；
+# - 已处理文件的 (路径, 大小, 修改时间, 内容哈希) 记录在 SQLite 清单中，重启后不会重复识别；
+#   修改时间变化但内容不变的文件 (重新复制同一份扫描件) 也会跳过；
+# - 整个进程只加载一次模型并预热，文件逐个识别 (PDF 的各页分发到执行器并行)，内存占用与目录大小无关。
+#
+# 用法：
+#   python -m ocr_watch scans/ inbox/ --lang ch
+#   python -m ocr_watch            # 监视 config.yaml 中 watch_config.directories 列出的目录
+# ----------------------------------------------------------------------
+
+import argparse
+import ctypes
+import logging
+import os
+import select
+import sqlite3
+import sys
+import threading
+import time
+
+from config_loader import get_watch_config, get_general_config, start_config_watcher
+from ocr_cache import compute_file_key, create_result_cache
+from ocr_engine import init_paddle_ocr, recognize_file_text, get_model_identity, get_model_pool
+from ocr_ingest import IMAGE_EXTENSIONS
+from ocr_metrics import get_metrics
+from ocr_pdf import PDF_EXTENSIONS, is_pdf, pdf_available, recognize_pdf_text
+from utils.logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+class WatchManifest:
+    """已处理文件清单 (SQLite)，线程安全。"""
+
+    def __init__(self, db_path):
+        """:param db_path: SQLite 文件路径 (':memory:' 表示仅在内存中，用于测试)"""
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " processed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, path):
+        """返回 (size, mtime_ns, digest, status)，未处理过时返回 None。"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT size, mtime_ns, digest, status FROM files WHERE path = ?", (path,)).fetchone()
+
+    def record(self, path, size, mtime_ns, digest, status):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, status, processed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, digest, status, time.time()))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Inotify:
+    """
+    最小的 inotify 封装 (通过 ctypes 调用 libc，不需要额外依赖)，只用来在目录变化时提前唤醒扫描。
+    不可用 (非 Linux、监视数达到系统上限等) 时 create() 返回 None。
+    """
+
+    # IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _MASK = 0x00000008 | 0x00000080 | 0x00000100
+
+    def __init__(self, libc, fd):
+        self._libc = libc
+        self._fd = fd
+
+    @classmethod
+    def create(cls, directories, recursive=False):
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify 不可用，改为轮询: {e}")
+            return None
+        if fd < 0:
+            logger.info(f"inotify 初始化失败 (errno {ctypes.get_errno()})，改为轮询。")
+            return None
+
+        watcher = cls(libc, fd)
+        for directory in directories:
+            roots = [root for root, _, _ in os.walk(directory)] if recursive else [directory]
+            for root in roots:
+                if libc.inotify_add_watch(fd, os.fsencode(root), cls._MASK) < 0:
+                    logger.info(f"无法监视目录 {root} (errno {ctypes.get_errno()})，改为轮询。")
+                    watcher.close()
+                    return None
+        return watcher
+
+    def wait(self, timeout):
+        """等待目录变化，最多 timeout 秒；收到事件时返回 True。事件内容不需要解析，读出后丢弃。"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class FolderWatcher:
+    """
+    扫描目录、对写入完成的新文件调用识别函数并写出 sidecar 结果文件。
+    run() 循环执行 run_once()，也可以在代码 / 测试中直接调用 run_once()。
+    """
+
+    def __init__(self, directories, recognize, manifest, model_identity="", recursive=False, settle_s=2.0,
+                 poll_interval_s=5.0, sidecar_suffix=".txt", extensions=None, use_inotify=True,
+                 clock=time.monotonic):
+        """
+        :param recognize: 识别函数 recognize(path) -> 文本；文本以 "错误" 开头表示识别失败
+        :param manifest: WatchManifest
+        :param model_identity: 参与内容哈希，更换模型后文件会重新识别
+        :param settle_s: 文件大小与修改时间保持不变多少秒后才开始识别
+        :param poll_interval_s: 没有 inotify 事件时重新扫描的间隔
+        :param extensions: 识别的文件扩展名，默认为图片格式 (以及已安装 pypdfium2 时的 PDF)
+        :param clock: 单调时钟，测试时可替换
+        """
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.recognize = recognize
+        self.manifest = manifest
+        self.model_identity = model_identity
+        self.recursive = recursive
+        self.settle_s = max(0.0, float(settle_s))
+        self.poll_interval_s = max(0.1, float(poll_interval_s))
+        self.sidecar_suffix = sidecar_suffix
+        self.extensions = tuple(extensions or IMAGE_EXTENSIONS + (PDF_EXTENSIONS if pdf_available() else ()))
+        self.use_inotify = use_inotify
+        self._clock = clock
+        # 尚未稳定的文件: path -> (size, mtime_ns, 最近一次变化的时刻)
+        self._pending = {}
+
+    def _iter_files(self):
+        """流式遍历各目录下待识别的文件，yield (path, os.stat_result)。"""
+        stack = list(self.directories)
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # 跳过隐藏文件与 Office 等程序的临时文件
+                        if entry.name.startswith(('.', '~$')):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                stack.append(entry.path)
+                        elif entry.name.lower().endswith(self.extensions) and entry.is_file():
+                            yield entry.path, entry.stat()
+            except OSError as e:
+                logger.warning(f"无法读取目录 {directory}: {e}")
+
+    def scan(self):
+        """扫描一次目录，返回已写入完成、需要识别的文件列表 (路径, 大小, 修改时间)。"""
+        now = self._clock()
+        ready = []
+        seen = set()
+        for path, stat in self._iter_files():
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            known = self.manifest.get(path)
+            if known is not None and known[0] == size and known[1] == mtime_ns:
+                continue
+            seen.add(path)
+            pending = self._pending.get(path)
+            if pending is None or pending[:2] != (size, mtime_ns):
+                self._pending[path] = (size, mtime_ns, now)
+                if self.settle_s:
+                    continue
+            elif now - pending[2] < self.settle_s:
+                continue
+            ready.append((path, size, mtime_ns))
+
+        # 已被删除或已处理的文件不再跟踪
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        return sorted(ready)
+
+    @property
+    def pending(self):
+        """正在等待写入完成的文件数。"""
+        return len(self._pending)
+
+    def sidecar_path(self, path):
+        return path + self.sidecar_suffix
+
+    def process(self, path, size, mtime_ns):
+        """识别一个文件并写出 sidecar，返回是否成功 (内容未变而跳过也视为成功)。"""
+        self._pending.pop(path, None)
+        try:
+            digest = compute_file_key(path, self.model_identity)
+        except OSError as e:
+            # 文件在扫描后被删除或移走
+            logger.warning(f"无法读取文件 {path}: {e}")
+            return False
+
+        known = self.manifest.get(path)
+        sidecar = self.sidecar_path(path)
+        if known is not None and known[2] == digest and known[3] == 'done' and os.path.exists(sidecar):
+            logger.info(f"文件内容未变化，跳过: {path}")
+            self.manifest.record(path, size, mtime_ns, digest, 'done')
+            return True
+
+        start = time.perf_counter()
+        text = self.recognize(path)
+        elapsed = time.perf_counter() - start
+        if text.startswith("错误"):
+            # 失败的文件同样记入清单，文件再次变化前不会重试
+            logger.error(f"识别失败 ({path}): {text}")
+            self.manifest.record(path, size, mtime_ns, digest, 'failed')
+            get_metrics().increment('watch_failed')
+            return False
+
+        temp_path = sidecar + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_path, sidecar)
+        except OSError as e:
+            # 目录只读、磁盘已满等：记为失败并继续监视，文件再次变化前不会重试
+            logger.error(f"写出识别结果失败 ({sidecar}): {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            self.manifest.record(path, size, mtime_ns, digest, 'failed')
+            get_metrics().increment('watch_failed')
+            return False
+        self.manifest.record(path, size, mtime_ns, digest, 'done')
+        get_metrics().increment('watch_done')
+        logger.info(f"已识别 {path} (耗时 {elapsed:.2f} 秒)，结果写入 {sidecar}")
+        return True
+
+    def run_once(self, stop_event=None):
+        """扫描一次并识别所有已就绪的文件，返回处理的文件数。"""
+        count = 0
+        for path, size, mtime_ns in self.scan():
+            if stop_event is not None and stop_event.is_set():
+                break
+            self.process(path, size, mtime_ns)
+            count += 1
+        return count
+
+    def run(self, stop_event=None):
+        """持续监视，直到 stop_event 被 set()。"""
+        stop_event = stop_event or threading.Event()
+        inotify = _Inotify.create(self.directories, self.recursive) if self.use_inotify else None
+        logger.info(f"开始监视目录 ({'inotify' if inotify else '轮询'}): {', '.join(self.directories)}")
+        try:
+            while not stop_event.is_set():
+                self.run_once(stop_event)
+                # 有文件正在写入时，按 settle_s 复查；否则等待 inotify 事件或下一次轮询
+                timeout = min(self.settle_s or self.poll_interval_s, self.poll_interval_s) if self._pending \
+                    else self.poll_interval_s
+                if inotify is not None:
+                    inotify.wait(timeout)
+                else:
+                    stop_event.wait(timeout)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+
+def make_recognizer(ocr_instance, executor, lang=None, cache=None):
+    """返回 FolderWatcher 使用的识别函数：图片逐页识别，PDF 各页分发到 executor 并行识别。"""
+    identity = get_model_identity(lang) if cache is not None else None
+
+    def recognize(path):
+        if is_pdf(path):
+            text, _ = recognize_pdf_text(ocr_instance, path, lang=lang, cache=cache, model_identity=identity,
+                                         executor=executor)
+        else:
+            text, _ = recognize_file_text(ocr_instance, path, lang=lang, cache=cache, model_identity=identity)
+        return text
+
+    return recognize
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ocr_watch",
+        description="监视目录，自动识别新放入的图片 / PDF，并在原文件旁写出识别结果。"
+    )
+    parser.add_argument("directories", nargs="*",
+                        help="要监视的目录，默认使用 config.yaml 中 watch_config.directories")
+    parser.add_argument("--lang", default="ch", help="识别语言代码 (见 config.yaml)，默认 ch")
+    parser.add_argument("--recursive", action="store_true", default=None, help="同时监视子目录")
+    parser.add_argument("--once", action="store_true", help="只扫描一次，识别已有的新文件后退出")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+
+    config = get_watch_config()
+    directories = args.directories or config.get('directories') or []
+    missing = [d for d in directories if not os.path.isdir(d)]
+    if not directories or missing:
+        logger.error(f"没有可监视的目录: {', '.join(missing) or '请在命令行或 watch_config.directories 中指定'}")
+        return 1
+
+    ocr_instance, executor = init_paddle_ocr(lang=args.lang, warm_up=True)
+    if ocr_instance is None:
+        logger.error("OCR 模型初始化失败，无法启动目录监视。")
+        executor.shutdown(wait=False)
+        return 2
+
+    cache = create_result_cache()
+    manifest = WatchManifest(config.get('manifest_path', 'cache/watch_manifest.sqlite3'))
+    watcher = FolderWatcher(
+        directories,
+        make_recognizer(ocr_instance, executor, lang=args.lang, cache=cache),
+        manifest,
+        model_identity=get_model_identity(args.lang),
+        recursive=config.get('recursive', False) if args.recursive is None else args.recursive,
+        settle_s=config.get('settle_s', 2.0),
+        poll_interval_s=config.get('poll_interval_s', 5.0),
+        sidecar_suffix=config.get('sidecar_suffix', '.txt'),
+        use_inotify=config.get('use_inotify', True),
+    )
+    config_watcher = start_config_watcher(get_general_config().get('reload_interval_s', 0))
+    try:
+        if args.once:
+            # 单次模式不等待文件稳定
+            watcher.settle_s = 0.0
+            watcher.run_once()
+        else:
+            watcher.run()
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，停止监视。")
+    finally:
+        if config_watcher:
+            config_watcher.set()
+        executor.shutdown(wait=True)
+        manifest.close()
+        if cache:
+            cache.close()
+        get_model_pool().clear()
+        logger.info("OCR 性能统计：\n" + get_metrics().format_summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
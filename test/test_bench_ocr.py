@@ -0,0 +1,43 @@
+# test_bench_ocr.py
+from paddle_ocr_app.benchmarks.bench_ocr import compare_to_baseline
+
+BASELINE = {
+    "latency": {"p50_ms": 100.0, "p95_ms": 200.0},
+    "batch": {"images_per_s": 10.0},
+    "throughput": [{"max_workers": 1, "images_per_s": 5.0}, {"max_workers": 2, "images_per_s": 8.0}],
+}
+
+
+def test_regression_beyond_tolerance_is_reported():
+    """延迟变长、吞吐量下降超过容差时记为退化；容差以内不算。"""
+    report = {
+        "latency": {"p50_ms": 130.0, "p95_ms": 210.0},
+        "batch": {"images_per_s": 7.0},
+        "throughput": [{"max_workers": 1, "images_per_s": 4.5}, {"max_workers": 2, "images_per_s": 8.0}],
+    }
+
+    regressions = compare_to_baseline(report, BASELINE, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("latency.p50_ms: 100.0 -> 130.0")
+    assert regressions[1].startswith("batch.images_per_s: 10.0 -> 7.0")
+
+
+def test_improvements_are_not_regressions():
+    report = {
+        "latency": {"p50_ms": 50.0, "p95_ms": 90.0},
+        "batch": {"images_per_s": 30.0},
+        "throughput": [{"max_workers": 1, "images_per_s": 9.0}, {"max_workers": 2, "images_per_s": 16.0}],
+    }
+    assert compare_to_baseline(report, BASELINE, tolerance=0.2) == []
+
+
+def test_metrics_missing_from_baseline_are_skipped():
+    """基线中没有的指标 (冷启动、峰值内存、其他线程数) 不参与比较。"""
+    report = {
+        "cold_start": {"first_result_s": 99.0},
+        "peak_rss_mb": 99999.0,
+        "latency": {"p50_ms": 100.0, "p95_ms": 200.0},
+        "throughput": [{"max_workers": 4, "images_per_s": 0.1}],
+    }
+    assert compare_to_baseline(report, BASELINE, tolerance=0.2) == []
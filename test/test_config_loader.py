@@ -1,5 +1,8 @@
 # test_config_loader.py
+import logging
 import os
+import shutil
+
 import pytest
 from paddle_ocr_app import config_loader
 
@@ -20,19 +23,19 @@ def reset_config():
 # ---------------------------
 # TEST 1: 配置加载与单例机制
 # ---------------------------
-def test_load_config_and_singleton(capsys):
+def test_load_config_and_singleton(caplog):
     """测试配置文件加载是否正常，以及单例机制是否生效。"""
-    # 第一次加载：应打印“正在加载配置文件”
+    caplog.set_level(logging.INFO)
+    # 第一次加载：应记录“正在加载配置文件”
     config_data_1 = config_loader.load_config()
-    captured = capsys.readouterr()
-    assert "正在加载配置文件" in captured.out
+    assert "正在加载配置文件" in caplog.text
     assert isinstance(config_data_1, dict)
     assert len(config_data_1) > 0
 
-    # 第二次加载：不应再次打印“正在加载配置文件”
+    # 第二次加载：不应再次记录“正在加载配置文件”
+    caplog.clear()
     config_data_2 = config_loader.load_config()
-    captured = capsys.readouterr()
-    assert "正在加载配置文件" not in captured.out
+    assert "正在加载配置文件" not in caplog.text
     assert config_data_1 is config_data_2  # 验证单例
 
 
@@ -70,6 +73,16 @@ def test_get_executor_config():
     assert executor_config.get("max_workers") == 2
 
 
+# ---------------------------
+# TEST 4.1: 模型池配置
+# ---------------------------
+def test_get_model_pool_config():
+    """测试 model_pool_config 内容。"""
+    pool_config = config_loader.get_model_pool_config()
+    assert isinstance(pool_config, dict)
+    assert pool_config.get("max_instances") == 3
+
+
 # ---------------------------
 # TEST 5: 按语言代码获取识别模型名称
 # ---------------------------
@@ -114,6 +127,67 @@ def test_file_not_found(tmp_path):
         config_loader.load_config()  # 恢复环境
 
 
+# ---------------------------
+# TEST 7: 配置热加载与变更订阅
+# ---------------------------
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """把配置文件复制到临时目录，测试中可以随意修改。"""
+    path = tmp_path / "config.yaml"
+    shutil.copy(config_loader.CONFIG_PATH, path)
+    monkeypatch.setattr(config_loader, "CONFIG_PATH", str(path))
+    return path
+
+
+def _rewrite(path, old, new):
+    """替换文件内容，并把修改时间往后调，确保与上次加载时的标记不同。"""
+    path.write_text(path.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_reload_notifies_subscribers_of_changed_sections(temp_config):
+    """文件修改后 reload_config() 返回变化的配置段，只通知订阅了这些配置段的回调。"""
+    config_loader.load_config()
+    assert config_loader.reload_config() == set()  # 文件未变化
+
+    executor_calls, general_calls = [], []
+    config_loader.subscribe(executor_calls.append, sections=("executor_config",))
+    config_loader.subscribe(general_calls.append, sections=("general_config",))
+    try:
+        _rewrite(temp_config, "max_workers: 2", "max_workers: 4")
+        assert config_loader.reload_config() == {"executor_config"}
+    finally:
+        config_loader.unsubscribe(executor_calls.append)
+        config_loader.unsubscribe(general_calls.append)
+
+    assert executor_calls == [{"executor_config"}]
+    assert general_calls == []
+    assert config_loader.get_executor_config()["max_workers"] == 4
+
+
+def test_invalid_reload_keeps_current_config(temp_config, caplog):
+    """新文件校验失败时保留当前配置，并记录错误。"""
+    config = config_loader.load_config()
+    _rewrite(temp_config, "max_workers: 2", "max_workers: 0")
+
+    assert config_loader.reload_config() == set()
+    assert config_loader.load_config() is config
+    assert "max_workers 不能小于 1" in caplog.text
+
+
+def test_validate_config_reports_all_errors():
+    with pytest.raises(config_loader.ConfigError) as excinfo:
+        config_loader.validate_config({
+            "executor_config": {"backend": "gpu", "det_batch_size": True},
+            "supported_languages": [{"code": "ch"}],
+        })
+    message = str(excinfo.value)
+    assert "executor_config.backend" in message
+    assert "executor_config.det_batch_size" in message
+    assert "supported_languages[0]" in message
+
+
 # ---------------------------
 # 运行 pytest 命令
 # ---------------------------
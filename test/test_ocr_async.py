@@ -0,0 +1,105 @@
+# test_ocr_async.py
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from paddle_ocr_app.ocr_async import AsyncOcrEngine
+
+
+class SlowOcr:
+    """模拟耗时推理：记录同时执行的最大任务数与实际执行次数。"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def predict(self, img_input):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return [{'rec_texts': [str(int(img_input[0, 0, 0]))]}]
+
+
+def image(value):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+def test_recognize_respects_concurrency_limit():
+    """并发调用时，同时执行推理的任务数不超过 max_concurrency。"""
+    ocr = SlowOcr()
+
+    async def run():
+        async with AsyncOcrEngine(ocr, max_concurrency=2) as engine:
+            return await asyncio.gather(*(engine.recognize_text(image(i)) for i in range(6)))
+
+    assert asyncio.run(run()) == [str(i) for i in range(6)]
+    assert ocr.max_active == 2
+
+
+def test_cancelled_queued_request_never_runs():
+    """排队中的请求被取消后不会执行推理。"""
+    ocr = SlowOcr(delay=0.1)
+
+    async def run():
+        async with AsyncOcrEngine(ocr, max_concurrency=1) as engine:
+            running = asyncio.ensure_future(engine.recognize(image(1)))
+            queued = asyncio.ensure_future(engine.recognize(image(2)))
+            await asyncio.sleep(0.02)
+            queued.cancel()
+            await running
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+
+    asyncio.run(run())
+    assert ocr.calls == 1
+
+
+def test_non_blocking_recognize_raises_when_full():
+    """排队已满且 block=False 时立即抛出 QueueFull (背压)。"""
+    ocr = SlowOcr(delay=0.1)
+
+    async def run():
+        async with AsyncOcrEngine(ocr, max_concurrency=1, max_pending=1) as engine:
+            first = asyncio.ensure_future(engine.recognize(image(1)))
+            await asyncio.sleep(0.02)
+            with pytest.raises(asyncio.QueueFull):
+                await engine.recognize(image(2), block=False)
+            await first
+
+    asyncio.run(run())
+
+
+def test_recognize_iter_yields_every_result_and_stops_on_break():
+    """recognize_iter 产出全部结果；提前结束时不再提交剩余图片。"""
+    ocr = SlowOcr(delay=0.01)
+
+    async def collect():
+        async with AsyncOcrEngine(ocr, max_concurrency=2) as engine:
+            results = {}
+            async for index, result in engine.recognize_iter([image(i) for i in range(5)]):
+                results[index] = result.texts[0]
+            return results
+
+    assert asyncio.run(collect()) == {i: str(i) for i in range(5)}
+
+    ocr = SlowOcr(delay=0.01)
+
+    async def first_only():
+        async with AsyncOcrEngine(ocr, max_concurrency=1) as engine:
+            iterator = engine.recognize_iter(image(i) for i in range(100))
+            async for _ in iterator:
+                break
+            await iterator.aclose()
+
+    asyncio.run(first_only())
+    assert ocr.calls < 5
@@ -0,0 +1,132 @@
+# test_ocr_batch.py
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from paddle_ocr_app import ocr_batch
+
+
+class FakeOcr:
+    """模拟批量推理：每张图片识别出一行文本 (图片左上角像素值)。"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def predict(self, img_inputs):
+        with self._lock:
+            self.calls += 1
+        return [{'rec_texts': [str(int(img[0, 0, 0]))], 'rec_scores': [0.9],
+                 'rec_polys': [np.array([[0, 0], [4, 0], [4, 4], [0, 4]])]} for img in img_inputs]
+
+
+def write_images(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f"{i:03d}.png"
+        Image.new('RGB', (8, 8), (i, i, i)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def read_rows(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+# ---------------------------
+# TEST 1: 输入收集
+# ---------------------------
+def test_collect_image_paths_filters_and_sorts(tmp_path):
+    write_images(tmp_path, 2)
+    (tmp_path / "notes.txt").write_text("x")
+    (tmp_path / "sub").mkdir()
+    write_images(tmp_path / "sub", 1)
+
+    assert [p[len(str(tmp_path)) + 1:] for p in ocr_batch.collect_image_paths(str(tmp_path))] == \
+        ["000.png", "001.png"]
+    assert len(ocr_batch.collect_image_paths(str(tmp_path), recursive=True)) == 3
+    assert len(ocr_batch.collect_image_paths(str(tmp_path / "*.txt"))) == 1
+
+
+# ---------------------------
+# TEST 2: 流水线
+# ---------------------------
+def test_run_batch_writes_one_row_per_path(tmp_path):
+    """每个路径恰好输出一行；解码失败的图片输出错误行；队列容量为 1 时也能正常结束。"""
+    paths = write_images(tmp_path, 12)
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    paths.insert(5, str(broken))
+    output = io.StringIO()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stats = ocr_batch.run_batch(FakeOcr(), paths, output, executor, decode_workers=2, queue_size=1,
+                                    batch_size=3)
+
+    rows = read_rows(output)
+    assert sorted(row['path'] for row in rows) == sorted(paths)
+    assert stats['done'] == 13 and stats['failed'] == 1
+    by_path = {row['path']: row for row in rows}
+    assert by_path[str(broken)]['error'].startswith("解码失败")
+    assert by_path[paths[0]]['text'] == "0" and by_path[paths[0]]['error'] is None
+
+
+def test_run_batch_reports_postprocess_error_as_row(tmp_path, monkeypatch):
+    """单张图片后处理出错时输出错误行，其余图片不受影响。"""
+    def postprocess(texts, lang=None, polys=None):
+        if texts == ["1"]:
+            raise ValueError("bad layout")
+        return "".join(texts)
+
+    monkeypatch.setattr(ocr_batch, 'postprocess_texts', postprocess)
+    paths = write_images(tmp_path, 3)
+    output = io.StringIO()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stats = ocr_batch.run_batch(FakeOcr(), paths, output, executor, decode_workers=1, queue_size=1)
+
+    by_path = {row['path']: row for row in read_rows(output)}
+    assert by_path[paths[1]]['error'] == "后处理失败: bad layout"
+    assert by_path[paths[2]]['text'] == "2"
+    assert stats['done'] == 3 and stats['failed'] == 1
+
+
+def test_run_batch_raises_on_write_failure(tmp_path):
+    """写出失败时流水线不会阻塞，run_batch 抛出写出异常。"""
+    class BrokenStream:
+        def write(self, data):
+            raise BrokenPipeError("pipe closed")
+
+        def flush(self):
+            pass
+
+    paths = write_images(tmp_path, 20)
+    ocr = FakeOcr()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(BrokenPipeError):
+            ocr_batch.run_batch(ocr, paths, BrokenStream(), executor, decode_workers=1, queue_size=1)
+    # 写出失败后不再推理剩余图片
+    assert ocr.calls < len(paths)
+
+
+# ---------------------------
+# TEST 3: 命令行入口
+# ---------------------------
+def test_main_writes_jsonl(tmp_path, monkeypatch):
+    (tmp_path / "in").mkdir()
+    paths = write_images(tmp_path / "in", 3)
+    output = tmp_path / "out" / "results.jsonl"
+    monkeypatch.setattr(ocr_batch, 'setup_logging', lambda: None)
+    monkeypatch.setattr(ocr_batch, 'init_paddle_ocr', lambda lang, executor: (FakeOcr(), executor))
+
+    assert ocr_batch.main([str(tmp_path / "in"), "-o", str(output), "--queue-size", "1"]) == 0
+
+    rows = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert sorted(row['path'] for row in rows) == paths
+    assert ocr_batch.main([str(tmp_path / "missing")]) == 1
@@ -0,0 +1,78 @@
+# test_ocr_cache.py
+import numpy as np
+import pytest
+
+from paddle_ocr_app import ocr_cache
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, size=(32, 48, 3), dtype=np.uint8)
+
+
+# ---------------------------
+# TEST 1: 缓存键
+# ---------------------------
+def test_image_key_depends_on_pixels_and_model(image):
+    """缓存键随像素内容、形状和模型标识变化。"""
+    key = ocr_cache.compute_image_key(image, "det|rec|ch")
+    assert key == ocr_cache.compute_image_key(image.copy(), "det|rec|ch")
+    assert key != ocr_cache.compute_image_key(image, "det|rec|en")
+
+    changed = image.copy()
+    changed[0, 0, 0] ^= 1
+    assert key != ocr_cache.compute_image_key(changed, "det|rec|ch")
+    assert key != ocr_cache.compute_image_key(image.reshape(48, 32, 3), "det|rec|ch")
+
+
+def test_image_key_accepts_non_contiguous_view(image):
+    """非连续视图 (如 BGRA 去掉 Alpha) 与等价的连续数组得到相同的键。"""
+    bgra = np.dstack([image, np.full(image.shape[:2], 255, dtype=np.uint8)])
+    assert ocr_cache.compute_image_key(bgra[:, :, :3], "m") == ocr_cache.compute_image_key(image, "m")
+
+
+# ---------------------------
+# TEST 2: 内存 LRU
+# ---------------------------
+def test_memory_lru_eviction():
+    """超出内存条目上限时淘汰最久未使用的结果。"""
+    cache = ocr_cache.ResultCache(memory_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+# ---------------------------
+# TEST 3: 磁盘持久化与容量淘汰
+# ---------------------------
+def test_disk_store_persists_across_instances(tmp_path):
+    """磁盘缓存在重新创建实例后仍可命中。"""
+    db_path = str(tmp_path / "cache" / "ocr.sqlite3")
+    cache = ocr_cache.ResultCache(memory_entries=4, disk_path=db_path)
+    cache.put("key", "识别结果")
+    cache.close()
+
+    reopened = ocr_cache.ResultCache(memory_entries=4, disk_path=db_path)
+    assert reopened.get("key") == "识别结果"
+    reopened.close()
+
+
+def test_disk_store_size_based_eviction(tmp_path):
+    """磁盘缓存超出大小上限时删除最久未访问的记录。"""
+    store = ocr_cache._DiskStore(str(tmp_path / "ocr.sqlite3"), max_bytes=25)
+    store.put("old", "x" * 10)
+    store.put("mid", "y" * 10)
+    store.put("new", "z" * 10)
+
+    assert store.get("old") is None
+    assert store.get("mid") == "y" * 10
+    assert store.get("new") == "z" * 10
+    store.close()
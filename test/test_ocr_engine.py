@@ -0,0 +1,362 @@
+# test_ocr_engine.py
+import numpy as np
+import pytest
+from PIL import Image
+
+from paddle_ocr_app import ocr_engine
+
+
+class FakeOcr:
+    """模拟 PaddleOCR 实例：记录收到的输入，并返回固定的识别结果。"""
+
+    def __init__(self, texts=("第一行。", "第二行")):
+        self.texts = list(texts)
+        self.inputs = []
+
+    def predict(self, img_input):
+        self.inputs.append(img_input)
+        return [{'rec_texts': self.texts}]
+
+
+# ---------------------------
+# TEST 1: 内存图片规整为模型输入
+# ---------------------------
+def test_pil_image_converted_to_bgr():
+    """PIL RGB 图片应转换为 BGR 顺序的 HxWx3 数组。"""
+    img = Image.new('RGB', (4, 2), (10, 20, 30))
+    arr = ocr_engine.to_model_input(img)
+    assert arr.shape == (2, 4, 3)
+    assert arr.dtype == np.uint8
+    assert tuple(arr[0, 0]) == (30, 20, 10)
+
+
+def test_bgra_array_drops_alpha():
+    """BGRA 数组应丢弃 Alpha 通道，且结果为连续数组。"""
+    frame = np.zeros((3, 5, 4), dtype=np.uint8)
+    frame[..., 0] = 1
+    frame[..., 3] = 255
+    arr = ocr_engine.to_model_input(frame)
+    assert arr.shape == (3, 5, 3)
+    assert arr.flags['C_CONTIGUOUS']
+    assert (arr[..., 0] == 1).all()
+
+
+def test_contiguous_bgr_array_is_not_copied():
+    """已经是连续 BGR 的数组应直接透传，不产生拷贝。"""
+    frame = np.zeros((3, 5, 3), dtype=np.uint8)
+    assert ocr_engine.to_model_input(frame) is frame
+
+
+@pytest.mark.parametrize(
+    "bad_input",
+    [
+        np.zeros((3, 5, 2), dtype=np.uint8),
+        np.zeros((3, 5, 3), dtype=np.float32),
+        "not-an-image",
+    ],
+)
+def test_invalid_inputs_rejected(bad_input):
+    """不支持的形状、类型应抛出异常。"""
+    with pytest.raises((TypeError, ValueError)):
+        ocr_engine.to_model_input(bad_input)
+
+
+# ---------------------------
+# TEST 2: recognize_and_get_text 直接接收内存图片
+# ---------------------------
+def test_recognize_accepts_array_without_encoding():
+    """NumPy 数组应原样 (规整后) 送入模型，而不是走字节流解码。"""
+    fake = FakeOcr()
+    frame = np.zeros((8, 8, 4), dtype=np.uint8)
+    text = ocr_engine.recognize_and_get_text(fake, frame, is_path=False)
+    assert text == "第一行。\n\n第二行"
+    assert fake.inputs[0].shape == (8, 8, 3)
+
+
+def test_recognize_uninitialized_ocr():
+    """OCR 实例为空时返回错误提示。"""
+    assert ocr_engine.recognize_and_get_text(None, "x.png").startswith("错误")
+
+
+# ---------------------------
+# TEST 3: 模型池 (LRU 复用与淘汰)
+# ---------------------------
+class ClosableOcr(FakeOcr):
+    def __init__(self):
+        super().__init__()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_model_pool_reuses_instance_for_same_models():
+    """相同 (检测, 识别) 模型组合只加载一次。"""
+    pool = ocr_engine.OcrModelPool(max_instances=2)
+    created = []
+
+    def factory():
+        created.append(FakeOcr())
+        return created[-1]
+
+    first = pool.get_or_create("det", "rec_a", factory)
+    second = pool.get_or_create("det", "rec_a", factory)
+    assert first is second
+    assert len(created) == 1
+    assert pool.peek("det", "rec_b") is None
+
+
+def test_model_pool_evicts_least_recently_used():
+    """超出数量上限时淘汰最久未使用的实例，并调用其 close()。"""
+    pool = ocr_engine.OcrModelPool(max_instances=2)
+    a = pool.get_or_create("det", "rec_a", ClosableOcr)
+    b = pool.get_or_create("det", "rec_b", ClosableOcr)
+    # 访问 a，使 b 成为最久未使用
+    assert pool.peek("det", "rec_a") is a
+    c = pool.get_or_create("det", "rec_c", ClosableOcr)
+
+    assert len(pool) == 2
+    assert pool.peek("det", "rec_b") is None
+    assert b.closed and not a.closed and not c.closed
+
+
+def test_model_pool_retain_keeps_unchanged_models():
+    """配置变更后只释放不再使用的模型，仍被引用的模型保持加载。"""
+    pool = ocr_engine.OcrModelPool(max_instances=3)
+    a = pool.get_or_create("det", "rec_a", ClosableOcr)
+    b = pool.get_or_create("det", "rec_b", ClosableOcr)
+
+    assert pool.retain({pool.make_key("det", "rec_a")}) == 1
+    assert pool.peek("det", "rec_a") is a
+    assert pool.peek("det", "rec_b") is None
+    assert b.closed and not a.closed
+
+
+def test_model_pool_shares_detector_between_instances(tmp_path):
+    """检测模型相同的两个实例共用同一个检测模型对象，内存预算中检测模型只计算一次。"""
+    from types import SimpleNamespace
+
+    def model_dir(name, size):
+        path = tmp_path / name
+        path.mkdir()
+        (path / "inference.pdiparams").write_bytes(b"\0" * size)
+        return str(path)
+
+    def factory():
+        inner = SimpleNamespace(text_det_model=object(), text_rec_model=object())
+        return SimpleNamespace(paddlex_pipeline=SimpleNamespace(_pipeline=inner))
+
+    det = model_dir("det", 4 * 1024 * 1024)
+    rec_a, rec_b = model_dir("rec_a", 1024 * 1024), model_dir("rec_b", 1024 * 1024)
+    pool = ocr_engine.OcrModelPool(max_instances=3)
+    a = pool.get_or_create(det, rec_a, factory)
+    b = pool.get_or_create(det, rec_b, factory)
+
+    assert b.paddlex_pipeline._pipeline.text_det_model is a.paddlex_pipeline._pipeline.text_det_model
+    assert b.paddlex_pipeline._pipeline.text_rec_model is not a.paddlex_pipeline._pipeline.text_rec_model
+    assert pool.total_size_mb() == 6.0
+
+
+def test_init_paddle_ocr_uses_pool():
+    """init_paddle_ocr 应优先返回模型池中的实例。"""
+    pool = ocr_engine.OcrModelPool(max_instances=2)
+    det_path, rec_path = ocr_engine.resolve_model_paths('ch')
+    cached = FakeOcr()
+    pool.get_or_create(det_path, rec_path, lambda: cached)
+
+    ocr_instance, executor = ocr_engine.init_paddle_ocr(lang='japan', pool=pool)
+    executor.shutdown(wait=False)
+    # ch 与 japan 共用同一个识别模型，因此复用同一个实例
+    assert ocr_instance is cached
+
+
+# ---------------------------
+# TEST 4: 结果缓存命中时跳过推理
+# ---------------------------
+def test_recognize_with_cache_skips_inference_on_hit():
+    """第二次识别相同图片时命中缓存，不再调用模型。"""
+    from paddle_ocr_app.ocr_cache import ResultCache
+
+    fake = FakeOcr()
+    cache = ResultCache(memory_entries=8)
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    first = ocr_engine.recognize_with_cache(fake, frame, cache, "det|rec|ch", is_path=False)
+    second = ocr_engine.recognize_with_cache(fake, frame.copy(), cache, "det|rec|ch", is_path=False)
+
+    assert first == ("第一行。\n\n第二行", False)
+    assert second == ("第一行。\n\n第二行", True)
+    assert len(fake.inputs) == 1
+
+
+def test_recognize_with_cache_does_not_store_malformed_results():
+    """返回格式异常的结果不写入缓存，下次仍会重新识别。"""
+    from paddle_ocr_app.ocr_cache import ResultCache
+
+    class MalformedOcr(FakeOcr):
+        def predict(self, img_input):
+            self.inputs.append(img_input)
+            return None
+
+    fake = MalformedOcr()
+    cache = ResultCache(memory_entries=8)
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    first = ocr_engine.recognize_with_cache(fake, frame, cache, "det|rec|ch", is_path=False)
+    second = ocr_engine.recognize_with_cache(fake, frame, cache, "det|rec|ch", is_path=False)
+
+    assert first == second == ("图片中未识别到有效文本或返回格式异常。", False)
+    assert len(fake.inputs) == 2
+
+
+def test_model_identity_changes_with_output_rules(monkeypatch):
+    """后处理 / 版面规则变化后模型标识随之变化，缓存不会返回按旧规则生成的文本。"""
+    before = ocr_engine.get_model_identity('ch')
+    assert before == ocr_engine.get_model_identity('ch')
+
+    monkeypatch.setattr(ocr_engine, 'get_postprocess_config', lambda: {'default': {'join_lines': False}})
+    after_postprocess = ocr_engine.get_model_identity('ch')
+    monkeypatch.setattr(ocr_engine, 'get_layout_config', lambda: {'enabled': False})
+    after_layout = ocr_engine.get_model_identity('ch')
+
+    assert len({before, after_postprocess, after_layout}) == 3
+    assert after_layout.startswith(before.rsplit('|', 1)[0])
+
+
+# ---------------------------
+# TEST 5: 批量识别
+# ---------------------------
+class BatchFakeOcr:
+    """模拟支持列表输入的 PaddleOCR：记录每次调用的批大小与图片尺寸。"""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, img_input):
+        batch = img_input if isinstance(img_input, list) else [img_input]
+        self.batches.append([img.shape for img in batch])
+        return [{'rec_texts': [f"{img.shape[0]}x{img.shape[1]}"]} for img in batch]
+
+
+def test_recognize_many_keeps_order_and_groups_by_shape():
+    """结果顺序与输入一致；同尺寸图片组成一批，批大小不超过 batch_size。"""
+    fake = BatchFakeOcr()
+    images = [np.zeros((10, 20, 3), dtype=np.uint8) if i % 2 == 0 else np.zeros((30, 40, 3), dtype=np.uint8)
+              for i in range(5)]
+
+    texts = ocr_engine.recognize_many(fake, images, batch_size=2)
+
+    assert texts == ["10x20", "30x40", "10x20", "30x40", "10x20"]
+    for batch in fake.batches:
+        assert len(batch) <= 2
+        assert len(set(batch)) == 1
+
+
+def test_recognize_many_reports_per_image_errors(tmp_path):
+    """单张图片出错不影响其他图片的结果。"""
+    fake = BatchFakeOcr()
+    missing = str(tmp_path / "missing.png")
+    texts = ocr_engine.recognize_many(fake, [np.zeros((4, 4, 3), dtype=np.uint8), missing, b"not-an-image"])
+
+    assert texts[0] == "4x4"
+    assert texts[1].startswith("错误：图片文件未找到")
+    assert texts[2].startswith("错误")
+
+
+# ---------------------------
+# TEST 6: 启动与预热
+# ---------------------------
+def test_importing_engine_does_not_import_paddle():
+    """导入 ocr_engine 不应导入 Paddle，模型加载前窗口即可显示。"""
+    import os
+    import subprocess
+    import sys
+
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, ocr_engine; print('paddle' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=root_dir, capture_output=True, text=True)
+    assert completed.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_init_paddle_ocr_warms_up_new_instance_once(monkeypatch):
+    """新加载的实例执行一次预热推理，从模型池复用时不再预热。"""
+    pool = ocr_engine.OcrModelPool(max_instances=2)
+    fake = FakeOcr()
+    messages = []
+    monkeypatch.setattr(ocr_engine, '_create_backend_instance', lambda *args: fake)
+
+    first, executor = ocr_engine.init_paddle_ocr(lang='ch', pool=pool, warm_up=True, progress=messages.append)
+    second, _ = ocr_engine.init_paddle_ocr(lang='ch', executor=executor, pool=pool, warm_up=True)
+    executor.shutdown(wait=False)
+
+    assert first is second is fake
+    assert len(fake.inputs) == 1
+    assert fake.inputs[0].ndim == 3
+    assert len(messages) == 2
+
+
+# ---------------------------
+# TEST 7: 结构化结果与阶段耗时
+# ---------------------------
+class StagedFakeOcr:
+    """模拟带检测 / 识别子模型的流水线，子模型以生成器形式产出结果。"""
+
+    def __init__(self):
+        self.text_det_model = lambda images: iter([{'dt_polys': []} for _ in images])
+        self.text_rec_model = lambda crops: iter([{'rec_text': 'x'} for _ in crops])
+
+    def predict(self, img_input):
+        list(self.text_det_model([img_input]))
+        list(self.text_rec_model([img_input, img_input]))
+        return [{'rec_texts': ["甲", "乙"], 'rec_scores': [0.9, 0.8],
+                 'rec_polys': [np.zeros((4, 2)), np.ones((4, 2))]}]
+
+
+def test_recognize_returns_structured_result_with_stage_times(monkeypatch):
+    """recognize() 返回带置信度、文本框与检测 / 识别耗时的结果。"""
+    fake = StagedFakeOcr()
+    monkeypatch.setattr(ocr_engine, '_inner_pipelines', lambda ocr: [ocr])
+    ocr_engine._instrument_stages(fake)
+
+    result = ocr_engine.recognize(fake, np.zeros((8, 8, 3), dtype=np.uint8))
+
+    assert result.ok
+    assert result.texts == ["甲", "乙"]
+    assert result.scores.tolist() == [np.float32(0.9), np.float32(0.8)]
+    assert result.polys.shape == (2, 4, 2)
+    assert set(ocr_engine.get_stage_times()) == {'det', 'rec'}
+    assert result.total_ms >= result.det_ms + result.rec_ms
+
+
+def test_recognize_reports_errors_as_failed_result(tmp_path):
+    """错误通过 error 字段返回，to_text() 与原字符串接口一致。"""
+    result = ocr_engine.recognize(FakeOcr(), str(tmp_path / "missing.png"))
+    assert not result.ok
+    assert result.to_text().startswith("错误：图片文件未找到")
+
+
+# ---------------------------
+# TEST: 多页文件逐页识别
+# ---------------------------
+def test_recognize_file_text_outputs_each_page(tmp_path):
+    """多页 TIFF 逐页识别，每页前加页码标题；第二次识别命中基于文件内容的缓存。"""
+    from paddle_ocr_app.ocr_cache import ResultCache
+
+    path = str(tmp_path / "doc.tiff")
+    pages = [Image.new('RGB', (40, 30), (i * 10,) * 3) for i in range(3)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+
+    ocr = FakeOcr(texts=("内容",))
+    progress = []
+    cache = ResultCache(memory_entries=4)
+    text, hit = ocr_engine.recognize_file_text(ocr, path, cache=cache, model_identity="m",
+                                               on_page=lambda i, n, _t: progress.append((i, n)))
+    assert not hit
+    assert progress == [(0, 3), (1, 3), (2, 3)]
+    assert text.count("内容") == 3
+    assert text.startswith("--- 第 1/3 页 ---")
+    assert "--- 第 3/3 页 ---" in text
+
+    again, hit = ocr_engine.recognize_file_text(ocr, path, cache=cache, model_identity="m")
+    assert hit and again == text
+    assert len(ocr.inputs) == 3
@@ -0,0 +1,78 @@
+# test_ocr_executor.py
+import threading
+import time
+
+from paddle_ocr_app.ocr_executor import ExecutorAutoscaler, ResizableThreadPoolExecutor
+
+
+def _peak_concurrency(executor, tasks):
+    """提交 tasks 个短任务，返回同时执行的最大任务数。"""
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def work():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+
+    for future in [executor.submit(work) for _ in range(tasks)]:
+        future.result(timeout=5)
+    return state["peak"]
+
+
+def test_set_max_workers_grows_and_shrinks():
+    """调整上限后，同时执行的任务数随之变化，已创建的线程不需要重建。"""
+    with ResizableThreadPoolExecutor(max_workers=1) as executor:
+        assert _peak_concurrency(executor, 4) == 1
+
+        executor.set_max_workers(4)
+        assert executor.max_workers == 4
+        assert _peak_concurrency(executor, 8) == 4
+
+        executor.set_max_workers(2)
+        assert _peak_concurrency(executor, 8) == 2
+
+
+class FixedCpuMeter:
+    def __init__(self, value):
+        self.value = value
+
+    def sample(self):
+        return self.value
+
+
+def test_autoscaler_scales_with_queue_depth_and_cpu():
+    """排队任务多且 CPU 空闲时逐步扩容到上限；CPU 繁忙时不扩容；空闲一段时间后缩回下限。"""
+    release = threading.Event()
+    cpu = FixedCpuMeter(0.1)
+
+    with ResizableThreadPoolExecutor(max_workers=1) as executor:
+        scaler = ExecutorAutoscaler(executor, min_workers=1, max_workers=3, scale_down_idle=2, cpu_meter=cpu)
+        futures = [executor.submit(release.wait, 5) for _ in range(6)]
+
+        cpu.value = 0.95
+        assert scaler.step() == 1  # CPU 繁忙，保持不变
+        cpu.value = 0.1
+        assert [scaler.step() for _ in range(3)] == [2, 3, 3]
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        assert executor.pending == 0
+        assert [scaler.step() for _ in range(4)] == [3, 2, 2, 1]
+
+
+def test_cancelled_tasks_leave_pending_count():
+    """开始执行前被取消的任务不再计入排队数。"""
+    release = threading.Event()
+    with ResizableThreadPoolExecutor(max_workers=1) as executor:
+        blocker = executor.submit(release.wait, 5)
+        queued = executor.submit(release.wait, 5)
+        assert queued.cancel()
+        assert executor.pending <= 1
+        release.set()
+        blocker.result(timeout=5)
+    assert executor.pending == 0
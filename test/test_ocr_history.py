@@ -0,0 +1,63 @@
+# test_ocr_history.py
+import io
+
+from PIL import Image
+
+from paddle_ocr_app import ocr_history
+from paddle_ocr_app.ocr_history import HistoryStore
+
+
+def test_page_returns_newest_first_with_preview(tmp_path):
+    """按页读取时最新的记录在前，每条只带文本预览；记录在重新打开后仍保留。"""
+    db_path = str(tmp_path / "history.sqlite3")
+    store = HistoryStore(db_path)
+    for i in range(5):
+        store.add(f"第{i}条" + "字" * 200, "截图", lang="ch", elapsed_ms=10.0 * i)
+    store.close()
+
+    store = HistoryStore(db_path)
+    assert store.count() == 5
+    first_page = store.page(0, 2)
+    assert [row['preview'][:3] for row in first_page] == ["第4条", "第3条"]
+    assert len(first_page[0]['preview']) == ocr_history.PREVIEW_CHARS
+    assert [row['preview'][:3] for row in store.page(4, 2)] == ["第0条"]
+
+    record = store.get(first_page[0]['id'])
+    assert len(record['text']) == 203 and record['lang'] == "ch"
+    store.close()
+
+
+def test_search_matches_substrings():
+    """搜索支持中文子串 (FTS5 trigram)，少于 3 个字符的关键词退回 LIKE。"""
+    store = HistoryStore(':memory:')
+    store.add("发票号码 12345", "文件")
+    store.add("会议纪要：下周发布", "截图")
+    store.add("100% 完成", "截图")
+
+    assert [row['preview'] for row in store.page(query="发票号码")] == ["发票号码 12345"]
+    assert store.count("发") == 2
+    assert store.count("%") == 1
+    assert store.count('"') == 0
+
+    store.delete(store.page(query="12345")[0]['id'])
+    assert store.count("发票号码") == 0
+
+
+def test_max_records_prunes_oldest():
+    """超出 max_records 时删除最旧的记录，全文索引同步更新。"""
+    store = HistoryStore(':memory:', max_records=3)
+    for i in range(6):
+        store.add(f"记录编号{i}", "截图")
+    assert store.count() == 3
+    assert store.count("记录编号0") == 0
+    assert [row['preview'] for row in store.page()] == ["记录编号5", "记录编号4", "记录编号3"]
+
+
+def test_thumbnail_roundtrip():
+    """缩略图以 PNG 保存，尺寸不超过上限。"""
+    store = HistoryStore(':memory:')
+    png = ocr_history.encode_thumbnail(Image.new('RGB', (400, 200), 'white'))
+    record_id = store.add("文本", "文件", thumbnail=png)
+
+    with Image.open(io.BytesIO(store.get(record_id)['thumbnail'])) as thumb:
+        assert thumb.size == (100, 50)
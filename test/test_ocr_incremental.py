@@ -0,0 +1,82 @@
+# test_ocr_incremental.py
+import numpy as np
+
+from paddle_ocr_app.ocr_incremental import IncrementalRecognizer, block_regions
+
+
+class RectOcr:
+    """
+    模拟 OCR：白底图片上每个灰度值相同的色块视为一行文字，文字为 "t" + 灰度值。
+    记录每次 predict 的输入尺寸。
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, img):
+        self.calls.append(img.shape[:2])
+        gray = img[:, :, 0]
+        texts, polys = [], []
+        for value in np.unique(gray[gray < 255]):
+            ys, xs = np.nonzero(gray == value)
+            x0, y0, x1, y1 = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+            texts.append(f"t{value}")
+            polys.append([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+        return [{'rec_texts': texts, 'rec_polys': polys, 'rec_scores': [0.9] * len(texts)}]
+
+
+def make_frame(lines, height=200, width=300):
+    """lines: [(灰度值, x0, y0, x1, y1)]"""
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    for value, x0, y0, x1, y1 in lines:
+        frame[y0:y1, x0:x1] = value
+    return frame
+
+
+LINES = [(10, 20, 20, 200, 36), (20, 20, 60, 220, 76), (30, 20, 140, 180, 156)]
+
+
+def test_unchanged_capture_reuses_all_lines():
+    ocr = RectOcr()
+    recognizer = IncrementalRecognizer(block_size=16, margin=4)
+    first = recognizer.recognize(ocr, make_frame(LINES))
+    second = recognizer.recognize(ocr, make_frame(LINES))
+
+    assert len(ocr.calls) == 1
+    assert second.texts == first.texts == ["t10", "t20", "t30"]
+
+
+def test_only_changed_region_is_recognized_again():
+    ocr = RectOcr()
+    recognizer = IncrementalRecognizer(block_size=16, margin=4)
+    recognizer.recognize(ocr, make_frame(LINES))
+
+    changed = LINES[:1] + [(25, 20, 60, 220, 76)] + LINES[2:]
+    result = recognizer.recognize(ocr, make_frame(changed))
+
+    assert result.texts == ["t10", "t25", "t30"]
+    # 第二次只识别覆盖第二行的小区域
+    height, width = ocr.calls[1]
+    assert height < 50 and width <= 300
+    np.testing.assert_allclose(result.boxes[1], [20, 60, 220, 76])
+
+
+def test_shifted_selection_aligns_by_screen_origin():
+    """选区右移 10 像素：内容整体左移，旧文本行平移后沿用，只识别新露出的边缘。"""
+    ocr = RectOcr()
+    recognizer = IncrementalRecognizer(block_size=16, margin=4)
+    recognizer.recognize(ocr, make_frame(LINES), origin=(100, 100))
+
+    shifted = [(v, x0 - 10, y0, x1 - 10, y1) for v, x0, y0, x1, y1 in LINES]
+    result = recognizer.recognize(ocr, make_frame(shifted), origin=(110, 100))
+
+    assert result.texts == ["t10", "t20", "t30"]
+    np.testing.assert_allclose(result.boxes[0], [10, 20, 190, 36])
+    assert ocr.calls[1][1] < 50  # 只识别右侧新露出的窄条
+
+
+def test_block_regions_groups_adjacent_blocks():
+    blocks = np.zeros((6, 6), dtype=bool)
+    blocks[0, 0] = blocks[1, 1] = True  # 对角相邻
+    blocks[4, 3:6] = True
+    assert sorted(block_regions(blocks)) == [(0, 0, 2, 2), (4, 3, 5, 6)]
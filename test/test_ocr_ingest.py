@@ -0,0 +1,74 @@
+# test_ocr_ingest.py
+import numpy as np
+import pytest
+from PIL import Image
+
+from paddle_ocr_app import ocr_ingest
+
+
+def make_tiff(path, count):
+    """生成 count 页的 TIFF，第 i 页为灰度值 i * 10 的纯色图片。"""
+    pages = [Image.new('RGB', (40 + i, 30), (i * 10,) * 3) for i in range(count)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+
+
+def test_multi_page_tiff_decoded_lazily(tmp_path):
+    """多页 TIFF 逐页产出，取第一页时不解码后续页。"""
+    path = str(tmp_path / "doc.tiff")
+    make_tiff(path, 3)
+
+    pages = ocr_ingest.iter_pages(path)
+    first = next(pages)
+    assert (first.index, first.count, first.scale) == (0, 3, 1.0)
+    assert first.image.shape == (30, 40, 3)
+
+    rest = list(pages)
+    assert [page.index for page in rest] == [1, 2]
+    assert rest[1].image.shape == (30, 42, 3)
+    assert (rest[1].image == 20).all()
+
+
+def test_max_pages_limits_page_count(tmp_path, monkeypatch):
+    path = str(tmp_path / "doc.tiff")
+    make_tiff(path, 5)
+    monkeypatch.setattr(ocr_ingest, 'get_ingest_config', lambda: {'max_pages': 2})
+    assert [page.index for page in ocr_ingest.iter_pages(path)] == [0, 1]
+
+
+def test_jpeg_decoded_at_target_resolution(tmp_path):
+    """JPEG 按 draft 模式在解码阶段缩小，scale 为实际缩放比例。"""
+    path = str(tmp_path / "big.jpg")
+    Image.new('RGB', (1600, 1200), (200, 100, 50)).save(path, quality=90)
+
+    page = ocr_ingest.read_page(path, scale_for=lambda w, h: 0.25)
+    assert page.image.shape == (300, 400, 3)
+    assert page.scale == 0.25
+    # BGR 顺序
+    assert abs(int(page.image[0, 0, 0]) - 50) < 8
+
+
+def test_non_jpeg_reduced_by_integer_factor(tmp_path):
+    path = str(tmp_path / "big.png")
+    Image.new('RGB', (1000, 500), (255, 255, 255)).save(path)
+
+    page = ocr_ingest.read_page(path, scale_for=lambda w, h: 0.3)
+    # reduce 只按整数倍缩小，剩余缩放交给预处理
+    assert page.image.shape == (167, 334, 3)
+    assert page.scale == pytest.approx(334 / 1000)
+
+
+def test_oversized_file_rejected(tmp_path, monkeypatch):
+    path = str(tmp_path / "a.png")
+    Image.new('RGB', (10, 10)).save(path)
+    monkeypatch.setattr(ocr_ingest, 'get_ingest_config', lambda: {'max_file_mb': 1e-6})
+    with pytest.raises(ValueError):
+        ocr_ingest.read_page(path)
+
+
+def test_load_preview_is_thumbnail(tmp_path):
+    path = str(tmp_path / "doc.tiff")
+    make_tiff(path, 2)
+    preview = ocr_ingest.load_preview(path, (10, 10))
+    assert preview.mode == 'RGB'
+    assert max(preview.size) == 10
+    assert np.asarray(preview).shape[:2] == (preview.height, preview.width)
@@ -0,0 +1,109 @@
+# test_ocr_jobs.py
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from paddle_ocr_app import ocr_jobs
+from paddle_ocr_app.ocr_jobs import OcrJobManager
+
+# ocr_jobs 使用的 ocr_engine 模块 (取消标记是该模块中的线程局部变量)
+engine = sys.modules[ocr_jobs.cancellation_scope.__module__]
+
+
+class BlockingStagedOcr:
+    """检测阶段阻塞直到 release 被 set()，记录识别阶段是否执行。"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.rec_calls = 0
+        self.text_det_model = self._det
+        self.text_rec_model = self._rec
+
+    def _det(self, images):
+        self.started.set()
+        self.release.wait(5)
+        return iter([{'dt_polys': []} for _ in images])
+
+    def _rec(self, crops):
+        self.rec_calls += 1
+        return iter([{'rec_text': 'x'} for _ in crops])
+
+    def predict(self, img_input):
+        list(self.text_det_model([img_input]))
+        list(self.text_rec_model([img_input]))
+        return [{'rec_texts': ["甲"]}]
+
+
+def test_superseded_job_stops_between_det_and_rec(monkeypatch):
+    """新任务取代执行中的旧任务：旧任务在识别阶段开始前中止，新任务正常完成。"""
+    fake = BlockingStagedOcr()
+    monkeypatch.setattr(engine, '_inner_pipelines', lambda ocr: [ocr])
+    engine._instrument_stages(fake)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        jobs = OcrJobManager(executor)
+        old = jobs.submit(engine.recognize, fake, np.zeros((8, 8, 3), dtype=np.uint8), is_path=False)
+        assert fake.started.wait(5)
+        new = jobs.submit(lambda: "新结果")
+        fake.release.set()
+
+        with pytest.raises(engine.OcrCancelledError):
+            old.result(timeout=5)
+        assert new.result(timeout=5) == "新结果"
+    assert old.cancelled and not new.cancelled
+    assert fake.rec_calls == 0
+
+
+def test_cancelled_queued_job_never_runs():
+    """排队中的任务被取代后不会执行。"""
+    release = threading.Event()
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        jobs = OcrJobManager(executor)
+        blocker = jobs.submit(release.wait, 5)
+        queued = jobs.submit(calls.append, "旧", supersede=False)
+        latest = jobs.submit(calls.append, "新", supersede=False)
+        queued.cancel()
+        release.set()
+
+        assert blocker.result(timeout=5) is True
+        latest.result(timeout=5)
+        with pytest.raises(engine.OcrCancelledError):
+            queued.result(timeout=5)
+    assert calls == ["新"]
+
+
+def test_same_key_returns_pending_job():
+    """与未完成任务 key 相同的提交复用已有任务，不重复执行。"""
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        jobs = OcrJobManager(executor)
+        first = jobs.submit(release.wait, 5, key="a.png")
+        assert jobs.submit(release.wait, 5, key="a.png") is first
+        assert jobs.active == 1
+        release.set()
+        first.result(timeout=5)
+
+
+def test_shutdown_cancels_jobs_and_rejects_new_ones():
+    """shutdown() 取消所有任务并等待其结束，之后不再接受新任务。"""
+    release = threading.Event()
+
+    def wait_for_cancel():
+        while not release.wait(0.01):
+            engine.check_cancelled()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        jobs = OcrJobManager(executor)
+        running = jobs.submit(wait_for_cancel)
+        assert jobs.shutdown(timeout=5)
+        with pytest.raises(engine.OcrCancelledError):
+            running.result()
+        with pytest.raises(RuntimeError):
+            jobs.submit(wait_for_cancel)
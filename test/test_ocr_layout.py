@@ -0,0 +1,74 @@
+# test_ocr_layout.py
+import time
+
+import numpy as np
+
+from paddle_ocr_app.ocr_layout import group_lines, layout_text
+from paddle_ocr_app.ocr_postprocess import TextPostprocessor
+
+
+def quad(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def shuffled(texts, polys, seed=0):
+    order = np.random.default_rng(seed).permutation(len(texts))
+    return [texts[i] for i in order], np.array(polys, dtype=np.float32)[order]
+
+
+def test_two_columns_with_heading_read_column_by_column():
+    """两栏正文按栏阅读，横跨两栏的标题与页脚单独成段，与输入顺序无关。"""
+    texts, polys = ["标题"], [quad(0, 0, 430, 20)]
+    for i in range(3):
+        y = 40 + i * 28
+        texts += [f"左{i}", f"右{i}"]
+        polys += [quad(0, y, 200, y + 20), quad(230, y, 430, y + 20)]
+    texts.append("页脚")
+    polys.append(quad(0, 160, 430, 180))
+
+    text = layout_text(*shuffled(texts, polys), TextPostprocessor())
+    assert text == "标题\n\n左0 左1 左2\n\n右0 右1 右2\n\n页脚"
+
+
+def test_aligned_narrow_columns_become_table_rows():
+    """逐行对齐的窄栏按表格输出：每行一条，单元格以制表符分隔。"""
+    texts, polys = [], []
+    for row in range(3):
+        for col, x in enumerate((0, 200, 400)):
+            texts.append(f"{row}{col}")
+            polys.append(quad(x, row * 30, x + 50, row * 30 + 20))
+
+    text = layout_text(*shuffled(texts, polys), TextPostprocessor())
+    assert text == "00\t01\t02\n10\t11\t12\n20\t21\t22"
+
+
+def test_vertical_text_reads_right_to_left():
+    """竖排文本按列从右到左、列内从上到下阅读。"""
+    texts, polys = [], []
+    for col in range(3):
+        x = 300 - col * 28
+        texts += [f"列{col}上", f"列{col}下"]
+        polys += [quad(x, 0, x + 20, 100), quad(x, 105, x + 20, 200)]
+
+    paragraphs = group_lines(*shuffled(texts, polys))
+    assert [line.cells for line in paragraphs[0]] == [["列0上列0下"], ["列1上列1下"], ["列2上列2下"]]
+
+
+def test_paragraphs_split_on_indent_and_invalid_boxes_fall_back():
+    """首行缩进开始新段落；文本框全为 0 时不做版面分析。"""
+    texts = ["首行", "第二行", "新段落", "末行"]
+    polys = [quad(40, 0, 300, 20), quad(0, 26, 300, 46), quad(40, 52, 300, 72), quad(0, 78, 300, 98)]
+    assert layout_text(texts, np.array(polys, dtype=np.float32), TextPostprocessor()) == "首行 第二行\n\n新段落 末行"
+    assert group_lines(texts, np.zeros((4, 4, 2), dtype=np.float32)) is None
+
+
+def test_thousands_of_boxes_stay_fast():
+    """数千个文本框的页面也能在短时间内完成分组 (无两两比较)。"""
+    count = 6000
+    texts = ["文字"] * count
+    polys = np.array([quad((i % 3) * 400, (i // 3) * 25, (i % 3) * 400 + 360, (i // 3) * 25 + 20)
+                      for i in range(count)], dtype=np.float32)
+    start = time.perf_counter()
+    paragraphs = group_lines(texts, polys)
+    assert time.perf_counter() - start < 2.0
+    assert sum(len(lines) for lines in paragraphs) == count
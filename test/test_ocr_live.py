@@ -0,0 +1,82 @@
+# test_ocr_live.py
+from concurrent.futures import Future
+
+import numpy as np
+
+from paddle_ocr_app.ocr_live import LiveCapture, frame_hash, hash_distance
+
+
+def make_frame(lines, height=120, width=400):
+    """白底 BGRA 截图，lines 中的每个 (y, x1) 画一条高 8 像素的黑色“文字行”。"""
+    frame = np.full((height, width, 4), 255, dtype=np.uint8)
+    for y, x1 in lines:
+        frame[y:y + 8, 10:x1, :3] = 0
+    return frame
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hash_detects_new_text_line_but_not_noise():
+    base = make_frame([(10, 300), (30, 250)])
+    noisy = base.copy()
+    noisy[50, 50, :3] = 250
+    changed = make_frame([(10, 300), (30, 250), (50, 200)])
+
+    assert hash_distance(frame_hash(base), frame_hash(base.copy())) == 0
+    assert hash_distance(frame_hash(base), frame_hash(noisy)) <= 8
+    assert hash_distance(frame_hash(base), frame_hash(changed)) > 8
+
+
+def test_tiny_region_hash():
+    assert frame_hash(np.zeros((5, 7, 4), dtype=np.uint8), hash_size=16).size == 64
+
+
+def test_unchanged_frames_skip_ocr_and_rate_cap_drops_frames():
+    frames = [make_frame([(10, 300)])]
+    submitted = []
+    clock = FakeClock()
+
+    def recognize(frame):
+        future = Future()
+        future.set_result("ok")
+        submitted.append(frame)
+        return future
+
+    live = LiveCapture(lambda: frames[0], recognize, max_ocr_per_s=1.0, clock=clock)
+    assert live.tick() == 'recognized'
+    assert live.tick() == 'unchanged'
+
+    frames[0] = make_frame([(10, 300), (40, 200)])
+    clock.now = 0.5
+    assert live.tick() == 'dropped'
+    clock.now = 1.2
+    assert live.tick() == 'recognized'
+
+    assert len(submitted) == 2
+    assert live.stats == {'frames': 4, 'unchanged': 1, 'dropped_busy': 0, 'dropped_rate': 1, 'recognized': 2}
+
+
+def test_busy_ocr_drops_frames_and_failed_frame_is_retried():
+    frames = [make_frame([(10, 300)])]
+    futures = []
+
+    def recognize(frame):
+        futures.append(Future())
+        return futures[-1]
+
+    live = LiveCapture(lambda: frames[0], recognize, max_ocr_per_s=0)
+    assert live.tick() == 'recognized'
+    frames[0] = make_frame([(10, 300), (40, 200)])
+    assert live.tick() == 'dropped'
+    assert live.stats['dropped_busy'] == 1
+
+    # 识别失败后，同样的内容会再次提交
+    futures[0].set_exception(RuntimeError("boom"))
+    frames[0] = make_frame([(10, 300)])
+    assert live.tick() == 'recognized'
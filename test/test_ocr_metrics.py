@@ -0,0 +1,63 @@
+# test_ocr_metrics.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from paddle_ocr_app import ocr_metrics
+from paddle_ocr_app.ocr_metrics import OcrMetrics
+
+
+def test_percentiles_and_counts():
+    """分位数基于最近样本计算，次数与最大值基于全部样本。"""
+    metrics = OcrMetrics(window=100)
+    for ms in range(1, 101):
+        metrics.record('det', ms)
+    metrics.increment('cache_hits')
+    metrics.increment('cache_hits')
+
+    snapshot = metrics.snapshot()
+    det = snapshot['stages']['det']
+    assert det['count'] == 100
+    assert det['p50_ms'] == 50.5
+    assert det['p95_ms'] == 95.05
+    assert det['max_ms'] == 100
+    assert snapshot['counters'] == {'cache_hits': 2}
+
+
+def test_window_limits_samples_but_not_count():
+    """超出窗口的旧样本不参与分位数计算。"""
+    metrics = OcrMetrics(window=10)
+    for ms in [1000] * 10 + [1] * 10:
+        metrics.record('rec', ms)
+    rec = metrics.snapshot()['stages']['rec']
+    assert rec['count'] == 20
+    assert rec['p99_ms'] == 1
+    assert rec['max_ms'] == 1000
+
+
+def test_submit_timed_records_queue_wait(monkeypatch):
+    """通过 submit_timed 提交的任务会记录排队等待时间。"""
+    metrics = OcrMetrics()
+    monkeypatch.setattr(ocr_metrics, '_METRICS', metrics)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = ocr_metrics.submit_timed(executor, lambda a, b=0: a + b, 1, b=2)
+        assert future.result() == 3
+    assert metrics.snapshot()['stages']['queue_wait']['count'] == 1
+
+
+def test_engine_records_stage_metrics(monkeypatch):
+    """一次识别会记录预处理、推理等阶段以及请求计数。"""
+    from paddle_ocr_app import ocr_engine
+
+    class FakeOcr:
+        def predict(self, img_input):
+            return [{'rec_texts': ["你好。"]}]
+
+    metrics = OcrMetrics()
+    monkeypatch.setattr(ocr_engine, 'get_metrics', lambda: metrics)
+    ocr_engine.recognize_and_get_text(FakeOcr(), np.zeros((4, 4, 3), dtype=np.uint8))
+
+    snapshot = metrics.snapshot()
+    assert {'preprocess', 'predict', 'recognize'} <= set(snapshot['stages'])
+    assert snapshot['counters'] == {'requests': 1}
+    assert 'recognize' in metrics.format_summary()
@@ -0,0 +1,144 @@
+# test_ocr_pdf.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+from paddle_ocr_app import ocr_pdf
+
+pytestmark = pytest.mark.skipif(not ocr_pdf.pdf_available(), reason="未安装 pypdfium2")
+
+
+class ThreadOcr:
+    """模拟 OCR：返回图片左上角的灰度值，并记录执行 predict 的线程。"""
+
+    def __init__(self):
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def predict(self, img):
+        with self.lock:
+            self.threads.add(threading.current_thread().name)
+        return [{'rec_texts': [f"v{img[0, 0, 0]}"], 'rec_polys': [[[0, 0], [4, 0], [4, 4], [0, 4]]]}]
+
+
+def make_scanned_pdf(path, count):
+    """每页为纯色图片 (无文本层)，第 i 页灰度值为 i * 10。"""
+    pages = [Image.new('RGB', (100, 60), (i * 10,) * 3) for i in range(count)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+
+
+def make_text_pdf(path, texts):
+    """生成每页带一行文本层的 PDF。"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(texts)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(texts)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(texts):
+        stream = f"BT /F1 12 Tf 20 50 Td ({text}) Tj ET".encode()
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 100] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    data, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_text_layer_skips_ocr(tmp_path):
+    path = str(tmp_path / "text.pdf")
+    make_text_pdf(path, ["This page has an embedded text layer", "Second page with enough text"])
+    ocr = ThreadOcr()
+
+    pages = ocr_pdf.recognize_pdf(ocr, path)
+    assert [page.source for page in pages] == ['text', 'text']
+    assert pages[0].text == "This page has an embedded text layer"
+    assert not ocr.threads
+
+
+def test_short_text_layer_falls_back_to_ocr(tmp_path):
+    path = str(tmp_path / "short.pdf")
+    make_text_pdf(path, ["p1"])
+    pages = ocr_pdf.recognize_pdf(ThreadOcr(), path)
+    assert pages[0].source == 'ocr'
+
+
+def test_pages_fan_out_and_keep_order(tmp_path):
+    """各页在执行器的多个线程中识别，结果仍按页码排序。"""
+    path = str(tmp_path / "scan.pdf")
+    make_scanned_pdf(path, 8)
+    ocr = ThreadOcr()
+    completed = []
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="pdf-test") as executor:
+        pages = ocr_pdf.recognize_pdf(ocr, path, executor=executor, on_page=lambda page: completed.append(page.index))
+
+    assert [page.index for page in pages] == list(range(8))
+    assert [page.text for page in pages] == [f"v{i * 10}" for i in range(8)]
+    assert all(page.source == 'ocr' and page.elapsed_ms >= 0 for page in pages)
+    assert sorted(completed) == list(range(8))
+
+
+def test_single_model_is_never_called_concurrently(tmp_path):
+    """parallelism 为 1 (线程后端) 时，多个线程处理页面，但 predict 从不重叠执行。"""
+    class OverlapOcr(ThreadOcr):
+        parallelism = 1
+
+        def __init__(self):
+            super().__init__()
+            self.active = 0
+            self.max_active = 0
+
+        def predict(self, img):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.02)
+            with self.lock:
+                self.active -= 1
+            return super().predict(img)
+
+    path = str(tmp_path / "scan.pdf")
+    make_scanned_pdf(path, 6)
+    ocr = OverlapOcr()
+
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf-test") as executor:
+        pages = ocr_pdf.recognize_pdf(ocr, path, executor=executor)
+
+    assert [page.text for page in pages] == [f"v{i * 10}" for i in range(6)]
+    assert ocr.max_active == 1
+
+
+def test_recognize_pdf_text_inside_busy_executor(tmp_path):
+    """调用方运行在执行器中、其余线程都被占用时，也能完成识别 (不等待排不上队的辅助任务)。"""
+    path = str(tmp_path / "scan.pdf")
+    make_scanned_pdf(path, 3)
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        blocker = executor.submit(release.wait)
+        future = executor.submit(ocr_pdf.recognize_pdf_text, ThreadOcr(), path, executor=executor)
+        text, hit = future.result(timeout=30)
+        assert not blocker.done()
+        release.set()
+
+    assert not hit
+    assert text.startswith("--- 第 1/3 页 ---\nv0")
+    assert "--- 第 3/3 页 ---\nv20" in text
+
+
+def test_load_pdf_preview(tmp_path):
+    path = str(tmp_path / "scan.pdf")
+    make_scanned_pdf(path, 1)
+    preview = ocr_pdf.load_pdf_preview(path, (50, 50))
+    assert preview.mode == 'RGB'
+    assert max(preview.size) <= 50
@@ -0,0 +1,46 @@
+# test_ocr_postprocess.py
+import random
+
+from paddle_ocr_app import ocr_postprocess
+from paddle_ocr_app.ocr_postprocess import TextPostprocessor
+
+
+def legacy_merge(texts):
+    """改写前的实现，用于对照输出。"""
+    final_text = " ".join(" ".join(texts).split())
+    for sep in ('。', '？', '！', '”', '」', '：', '；'):
+        final_text = final_text.replace(sep + " ", sep + "\n\n")
+    final_text = final_text.replace(" 一、", "\n\n一、")
+    final_text = final_text.replace(" 第一，", "\n\n第一，")
+    while "\n\n\n" in final_text:
+        final_text = final_text.replace("\n\n\n", "\n\n")
+    return final_text.strip()
+
+
+def test_default_rules_match_legacy_output():
+    """默认规则的输出与改写前的逐个 replace 实现一致。"""
+    rng = random.Random(0)
+    alphabet = list("文字识别ab1 。？！”」：；一、第一，\n\t")
+    postprocess = TextPostprocessor()
+    for _ in range(500):
+        texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                 for _ in range(rng.randint(0, 6))]
+        assert postprocess(texts) == legacy_merge(texts)
+
+
+def test_custom_rules_and_replacements():
+    """断句标点、标题正则与替换表均可配置。"""
+    postprocess = TextPostprocessor(separators=".", heading_patterns=[r"\d+\)"], replacements={"|": "I", "~": ""})
+    assert postprocess(["Hello.", "world~", "1) |tem", "2) done"]) == "Hello.\n\nworld\n\n1) Item\n\n2) done"
+    assert TextPostprocessor(separators="", heading_patterns=[])(["a。", "b"]) == "a。 b"
+
+
+def test_language_rules_override_default():
+    """languages 中的规则覆盖 default，且按语言缓存。"""
+    ocr_postprocess.clear_postprocessors()
+    japan = ocr_postprocess.get_postprocessor("japan")
+    assert japan is ocr_postprocess.get_postprocessor("japan")
+    assert japan(["見出し』", "本文", "一、続き"]) == "見出し』\n\n本文 一、続き"
+    assert ocr_postprocess.get_postprocessor(None)(["見出し』", "本文", "一、続き"]) == "見出し』 本文\n\n一、続き"
+    assert ocr_postprocess.get_postprocessor("en")(["Done.", "Next"]) == "Done.\n\nNext"
+    assert ocr_postprocess.get_postprocessor(None)(["Done.", "Next"]) == "Done. Next"
@@ -0,0 +1,102 @@
+# test_ocr_preprocess.py
+import numpy as np
+
+from paddle_ocr_app import ocr_preprocess
+from paddle_ocr_app.ocr_result import OcrResult
+
+
+def quad(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+# ---------------------------
+# TEST 1: 缩放与分块规划
+# ---------------------------
+def test_resize_to_max_side_keeps_aspect_ratio():
+    img = np.zeros((1000, 4000, 3), dtype=np.uint8)
+    resized, scale = ocr_preprocess.resize_to_max_side(img, 2000)
+    assert resized.shape == (500, 2000, 3)
+    assert scale == 0.5
+
+    small = np.zeros((10, 20, 3), dtype=np.uint8)
+    assert ocr_preprocess.resize_to_max_side(small, 2000) == (small, 1.0)
+
+
+def test_plan_tiles_covers_image_with_overlap():
+    """分块覆盖整张图片，相邻分块至少重叠 overlap 像素，且尺寸一致。"""
+    tiles = ocr_preprocess.plan_tiles(5000, 800, tile_size=2000, overlap=100)
+    assert tiles[0][0] == 0 and tiles[-1][1] == 5000
+    assert all(y1 - y0 == 2000 and (x0, x1) == (0, 800) for y0, y1, x0, x1 in tiles)
+    assert all(prev[1] - cur[0] >= 100 for prev, cur in zip(tiles, tiles[1:]))
+
+
+def test_needs_tiling_only_for_elongated_images():
+    assert ocr_preprocess.needs_tiling(8000, 1000, aspect_ratio=3.0, tile_size=2000)
+    assert not ocr_preprocess.needs_tiling(3000, 2500, aspect_ratio=3.0, tile_size=2000)
+    assert not ocr_preprocess.needs_tiling(1500, 100, aspect_ratio=3.0, tile_size=2000)
+
+
+# ---------------------------
+# TEST 2: 分块结果合并与去重
+# ---------------------------
+def test_merge_maps_coordinates_and_drops_duplicates():
+    """重叠区域的重复行只保留较完整的一行，坐标映射回原图。"""
+    first = OcrResult(texts=["上", "重叠行"], scores=[0.9, 0.9],
+                      polys=[quad(0, 10, 100, 30), quad(0, 180, 100, 199)])
+    # 第二块从 y=150 开始、缩放 0.5：重叠行在第二块中完整出现
+    second = OcrResult(texts=["重叠行", "下"], scores=[0.95, 0.9],
+                       polys=[quad(0, 15, 50, 26), quad(0, 100, 50, 110)])
+
+    merged = ocr_preprocess.merge_tile_results([first, second], [(0, 0, 1.0), (0, 150, 0.5)])
+
+    assert merged.texts == ["上", "重叠行", "下"]
+    assert merged.polys[1].tolist() == quad(0, 180, 100, 202)
+    assert merged.polys[2].tolist() == quad(0, 350, 100, 370)
+
+
+
+def test_merge_many_lines_only_dedupes_overlap_band():
+    """数千行文本合并：只有重叠带内的重复行被去掉，其余行全部保留。"""
+    def tile(rows, row_offset, score):
+        texts, polys = [], []
+        for row in range(rows):
+            for col in range(20):
+                texts.append(f"{row + row_offset}-{col}")
+                polys.append(quad(col * 100, row * 20, col * 100 + 90, row * 20 + 15))
+        return OcrResult(texts=texts, scores=[score] * len(texts), polys=polys)
+
+    # 第二块从 y=1900 开始，与第一块重叠 5 行；重叠行在第二块中置信度更高
+    first, second = tile(100, 0, 0.8), tile(100, 95, 0.9)
+
+    merged = ocr_preprocess.merge_tile_results([first, second], [(0, 0, 1.0), (0, 1900, 1.0)])
+
+    assert len(first.texts) + len(second.texts) == 4000
+    assert len(merged.texts) == 3900
+    assert len(set(merged.texts)) == 3900
+    assert merged.texts[:1900] == first.texts[:1900]
+    assert merged.texts[1900:] == second.texts
+
+
+def test_engine_tiles_tall_images(monkeypatch):
+    """细长图片按分块送入模型，每块尺寸受限。"""
+    from paddle_ocr_app import ocr_engine
+
+    shapes = []
+
+    class TileOcr:
+        def predict(self, img_input):
+            shapes.append(img_input.shape)
+            return [{'rec_texts': [f"块{len(shapes)}"], 'rec_scores': [0.9],
+                     'rec_polys': [np.array(quad(5, 5, 50, 20))]}]
+
+    monkeypatch.setattr(ocr_engine, 'MAX_SIDE', 1000)
+    monkeypatch.setattr(ocr_engine, 'TILING_ENABLED', True)
+    monkeypatch.setattr(ocr_engine, 'TILE_SIZE', 1000)
+    monkeypatch.setattr(ocr_engine, 'TILE_OVERLAP', 100)
+    img = np.zeros((2800, 400, 3), dtype=np.uint8)
+
+    result = ocr_engine.recognize(TileOcr(), img)
+
+    assert shapes == [(1000, 400, 3)] * 3
+    assert result.texts == ["块1", "块2", "块3"]
+    assert result.polys[:, 0, 1].tolist() == [5, 905, 1805]
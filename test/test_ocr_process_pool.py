@@ -0,0 +1,32 @@
+# test_ocr_process_pool.py
+import numpy as np
+from multiprocessing import shared_memory
+
+from paddle_ocr_app import ocr_process_pool
+
+
+class EchoOcr:
+    """模拟工作进程内的 PaddleOCR：返回输入图片的尺寸与像素和。"""
+
+    def predict(self, img_input):
+        batch = img_input if isinstance(img_input, list) else [img_input]
+        return [{'rec_texts': [f"{img.shape}:{int(img.sum())}"], 'input_img': img} for img in batch]
+
+
+def test_worker_predict_reads_image_from_shared_memory(monkeypatch):
+    """工作进程应能从共享内存还原图片，且只传回可序列化的结果字段。"""
+    monkeypatch.setattr(ocr_process_pool, '_WORKER_OCR', EchoOcr())
+    img = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+
+    shm = shared_memory.SharedMemory(create=True, size=img.nbytes)
+    try:
+        np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+        result = ocr_process_pool._worker_predict([(shm.name, img.shape, img.dtype.str)])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    assert len(result) == 1
+    assert result[0]['rec_texts'] == [f"{img.shape}:{int(img.sum())}"]
+    assert 'input_img' not in result[0]
+    assert 'stage_ms' in result[0]
@@ -0,0 +1,58 @@
+# test_ocr_result.py
+import json
+
+import numpy as np
+
+from paddle_ocr_app.ocr_result import OcrResult
+
+
+def make_result():
+    return OcrResult(
+        texts=["第一行。", "噪声", "第二行"],
+        scores=[0.98, 0.3, 0.91],
+        polys=[[[0, 0], [10, 0], [10, 5], [0, 5]],
+               [[0, 6], [10, 6], [10, 9], [0, 9]],
+               [[0, 10], [20, 10], [20, 15], [0, 15]]],
+        det_ms=12.0, rec_ms=8.0, total_ms=21.0,
+    )
+
+
+def test_arrays_have_compact_types():
+    """置信度与文本框以 float32 数组保存。"""
+    result = make_result()
+    assert result.scores.dtype == np.float32
+    assert result.polys.shape == (3, 4, 2)
+    assert result.polys.dtype == np.float32
+    assert result.boxes.tolist()[2] == [0, 10, 20, 15]
+
+
+def test_filter_by_score_keeps_timings():
+    """按置信度过滤后，文本、置信度与文本框保持对应，耗时不变。"""
+    filtered = make_result().filter(0.5)
+    assert filtered.texts == ["第一行。", "第二行"]
+    assert filtered.polys.shape == (2, 4, 2)
+    assert filtered.det_ms == 12.0 and filtered.rec_ms == 8.0
+
+
+def test_to_text_matches_string_output():
+    """to_text() 推导出与原字符串接口一致的文本。"""
+    assert make_result().filter(0.5).to_text() == "第一行。\n\n第二行"
+    assert OcrResult(texts=[]).to_text() == "图片中未识别到有效文本。"
+    assert OcrResult.failure("错误：OCR 未初始化。").to_text() == "错误：OCR 未初始化。"
+
+
+def test_dict_round_trip_is_json_serialisable():
+    """to_dict() 可直接 JSON 序列化，并能还原为等价结果。"""
+    data = json.loads(json.dumps(make_result().to_dict(), ensure_ascii=False))
+    restored = OcrResult.from_dict(data)
+    assert restored.texts == make_result().texts
+    assert np.allclose(restored.scores, make_result().scores, atol=1e-4)
+    assert np.allclose(restored.polys, make_result().polys)
+
+
+def test_irregular_polygons_normalised_to_quads():
+    """点数不为 4 的文本框转换为外接矩形的四个顶点。"""
+    result = OcrResult(texts=["a", "b"], polys=[[[0, 0], [4, 0], [4, 2], [0, 2]],
+                                                [[1, 1], [5, 1], [6, 3], [5, 4], [1, 4]]])
+    assert result.polys.shape == (2, 4, 2)
+    assert result.polys[1].tolist() == [[1, 1], [6, 1], [6, 4], [1, 4]]
@@ -0,0 +1,113 @@
+# test_ocr_server.py
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+from paddle_ocr_app import ocr_server
+
+
+class BatchRecordingOcr:
+    """模拟支持列表输入的模型：记录每次调用的批大小。"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def predict(self, img_input):
+        batch = img_input if isinstance(img_input, list) else [img_input]
+        self.batch_sizes.append(len(batch))
+        time.sleep(self.delay)
+        return [{'rec_texts': ["你好。", "低分"], 'rec_scores': [0.99, 0.2],
+                 'rec_polys': [[[0, 0], [9, 0], [9, 5], [0, 5]], [[0, 6], [9, 6], [9, 9], [0, 9]]]}
+                for _ in batch]
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 8), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def running_server():
+    servers = []
+
+    def start(ocr, **kwargs):
+        server = ocr_server.create_server(ocr, port=0, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+        server.batcher.close()
+
+
+def post(url, data, content_type="image/png"):
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def test_concurrent_requests_are_batched(running_server):
+    """同一时间窗口内到达的请求合并成一批，且每个请求都得到自己的结果与延迟。"""
+    ocr = BatchRecordingOcr(delay=0.05)
+    base = running_server(ocr, batch_size=4, window_ms=50)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: post(base + "/ocr?min_score=0.5", png_bytes()), range(4)))
+
+    assert all(r["texts"] == ["你好。"] and r["text"] == "你好。" for r in results)
+    assert all(r["latency_ms"] >= r["queue_ms"] for r in results)
+    assert max(ocr.batch_sizes) > 1
+    assert sum(ocr.batch_sizes) == 4
+
+
+def test_multipart_upload_and_health(running_server):
+    base = running_server(BatchRecordingOcr())
+    boundary = "testboundary"
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n"
+            f"Content-Type: image/png\r\n\r\n").encode() + png_bytes() + f"\r\n--{boundary}--\r\n".encode()
+
+    result = post(base + "/ocr", body, content_type=f"multipart/form-data; boundary={boundary}")
+    assert result["texts"] == ["你好。", "低分"]
+
+    with urllib.request.urlopen(base + "/health", timeout=10) as response:
+        assert json.loads(response.read())["status"] == "ok"
+
+
+def test_bad_image_returns_400(running_server):
+    base = running_server(BatchRecordingOcr())
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        post(base + "/ocr", b"not-an-image")
+    assert excinfo.value.code == 400
+
+
+def test_timed_out_requests_return_504_and_are_not_run(running_server):
+    """等待超时的请求返回 504；仍在排队的请求被取消，不再送入模型。"""
+    ocr = BatchRecordingOcr(delay=0.4)
+    base = running_server(ocr, batch_size=1, window_ms=0, request_timeout=0.1)
+
+    def status(_):
+        try:
+            post(base + "/ocr", png_bytes())
+        except urllib.error.HTTPError as e:
+            return e.code
+        return 200
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        codes = list(pool.map(status, range(3)))
+    time.sleep(0.6)
+
+    assert codes == [504, 504, 504]
+    # 只有第一个请求在超时前已开始推理
+    assert ocr.batch_sizes == [1]
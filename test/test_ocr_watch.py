@@ -0,0 +1,127 @@
+# test_ocr_watch.py
+import os
+
+import pytest
+
+from paddle_ocr_app.ocr_watch import FolderWatcher, WatchManifest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def folder(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    return inbox
+
+
+def make_watcher(folder, manifest, calls, clock=None, settle_s=2.0):
+    def recognize(path):
+        calls.append(os.path.basename(path))
+        return f"text of {os.path.basename(path)}"
+
+    return FolderWatcher([str(folder)], recognize, manifest, settle_s=settle_s, clock=clock or FakeClock(),
+                         extensions=('.png', '.pdf'), use_inotify=False)
+
+
+def test_waits_until_file_is_stable(folder):
+    """文件大小持续变化时不识别，稳定 settle_s 秒后才识别并写出 sidecar。"""
+    clock = FakeClock()
+    calls = []
+    watcher = make_watcher(folder, WatchManifest(':memory:'), calls, clock=clock)
+    scan = folder / "scan.png"
+
+    scan.write_bytes(b"part")
+    assert watcher.run_once() == 0
+    clock.now = 1.5
+    scan.write_bytes(b"partial-more")
+    assert watcher.run_once() == 0
+    clock.now = 3.0
+    assert watcher.run_once() == 0
+    assert watcher.pending == 1
+
+    clock.now = 3.6
+    assert watcher.run_once() == 1
+    assert calls == ["scan.png"]
+    assert (folder / "scan.png.txt").read_text(encoding='utf-8') == "text of scan.png"
+    # sidecar 与其他扩展名的文件不会被识别
+    assert watcher.run_once() == 0
+
+
+def test_manifest_prevents_reprocessing_after_restart(folder, tmp_path):
+    db_path = str(tmp_path / "manifest.sqlite3")
+    (folder / "a.png").write_bytes(b"aaa")
+    (folder / "b.pdf").write_bytes(b"bbb")
+
+    calls = []
+    manifest = WatchManifest(db_path)
+    assert make_watcher(folder, manifest, calls, settle_s=0).run_once() == 2
+    manifest.close()
+
+    restarted = WatchManifest(db_path)
+    assert len(restarted) == 2
+    assert make_watcher(folder, restarted, calls, settle_s=0).run_once() == 0
+    assert sorted(calls) == ["a.png", "b.pdf"]
+
+
+def test_touched_file_with_same_content_is_skipped(folder):
+    calls = []
+    watcher = make_watcher(folder, WatchManifest(':memory:'), calls, settle_s=0)
+    scan = folder / "a.png"
+    scan.write_bytes(b"same")
+    watcher.run_once()
+
+    stat = scan.stat()
+    os.utime(scan, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert watcher.run_once() == 1
+    assert calls == ["a.png"]
+
+    scan.write_bytes(b"changed")
+    watcher.run_once()
+    assert calls == ["a.png", "a.png"]
+
+
+def test_failed_file_not_retried_until_changed(folder):
+    calls = []
+    manifest = WatchManifest(':memory:')
+
+    def recognize(path):
+        calls.append(path)
+        return "错误：无法读取图片文件"
+
+    watcher = FolderWatcher([str(folder)], recognize, manifest, settle_s=0, extensions=('.png',),
+                            use_inotify=False)
+    (folder / "bad.png").write_bytes(b"x")
+    watcher.run_once()
+    watcher.run_once()
+    assert len(calls) == 1
+    assert not (folder / "bad.png.txt").exists()
+    assert manifest.get(str(folder / "bad.png"))[3] == 'failed'
+
+
+def test_sidecar_write_failure_is_recorded_and_watching_continues(folder, monkeypatch):
+    """sidecar 写出失败时删除临时文件、记为失败，其他文件照常处理。"""
+    calls = []
+    manifest = WatchManifest(':memory:')
+    watcher = make_watcher(folder, manifest, calls, settle_s=0)
+    (folder / "a.png").write_bytes(b"aaa")
+    (folder / "b.png").write_bytes(b"bbb")
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if dst.endswith("a.png.txt"):
+            raise PermissionError("read-only share")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', replace)
+
+    assert watcher.run_once() == 2
+    assert manifest.get(str(folder / "a.png"))[3] == 'failed'
+    assert manifest.get(str(folder / "b.png"))[3] == 'done'
+    assert sorted(os.listdir(folder)) == ["a.png", "b.png", "b.png.txt"]
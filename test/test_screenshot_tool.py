@@ -0,0 +1,64 @@
+# test_screenshot_tool.py
+import threading
+
+import numpy as np
+
+from paddle_ocr_app.utils import screenshot_tool
+from paddle_ocr_app.utils.screenshot_tool import CaptureBackend, clamp_region, crop_frame
+
+SCREEN = {"left": -100, "top": 0, "width": 300, "height": 200}
+
+
+def test_region_clamped_and_cropped_from_frozen_frame():
+    """选区按虚拟屏幕坐标 clamp，并作为冻结帧上的视图裁剪 (不复制像素)。"""
+    frame = np.zeros((200, 300, 4), dtype=np.uint8)
+    frame[10:20, 150:160] = 7
+
+    region = clamp_region(40, 10, 500, 20, SCREEN)
+    assert region == {"left": 40, "top": 10, "width": 160, "height": 10}
+
+    crop = crop_frame(frame, SCREEN, region)
+    assert crop.shape == (10, 160, 4)
+    assert np.shares_memory(crop, frame)
+    assert (crop[:, 10:20] == 7).all()
+
+
+class FakeShot:
+    def __init__(self, region):
+        self.width, self.height = region["width"], region["height"]
+        self.raw = bytearray(self.width * self.height * 4)
+
+
+class FakeMss:
+    instances = []
+
+    def __init__(self):
+        self.monitors = [dict(SCREEN)]
+        self.grabs = 0
+        self.closed = False
+        FakeMss.instances.append(self)
+
+    def grab(self, region):
+        self.grabs += 1
+        return FakeShot(region)
+
+    def close(self):
+        self.closed = True
+
+
+def test_backend_reuses_one_session_per_thread(monkeypatch):
+    FakeMss.instances = []
+    monkeypatch.setattr(screenshot_tool, 'mss', FakeMss)
+    backend = CaptureBackend()
+
+    assert backend.grab().shape == (200, 300, 4)
+    assert backend.grab({"left": 0, "top": 0, "width": 5, "height": 4}).shape == (4, 5, 4)
+    assert len(FakeMss.instances) == 1
+
+    worker = threading.Thread(target=backend.grab)
+    worker.start()
+    worker.join()
+    assert len(FakeMss.instances) == 2
+
+    backend.close()
+    assert all(sct.closed for sct in FakeMss.instances)
@@ -0,0 +1,73 @@
+# utils/logging_setup.py
+# ----------------------------------------------------------------------
+# 统一的日志系统配置：GUI 入口 (main.py) 与命令行批处理入口共用。
+# ----------------------------------------------------------------------
+
+import logging
+import os
+from logging.handlers import RotatingFileHandler  # 导入用于文件滚动记录的 Handler
+
+from config_loader import get_logging_config, subscribe
+
+
+def setup_logging():
+    """配置统一的日志系统。"""
+    try:
+        log_config = get_logging_config()
+        log_level_str = log_config.get('level', 'INFO').upper()
+        log_file_path = log_config.get('file_path', 'app.log')
+
+        # 转换日志级别字符串为 logging 模块的常量
+        log_level = getattr(logging, log_level_str, logging.INFO)
+
+        # 确定日志文件路径（如果需要，创建目录）
+        log_dir = os.path.dirname(log_file_path)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+        # 1. 根日志器配置
+        root_logger = logging.getLogger()
+        root_logger.setLevel(log_level)
+
+        # 2. 定义格式
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
+        # 3. 添加控制台 Handler
+        if not any(isinstance(handler, logging.StreamHandler) for handler in root_logger.handlers):
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            root_logger.addHandler(console_handler)
+
+        # 4. 添加文件 Handler (使用 RotatingFileHandler 实现日志文件自动滚动)
+        if not any(isinstance(handler, logging.FileHandler) for handler in root_logger.handlers):
+            file_handler = RotatingFileHandler(
+                log_file_path,
+                maxBytes=1024 * 1024 * 5,  # 最大 5MB
+                backupCount=5,  # 保留 5 个备份文件
+                encoding='utf-8'
+            )
+            file_handler.setFormatter(formatter)
+            root_logger.addHandler(file_handler)
+
+        # 配置热加载修改 logging_config.level 后立即生效
+        subscribe(apply_log_level, sections=('logging_config',))
+
+        logging.info(f"日志系统初始化完成。级别: {log_level_str}, 文件: {log_file_path}")
+
+    except Exception as e:
+        # 如果日志系统配置失败，至少保证能打印出错误
+        # 此处的 print 是必要的，因为日志系统可能未成功建立
+        print(f"[FATAL ERROR] 无法初始化日志系统: {e}")
+
+
+def apply_log_level(sections=None):
+    """按 logging_config.level 更新根日志器的级别 (文件路径等其他设置需重启后生效)。"""
+    log_level_str = get_logging_config().get('level', 'INFO').upper()
+    log_level = getattr(logging, log_level_str, logging.INFO)
+    root_logger = logging.getLogger()
+    if root_logger.level != log_level:
+        root_logger.setLevel(log_level)
+        logging.info(f"日志级别已调整为 {log_level_str}。")
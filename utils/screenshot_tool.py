@@ -1,7 +1,9 @@
 # utils/screenshot_tool.py
 import os
 import sys
+import threading
 import tkinter as tk
+import numpy as np
 from PIL import Image
 from mss import mss
 import logging  # <-- 新增导入
@@ -11,75 +13,206 @@ import traceback  # <-- 新增导入，用于异常日志
 logger = logging.getLogger(__name__)
 
 
+def bgra_buffer_to_array(buffer, width, height):
+    """
+    在 BGRA 像素缓冲区 (如 mss ScreenShot.raw) 上创建 HxWx4 的 NumPy 视图，不复制像素数据。
+    """
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+
+
+def bgra_array_to_pil(frame):
+    """将 HxWx4 的 BGRA 数组转换为 PIL RGB 图片 (用于预览或保存)。"""
+    height, width = frame.shape[:2]
+    return Image.frombuffer("RGB", (width, height), np.ascontiguousarray(frame), "raw", "BGRX", 0, 1)
+
+
+class CaptureBackend:
+    """
+    长期复用的 mss 截图会话：每个线程第一次截图时创建自己的 mss 实例 (mss 实例不能跨线程使用)，之后一直复用，
+    避免每次截图都重新连接显示服务并枚举显示器。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = []
+
+    def _session(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = mss()
+            self._local.sct = sct
+            with self._lock:
+                self._sessions.append(sct)
+        return sct
+
+    def virtual_screen(self):
+        """虚拟屏幕 (所有显示器) 的范围 {"left", "top", "width", "height"}。"""
+        monitor = self._session().monitors[0]
+        return {key: monitor[key] for key in ("left", "top", "width", "height")}
+
+    def grab(self, region=None):
+        """
+        截取 region (默认整个虚拟屏幕)，返回 mss 缓冲区上的 HxWx4 BGRA NumPy 视图 (不复制像素)。
+        """
+        sct_img = self._session().grab(region or self.virtual_screen())
+        return bgra_buffer_to_array(sct_img.raw, sct_img.width, sct_img.height)
+
+    def release(self):
+        """关闭当前线程的 mss 实例 (后台截图线程退出前调用)。"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            return
+        self._local.sct = None
+        with self._lock:
+            if sct in self._sessions:
+                self._sessions.remove(sct)
+        sct.close()
+
+    def close(self):
+        """关闭所有线程创建的 mss 实例。"""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for sct in sessions:
+            try:
+                sct.close()
+            except Exception as e:
+                logger.debug(f"关闭 mss 实例失败: {e}")
+        self._local = threading.local()
+
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def get_capture_backend():
+    """进程内共享的 CaptureBackend。"""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            _BACKEND = CaptureBackend()
+        return _BACKEND
+
+
+def clamp_region(x1, y1, x2, y2, screen):
+    """
+    把屏幕坐标的选区 clamp 到虚拟屏幕范围内。
+    :return: {"left", "top", "width", "height"}；选区与屏幕不相交时宽高至少为 1
+    """
+    vx, vy = screen["left"], screen["top"]
+    vwidth, vheight = screen["width"], screen["height"]
+    x1_clamped = max(vx, min(x1, vx + vwidth - 1))
+    y1_clamped = max(vy, min(y1, vy + vheight - 1))
+    x2_clamped = max(vx, min(x2, vx + vwidth))
+    y2_clamped = max(vy, min(y2, vy + vheight))
+    return {
+        "left": int(x1_clamped),
+        "top": int(y1_clamped),
+        "width": int(max(1, x2_clamped - x1_clamped)),
+        "height": int(max(1, y2_clamped - y1_clamped)),
+    }
+
+
+def crop_frame(frame, screen, region):
+    """从整个虚拟屏幕的截图 frame 中取出 region 部分 (NumPy 视图，不复制像素)。"""
+    x0, y0 = region["left"] - screen["left"], region["top"] - screen["top"]
+    return frame[y0:y0 + region["height"], x0:x0 + region["width"]]
+
+
 class ScreenshotTaker:
-    """支持多显示器的截图选择器，带透明实时区域显示。"""
+    """
+    支持多显示器的截图选择器，带透明实时区域显示。
+    - 打开遮罩时先截取一次整个虚拟屏幕 (冻结帧)，选区直接从冻结帧中裁剪，松开鼠标后不再截图；
+    - 遮罩窗口为 Toplevel，多次截图复用同一个窗口，截图结束时只隐藏不销毁。
+    """
 
-    def __init__(self, on_finish=None):
+    def __init__(self, on_finish=None, as_array=False, master=None, backend=None):
         """
         初始化截图工具
         参数:
             on_finish: 截图完成后的回调函数，形如 on_finish(image: PIL.Image or None)
+            as_array: 为 True 时回调参数改为冻结帧上的 NumPy 视图 (HxWx4 BGRA, uint8)，
+                      不做任何像素拷贝，可直接交给 ocr_engine.recognize_and_get_text
+            master: 所属的 Tk 根窗口；提供时截图在其事件循环中进行，take_screenshot() 立即返回。
+                    为 None 时自行创建隐藏的根窗口，take_screenshot() 阻塞到截图结束
+            backend: CaptureBackend，默认使用进程内共享的实例
         """
         self.on_finish = on_finish
-        self.root = None  # Tkinter 根窗口
+        self.as_array = as_array
+        self.master = master
+        self.backend = backend or get_capture_backend()
+        self.root = None  # 截图遮罩窗口 (Toplevel，多次截图复用)
         self.canvas = None  # 用于绘制半透明遮罩和选区矩形的 Canvas
         self.rect_id = None  # Canvas 上选区矩形的 ID，用于更新/删除
         self.rect_start = None  # 鼠标按下的起始点 (屏幕坐标)
         self.rect_end = None  # 鼠标释放的结束点 (屏幕坐标)
+        self.region = None  # 最终捕获的区域 {"left", "top", "width", "height"} (屏幕坐标)
+        self._owns_master = False
+        self._screen = None  # 打开遮罩时的虚拟屏幕范围
+        self._frame = None  # 打开遮罩时截取的整个虚拟屏幕 (BGRA 数组)
+        self._active = False
 
     def take_screenshot(self):
-        """启动截图窗口。"""
+        """截取冻结帧并显示截图遮罩。"""
         logger.info("启动 ScreenshotTaker...")
+        _set_dpi_awareness()
 
-        # ------------------ Windows DPI 设置 ------------------
-        if sys.platform.startswith('win'):
-            try:
-                import ctypes
-                # DPI_AWARENESS_PER_MONITOR_AWARE = 1
-                ctypes.windll.shcore.SetProcessDpiAwareness(1)
-                logger.debug("Windows DPI 意识已设置为 Per Monitor Aware。")
-            except Exception as e:
-                # 替换 print
-                logger.warning(f"DPI 设置失败: {e}")
+        if self.master is None:
+            self.master = tk.Tk()
+            self.master.withdraw()
+            self._owns_master = True
+
+        self.rect_start = self.rect_end = None
+        self.region = None
+        self._grab_frozen_frame()
+        self._show_window()
+        self._active = True
 
-        # 创建覆盖所有显示器的截图窗口
-        self._create_window()
-        # 启动 Tkinter 事件循环
-        self.root.mainloop()
+        if self._owns_master:
+            # 独立运行时阻塞到截图结束 (_finish 中退出事件循环)
+            self.master.mainloop()
+
+    def _grab_frozen_frame(self):
+        """在遮罩出现之前截取整个虚拟屏幕；失败时在松开鼠标后再按选区截图。"""
+        try:
+            self._screen = self.backend.virtual_screen()
+            self._frame = self.backend.grab(self._screen)
+            logger.info(f"虚拟屏幕截取成功: {self._screen['width']}x{self._screen['height']}"
+                        f"@{self._screen['left']},{self._screen['top']}")
+        except Exception as e:
+            logger.warning(f"无法截取虚拟屏幕: {e}。将在选区确定后截图。")
+            self._frame = None
+            if self._screen is None:
+                self._screen = {"left": 0, "top": 0, "width": self.master.winfo_screenwidth(),
+                                "height": self.master.winfo_screenheight()}
+
+    def _show_window(self):
+        """显示覆盖所有显示器的透明遮罩窗口 (第一次调用时创建)。"""
+        if self.root is None:
+            self._create_window()
+        elif self.rect_id:
+            self.canvas.delete(self.rect_id)
+            self.rect_id = None
+
+        # 设置窗口覆盖整个虚拟屏幕 (显示器布局可能在两次截图之间变化)
+        screen = self._screen
+        self.root.geometry(f"{screen['width']}x{screen['height']}+{screen['left']}+{screen['top']}")
+        self.root.deiconify()
+        self.root.lift()
+        self.root.attributes("-topmost", True)  # 窗口置顶
+        self.root.focus_force()
+        logger.debug("截图窗口已显示，等待用户选择区域...")
 
     def _create_window(self):
-        """创建覆盖所有显示器的透明窗口，用于选取截图区域。"""
-        self.root = tk.Tk()
+        """创建透明遮罩窗口 (Toplevel)，之后的截图复用该窗口。"""
+        self.root = tk.Toplevel(self.master)
 
         # ------------------ 窗口样式设置 ------------------
+        self.root.withdraw()
         self.root.overrideredirect(True)  # 去掉边框和标题栏
-        self.root.attributes("-topmost", True)  # 窗口置顶
         self.root.attributes("-alpha", 0.2)  # 半透明遮罩
         self.root.configure(bg="#FFFFFF")  # 浅色背景
-
-        # ------------------ 获取虚拟屏幕信息 ------------------
-        left = top = 0
-        width = self.root.winfo_screenwidth()  # 默认值
-        height = self.root.winfo_screenheight()  # 默认值
-
-        try:
-            with mss() as sct:
-                # mss.monitors[0] 通常是虚拟屏幕的总范围
-                monitor_info = sct.monitors[0]
-                left = monitor_info["left"]
-                top = monitor_info["top"]
-                width = monitor_info["width"]
-                height = monitor_info["height"]
-                logger.info(f"虚拟屏幕尺寸获取成功: {width}x{height}@{left},{top}")
-        except Exception as e:
-            # 替换 print
-            logger.warning(f"无法使用 mss 获取虚拟屏幕尺寸: {e}。使用默认值。")
-
-        # 设置窗口覆盖整个虚拟屏幕
-        self.root.geometry(f"{width}x{height}+{left}+{top}")
-        self.root.focus_force()
         self.root.bind("<Escape>", self.cancel_capture)
-        logger.debug("截图窗口创建完成，等待用户选择区域...")
 
         # ------------------ Canvas 用于绘制选区 ------------------
         self.canvas = tk.Canvas(
@@ -94,6 +227,11 @@ class ScreenshotTaker:
         self.canvas.bind("<ButtonPress-1>", self.on_button_press)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_button_release)
+        logger.debug("截图窗口创建完成。")
+
+    def _hide_window(self):
+        if self.root is not None:
+            self.root.withdraw()
 
     def on_button_press(self, event):
         """鼠标按下时开始绘制选区矩形。"""
@@ -132,16 +270,16 @@ class ScreenshotTaker:
         )
 
     def on_button_release(self, event):
-        """鼠标释放时捕获截图。"""
+        """鼠标释放时从冻结帧中裁剪选区。"""
         if not self.rect_start:
+            self._hide_window()
             self._finish(None)
             return
 
         self.rect_end = (self.root.winfo_pointerx(), self.root.winfo_pointery())
 
-        # 销毁截图窗口
-        if self.root:
-            self.root.destroy()
+        # 隐藏截图窗口 (保留以便下次复用)
+        self._hide_window()
 
         logger.info(f"鼠标释放，捕获区域: {self.rect_start} -> {self.rect_end}")
 
@@ -151,46 +289,30 @@ class ScreenshotTaker:
         x1, x2 = sorted([int(round(x1)), int(round(x2))])
         y1, y2 = sorted([int(round(y1)), int(round(y2))])
 
-        width = x2 - x1
-        height = y2 - y1
-
         # 如果选区太小，直接取消
-        if width < 5 or height < 5:
+        if x2 - x1 < 5 or y2 - y1 < 5:
             # 替换 print
             logger.warning("选区太小，截图取消。")
             self._finish(None)
             return
 
-        # 捕获屏幕图像
         try:
-            with mss() as sct:
-                # 使用 mss.monitors[0] 获取虚拟屏范围
-                vm = sct.monitors[0]
-                vx, vy = vm['left'], vm['top']
-                vwidth, vheight = vm['width'], vm['height']
-
-                # 将选区 clamp 到虚拟屏范围内
-                x1_clamped = max(vx, min(x1, vx + vwidth - 1))
-                y1_clamped = max(vy, min(y1, vy + vheight - 1))
-                x2_clamped = max(vx, min(x2, vx + vwidth))
-                y2_clamped = max(vy, min(y2, vy + vheight))
-
-                final_width = int(max(1, x2_clamped - x1_clamped))
-                final_height = int(max(1, y2_clamped - y1_clamped))
-
-                region = {
-                    "left": int(x1_clamped),
-                    "top": int(y1_clamped),
-                    "width": final_width,
-                    "height": final_height
-                }
-
-                logger.info(f"最终捕获区域（屏幕坐标）: {region}")
-
-                sct_img = sct.grab(region)
-                # mss 返回 BGRA 数据，转换为 PIL RGB
-                img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                self._finish(img)
+            region = clamp_region(x1, y1, x2, y2, self._screen)
+            logger.info(f"最终捕获区域（屏幕坐标）: {region}")
+            self.region = region
+
+            if self._frame is not None:
+                # 冻结帧上的视图，不再截图、不复制像素
+                frame = crop_frame(self._frame, self._screen, region)
+            else:
+                frame = self.backend.grab(region)
+
+            if self.as_array:
+                img = frame
+            else:
+                # BGRA 转换为 PIL RGB
+                img = bgra_array_to_pil(frame)
+            self._finish(img)
         except Exception as e:
             # 替换 print 和 file=sys.stderr
             logger.exception(f"截图失败: {e}")
@@ -199,15 +321,50 @@ class ScreenshotTaker:
     def cancel_capture(self, event=None):
         """按下 ESC 键取消截图。"""
         logger.info("用户通过 ESC 取消截图。")
-        if self.root:
-            self.root.destroy()
+        self._hide_window()
         self._finish(None)
 
     def _finish(self, img):
         """截图完成后的回调。"""
+        if not self._active:
+            return
+        self._active = False
+        # 冻结帧只在本次截图中使用；返回的选区视图仍持有其缓冲区，直到调用方用完
+        self._frame = None
+        if self._owns_master:
+            self.master.quit()
         if self.on_finish:
             self.on_finish(img)
 
+    def destroy(self):
+        """销毁遮罩窗口 (程序退出时调用)。"""
+        if self.root is not None:
+            self.root.destroy()
+            self.root = None
+        if self._owns_master:
+            self.master.destroy()
+            self.master = None
+            self._owns_master = False
+
+
+_DPI_AWARENESS_SET = False
+
+
+def _set_dpi_awareness():
+    """Windows 下设置 Per Monitor DPI 感知 (只需一次)，使截图坐标与物理像素一致。"""
+    global _DPI_AWARENESS_SET
+    if _DPI_AWARENESS_SET or not sys.platform.startswith('win'):
+        return
+    _DPI_AWARENESS_SET = True
+    try:
+        import ctypes
+        # DPI_AWARENESS_PER_MONITOR_AWARE = 1
+        ctypes.windll.shcore.SetProcessDpiAwareness(1)
+        logger.debug("Windows DPI 意识已设置为 Per Monitor Aware。")
+    except Exception as e:
+        # 替换 print
+        logger.warning(f"DPI 设置失败: {e}")
+
 
 # =============================
 # 测试示例
@@ -235,3 +392,5 @@ if __name__ == "__main__":
 
     taker = ScreenshotTaker(on_capture_done)
     taker.take_screenshot()
+    taker.destroy()
+    get_capture_backend().close()